@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional, List
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains import LLMChain
+import json
 import os
 
 from backend.models.compliance import ComplianceCheck, ComplianceRule, ComplianceStatus
@@ -44,7 +45,8 @@ class ComplianceAgent:
         search_id: Optional[str],
         property_address: Optional[Dict[str, str]],
         jurisdiction: str,
-        rules_to_check: List[ComplianceRule]
+        rules_to_check: List[ComplianceRule],
+        transaction_data: Optional[Dict[str, Any]] = None
     ) -> List[ComplianceCheck]:
         """Run compliance checks"""
         checks = []
@@ -56,8 +58,10 @@ class ComplianceAgent:
                 input_text += f" for search ID: {search_id}"
             if property_address:
                 input_text += f" in {jurisdiction}"
+            # TODO: Load actual transaction data when none is given
+            if transaction_data is not None:
+                input_text += f"\n\nTransaction data:\n{json.dumps(transaction_data, default=str)}"
             
-            # TODO: Load actual transaction data
             result = await self.compliance_chain.ainvoke({"input": input_text})
             
             # Parse result and create compliance check
@@ -2,13 +2,65 @@
 Document Agent
 AI agent for document understanding, classification, and extraction
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, List, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains import LLMChain
+import asyncio
+import json
 import os
+import logging
 
 from backend.models.document import DocumentType
+from backend.services.document_pipeline import DocumentPipeline, PageText
+from models.fine_tuning.document_classifier import get_document_classifier
+
+logger = logging.getLogger(__name__)
+
+# Pages sent to the LLM per extraction call
+EXTRACTION_CHUNK_PAGES = int(os.getenv("EXTRACTION_CHUNK_PAGES", "10"))
+
+# Below this confidence the local classifier defers to the LLM
+CLASSIFIER_CONFIDENCE_THRESHOLD = float(os.getenv("CLASSIFIER_CONFIDENCE_THRESHOLD", "0.85"))
+CLASSIFIER_MAX_PAGES = int(os.getenv("CLASSIFIER_MAX_PAGES", "8"))
+
+# Classifier labels without a DocumentType of the same name
+CLASSIFIER_LABEL_TYPES = {
+    "judgment": DocumentType.LIEN  # a recorded judgment attaches as a judgment lien
+}
+
+
+def parse_extraction(text: str, first_page: int, last_page: int) -> Dict[str, Any]:
+    """Parse a chunk's JSON extraction; unparseable output is kept as unstructured text"""
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+    return {"unstructured": [{"pages": [first_page, last_page], "text": text}]}
+
+
+def merge_extractions(merged: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge one chunk's extraction into the document's, in page order
+
+    Lists are concatenated, nested objects merged, and for other values
+    the first non-empty one (from the earliest pages) is kept.
+    """
+    for key, value in data.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merge_extractions(current, value)
+        elif isinstance(current, list):
+            current.extend(value if isinstance(value, list) else [value])
+        elif isinstance(value, list) and current not in (None, ""):
+            merged[key] = [current] + value
+        elif current in (None, "", [], {}):
+            merged[key] = value
+    return merged
 
 
 class DocumentAgent:
@@ -21,6 +73,7 @@ class DocumentAgent:
             api_key=os.getenv("OPENAI_API_KEY")
         )
         self.document_chain = self._create_document_chain()
+        self.pipeline = DocumentPipeline()
     
     def _create_document_chain(self):
         """Create document processing chain"""
@@ -38,27 +91,159 @@ class DocumentAgent:
         
         return LLMChain(llm=self.llm, prompt=prompt)
     
-    async def detect_document_type(self, file_content: bytes) -> DocumentType:
+    async def detect_document_type(
+        self,
+        file_content: bytes,
+        file_name: str = ""
+    ) -> DocumentType:
         """Detect document type from file content"""
-        # TODO: Use OCR + LLM to detect document type
-        # For now, return default
-        return DocumentType.OTHER
+        return await self.classify_document(file_content, file_name)
     
-    async def extract_document_data(self, document_id: str) -> Dict[str, Any]:
-        """Extract structured data from document"""
-        # TODO: Load document from storage, perform OCR, extract data
-        result = await self.document_chain.ainvoke({
-            "input": f"Extract structured data from document ID: {document_id}"
-        })
-        
+    async def extract_document_data(
+        self,
+        document_id: str,
+        pages: Optional[AsyncIterator[PageText]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract structured data from document
+
+        Args:
+            document_id: Document identifier
+            pages: OCR'd pages, consumed as they complete. Pages are grouped
+                into chunks of consecutive page numbers, and extraction for a
+                chunk starts as soon as all its pages are in, so the LLM
+                overlaps with OCR of the remaining pages. Per-chunk results
+                are merged into one structure.
+
+        Returns:
+            Extraction result dictionary
+        """
+        if pages is None:
+            # TODO: Load document from storage and run it through the pipeline
+            result = await self.document_chain.ainvoke({
+                "input": f"Extract structured data from document ID: {document_id}"
+            })
+            return {
+                "document_id": document_id,
+                "extracted_data": result["text"],
+                "confidence_score": 0.95
+            }
+
+        tasks = []
+        received: Dict[int, PageText] = {}
+        next_page = 1
+        page_count = 0
+        async for page in pages:
+            page_count += 1
+            received[page.page_number] = page
+            # Start every chunk whose consecutive pages have all arrived
+            while all(n in received for n in range(next_page, next_page + EXTRACTION_CHUNK_PAGES)):
+                chunk = [received.pop(n) for n in range(next_page, next_page + EXTRACTION_CHUNK_PAGES)]
+                tasks.append(asyncio.create_task(self._extract_chunk(document_id, chunk)))
+                next_page += EXTRACTION_CHUNK_PAGES
+        remaining = [received[n] for n in sorted(received)]
+        for start in range(0, len(remaining), EXTRACTION_CHUNK_PAGES):
+            chunk = remaining[start:start + EXTRACTION_CHUNK_PAGES]
+            tasks.append(asyncio.create_task(self._extract_chunk(document_id, chunk)))
+
+        results = sorted(await asyncio.gather(*tasks), key=lambda r: r[0])
+        extracted: Dict[str, Any] = {}
+        for _, data in results:
+            merge_extractions(extracted, data)
+
         return {
             "document_id": document_id,
-            "extracted_data": result["text"],
+            "extracted_data": extracted,
+            "page_count": page_count,
             "confidence_score": 0.95
         }
-    
-    async def classify_document(self, file_content: bytes) -> DocumentType:
-        """Classify document type"""
-        # TODO: Implement document classification
-        return DocumentType.OTHER
 
+    async def _extract_chunk(
+        self,
+        document_id: str,
+        chunk: List[PageText]
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Run extraction over a chunk of pages, returning (first page, extracted fields)"""
+        chunk = sorted(chunk, key=lambda page: page.page_number)
+        page_text = "\n\n".join(
+            f"--- Page {page.page_number} ---\n{page.text}" for page in chunk
+        )
+        result = await self.document_chain.ainvoke({
+            "input": (
+                f"Extract structured data from document ID: {document_id}, "
+                f"pages {chunk[0].page_number}-{chunk[-1].page_number}. "
+                f"Respond with a single JSON object only; use lists for repeated items.\n\n{page_text}"
+            )
+        })
+        return chunk[0].page_number, parse_extraction(result["text"], chunk[0].page_number, chunk[-1].page_number)
+
+    async def classify_document(
+        self,
+        file_content: bytes,
+        file_name: str = ""
+    ) -> DocumentType:
+        """
+        Classify document type
+        
+        Uses the local fine-tuned classifier on the first pages of the
+        document and only consults the LLM when it is not confident or its
+        label has no DocumentType. Documents that cannot be read or carry
+        no text are classified as OTHER; classifier and LLM errors are
+        raised.
+        
+        Args:
+            file_content: Raw file bytes
+            file_name: Original file name (optional)
+            
+        Returns:
+            Detected document type
+        """
+        try:
+            pages = await self.pipeline.extract_text(
+                file_content, file_name, max_pages=CLASSIFIER_MAX_PAGES
+            )
+        except (RuntimeError, OSError, ValueError) as e:
+            # PyMuPDF, Pillow and Tesseract errors for corrupt or unsupported files
+            logger.warning(f"Could not read {file_name or 'upload'} for classification: {e}")
+            return DocumentType.OTHER
+        
+        text = "\n".join(page.text for page in pages)
+        if not text.strip():
+            return DocumentType.OTHER
+        
+        # Normally loaded at startup; never load the model on the event loop
+        classifier = await asyncio.get_running_loop().run_in_executor(None, get_document_classifier)
+        if classifier is not None:
+            label, confidence = await classifier.classify(text)
+            document_type = self._classifier_type(label)
+            if document_type is not None and confidence >= CLASSIFIER_CONFIDENCE_THRESHOLD:
+                return document_type
+        
+        return await self._classify_with_llm(text)
+    
+    def _classifier_type(self, label: str) -> Optional[DocumentType]:
+        """DocumentType of a classifier label, None if it has none"""
+        if label in CLASSIFIER_LABEL_TYPES:
+            return CLASSIFIER_LABEL_TYPES[label]
+        try:
+            return DocumentType(label)
+        except ValueError:
+            return None
+    
+    async def _classify_with_llm(self, text: str) -> DocumentType:
+        """Classify document text with the LLM"""
+        labels = ", ".join(doc_type.value for doc_type in DocumentType)
+        result = await self.document_chain.ainvoke({
+            "input": (
+                f"Classify this document as exactly one of: {labels}. "
+                f"Respond with the label only.\n\n{text[:4000]}"
+            )
+        })
+        return self._to_document_type(result["text"].strip().lower())
+    
+    def _to_document_type(self, label: str) -> DocumentType:
+        """Map a classifier or LLM label onto DocumentType"""
+        try:
+            return DocumentType(label)
+        except ValueError:
+            return DocumentType.OTHER
@@ -87,3 +87,40 @@ class RiskAgent:
             "recommendations": parsed.get("recommendations", []) if include_recommendations else []
         }
 
+    
+    async def generate_recommendations(
+        self,
+        score: float,
+        factors: List[Dict[str, Any]],
+        search_id: Optional[str] = None,
+        property_address: Optional[Dict[str, str]] = None
+    ) -> List[str]:
+        """
+        Generate narrative recommendations for an already computed score
+        
+        Args:
+            score: Risk score (0-100) from the local model
+            factors: Risk factors from the local model
+            search_id: Title search identifier (optional)
+            property_address: Property address (optional)
+            
+        Returns:
+            List of recommendations
+        """
+        input_text = f"A title risk model scored this file {score:.1f} out of 100"
+        if search_id:
+            input_text += f" (search ID: {search_id})"
+        if property_address:
+            input_text += f" for property: {property_address}"
+        input_text += f". Risk factors: {json.dumps(factors, default=str)}. "
+        input_text += (
+            "Do not re-score the file. Respond with a JSON object with a single "
+            "'recommendations' key holding a list of risk mitigation recommendations."
+        )
+        
+        result = await self.risk_chain.ainvoke({"input": input_text})
+        
+        try:
+            return list(json.loads(result["text"]).get("recommendations", []))
+        except (ValueError, AttributeError):
+            return [line.strip("-* ").strip() for line in result["text"].splitlines() if line.strip()]
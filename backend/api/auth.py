@@ -5,10 +5,13 @@ Supports SSO (SAML 2.0, OAuth 2.0/OIDC)
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+import hashlib
 import os
+import time
 
 router = APIRouter()
 
@@ -19,6 +22,12 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Verified token claims by token hash, valid until the token's exp
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Seconds a looked-up user is reused; invalidate_user drops it sooner
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+
 
 class Token(BaseModel):
     access_token: str
@@ -36,6 +45,82 @@ class User(BaseModel):
     disabled: Optional[bool] = False
 
 
+_verified_tokens: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_users: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its claims
+    
+    Verified claims are cached by token hash until the token expires, so a
+    repeated token costs a dictionary lookup instead of a signature check.
+    Tokens without exp are verified every time.
+    
+    Args:
+        token: Encoded JWT
+        
+    Returns:
+        Token claims
+        
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    cached = _verified_tokens.get(key)
+    if cached is not None:
+        expires_at, payload = cached
+        if time.time() < expires_at:
+            _verified_tokens.move_to_end(key)
+            return payload
+        del _verified_tokens[key]
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if isinstance(payload.get("exp"), (int, float)):
+        _verified_tokens[key] = (float(payload["exp"]), payload)
+        while len(_verified_tokens) > TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return payload
+
+
+async def get_user(username: str) -> Optional[User]:
+    """
+    Look up a user, reusing lookups for USER_CACHE_TTL seconds
+    
+    Args:
+        username: Username
+        
+    Returns:
+        User or None
+    """
+    cached = _users.get(username)
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached[1]
+    
+    # TODO: Fetch user from database
+    # For now, return mock user
+    user = User(username=username)
+    
+    _users[username] = (time.monotonic() + USER_CACHE_TTL, user)
+    _users.move_to_end(username)
+    while len(_users) > USER_CACHE_SIZE:
+        _users.popitem(last=False)
+    return user
+
+
+def invalidate_user(username: Optional[str] = None):
+    """
+    Drop cached user data after the user (or their roles) changed
+    
+    Args:
+        username: Username, or None to drop all cached users
+    """
+    if username is None:
+        _users.clear()
+    else:
+        _users.pop(username, None)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Verify JWT token and return current user"""
     credentials_exception = HTTPException(
@@ -44,7 +129,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = verify_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -52,9 +137,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    # TODO: Fetch user from database
-    # For now, return mock user
-    return User(username=token_data.username)
+    user = await get_user(token_data.username)
+    if user is None:
+        raise credentials_exception
+    return user
 
 
 @router.post("/token", response_model=Token)
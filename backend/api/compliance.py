@@ -60,6 +60,7 @@ class ComplianceCheckRequest(BaseModel):
     property_address: Optional[Dict[str, str]] = None
     jurisdiction: str
     rules_to_check: Optional[List[ComplianceRule]] = None  # None = check all
+    transaction_data: Optional[Dict[str, Any]] = None  # Enables incremental re-checks per search
 
 
 @router.post("/check", response_model=ComplianceReport)
@@ -75,7 +76,8 @@ async def run_compliance_check(
         property_address=request.property_address,
         jurisdiction=request.jurisdiction,
         rules_to_check=request.rules_to_check,
-        user_id=current_user.username
+        user_id=current_user.username,
+        transaction_data=request.transaction_data
     )
     
     return report
@@ -10,6 +10,7 @@ from enum import Enum
 
 from backend.services.document_processing_service import DocumentProcessingService
 from backend.api.auth import get_current_user, User
+from models.fine_tuning.document_classifier import get_document_classifier
 
 router = APIRouter()
 
@@ -99,6 +100,16 @@ async def upload_document(
     )
 
 
+@router.get("/classifier/metrics")
+async def get_classifier_metrics(current_user: User = Depends(get_current_user)):
+    """Get batch size, queue depth and latency metrics for the local classifier"""
+    classifier = get_document_classifier(load=False)
+    if classifier is None:
+        raise HTTPException(status_code=503, detail="Document classifier not loaded")
+    
+    return classifier.server.metrics()
+
+
 @router.get("/{document_id}", response_model=DocumentMetadata)
 async def get_document(
     document_id: str,
@@ -3,7 +3,11 @@ Risk scoring API endpoints
 Provides risk assessment and scoring for title searches
 """
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import json
+import os
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -33,6 +37,7 @@ class RiskScore(BaseModel):
     risk_level: str  # low, medium, high, critical
     risk_factors: List[RiskFactor]
     recommendations: List[str]
+    recommendations_pending: bool = False  # generated in the background
     created_at: datetime
     model_version: str
 
@@ -44,6 +49,15 @@ class RiskScoreRequest(BaseModel):
     include_recommendations: bool = True
 
 
+MAX_BATCH_SEARCHES = int(os.getenv("RISK_BATCH_MAX_SEARCHES", "10000"))
+
+
+class RiskScoreBatchRequest(BaseModel):
+    """Request for portfolio risk scoring"""
+    search_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SEARCHES)
+    chunk_size: int = Field(500, ge=1, le=5000)
+
+
 @router.post("/score", response_model=RiskScore)
 async def calculate_risk_score(
     request: RiskScoreRequest,
@@ -62,6 +76,36 @@ async def calculate_risk_score(
     return risk_score
 
 
+@router.post("/score/batch")
+async def calculate_risk_scores_batch(
+    request: RiskScoreBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Score many title searches with the local risk model
+    
+    Results are streamed as NDJSON, one line per search, as each chunk is
+    scored. Searches missing from the feature store yield an error line.
+    """
+    service = RiskScoringService()
+    batches = service.score_batch(request.search_ids, chunk_size=request.chunk_size)
+    
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        first = []
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def ndjson():
+        for result in first:
+            yield json.dumps(result) + "\n"
+        async for results in batches:
+            yield "".join(json.dumps(result) + "\n" for result in results)
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @router.get("/score/{score_id}", response_model=RiskScore)
 async def get_risk_score(
     score_id: str,
@@ -77,6 +121,27 @@ async def get_risk_score(
     return risk_score
 
 
+@router.get("/score/{score_id}/recommendations")
+async def get_risk_score_recommendations(
+    score_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Wait for the recommendations of a score computed by the local model"""
+    service = RiskScoringService()
+    try:
+        recommendations = await service.get_recommendations(score_id)
+    except asyncio.TimeoutError:
+        return JSONResponse(
+            status_code=202,
+            content={"score_id": score_id, "detail": "Recommendations are still being generated"}
+        )
+    
+    if recommendations is None:
+        raise HTTPException(status_code=404, detail="No pending recommendations for this score")
+    
+    return {"score_id": score_id, "recommendations": recommendations}
+
+
 @router.get("/scores", response_model=List[RiskScore])
 async def list_risk_scores(
     skip: int = 0,
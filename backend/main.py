@@ -4,14 +4,25 @@ Main FastAPI application entry point for Real Estate TC Agent
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from typing import Optional
+import asyncio
+import logging
 import os
 
 from backend.api import title_search, document_processing, risk_scoring, compliance
 from backend.api.auth import router as auth_router
 from backend.utils.logging import setup_logging
+from integrations.auth.oauth import get_oauth_authenticator
+from integrations.auth.oidc_cache import get_oidc_cache
+from models.fine_tuning.document_classifier import get_document_classifier
+from models.risk_scoring.feature_store import persist_feature_store, save_feature_store_periodically
 
 # Initialize logging
 setup_logging()
+logger = logging.getLogger(__name__)
+
+# Background task saving ingested risk features
+_feature_saver: Optional[asyncio.Task] = None
 
 app = FastAPI(
     title="Real Estate TC Agent API",
@@ -44,6 +55,48 @@ app.include_router(risk_scoring.router, prefix="/api/risk", tags=["Risk Scoring"
 app.include_router(compliance.router, prefix="/api/compliance", tags=["Compliance"])
 
 
+@app.on_event("startup")
+async def load_models():
+    """Load the document classifier off the event loop before serving requests"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, get_document_classifier)
+    except Exception as e:
+        logger.error(f"Failed to load document classifier: {e}")
+
+
+@app.on_event("startup")
+async def warm_oidc_cache():
+    """Prefetch SSO provider metadata and keys so the first login does not wait on them"""
+    try:
+        await get_oauth_authenticator().warm_cache()
+    except Exception as e:
+        logger.error(f"Failed to warm OIDC cache: {e}")
+
+
+@app.on_event("shutdown")
+async def close_oidc_cache():
+    """Stop OIDC cache refreshes"""
+    await get_oidc_cache().close()
+
+
+@app.on_event("startup")
+async def start_feature_saver():
+    """Save ingested risk features periodically"""
+    global _feature_saver
+    _feature_saver = asyncio.create_task(save_feature_store_periodically())
+
+
+@app.on_event("shutdown")
+async def save_features():
+    """Stop periodic saves and persist risk features ingested since the last one"""
+    if _feature_saver is not None:
+        _feature_saver.cancel()
+    try:
+        await persist_feature_store()
+    except Exception as e:
+        logger.error(f"Failed to save risk feature store: {e}")
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
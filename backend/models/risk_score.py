@@ -34,6 +34,7 @@ class RiskScore(BaseModel):
     risk_level: RiskLevel
     risk_factors: List[RiskFactor]
     recommendations: List[str]
+    recommendations_pending: bool = False  # generated in the background
     created_at: datetime
     model_version: str
 
@@ -2,12 +2,22 @@
 Compliance Service
 Handles regulatory compliance checks (RESPA, TILA, state-specific rules)
 """
+import json
+import os
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from backend.models.compliance import ComplianceReport, ComplianceStatus, ComplianceRule
+from backend.models.compliance import ComplianceCheck, ComplianceReport, ComplianceStatus, ComplianceRule
 from backend.agents.compliance_agent import ComplianceAgent
 from backend.utils.database import get_db_session
+from models.compliance.jurisdiction_rules import normalize_jurisdiction
+from models.compliance.rule_engine import get_compliance_engine
+
+# Last agent checks per (search, jurisdiction, property address) and rule type,
+# reused when the rule type's inputs are unchanged
+_agent_checks: "OrderedDict[tuple, Dict[ComplianceRule, List[ComplianceCheck]]]" = OrderedDict()
+AGENT_CHECK_CACHE_SIZE = int(os.getenv("COMPLIANCE_REPORT_CACHE_SIZE", "10000"))
 
 
 class ComplianceService:
@@ -15,6 +25,7 @@ class ComplianceService:
     
     def __init__(self):
         self.agent = ComplianceAgent()
+        self.engine = get_compliance_engine()
     
     async def run_compliance_check(
         self,
@@ -22,18 +33,37 @@ class ComplianceService:
         property_address: Optional[Dict[str, str]],
         jurisdiction: str,
         rules_to_check: Optional[List[ComplianceRule]],
-        user_id: str
+        user_id: str,
+        transaction_data: Optional[Dict[str, Any]] = None
     ) -> ComplianceReport:
-        """Run compliance checks using rule engine and ML"""
+        """
+        Run compliance checks using rule engine and ML
+        
+        When transaction data is given for a search, the rule engine re-runs
+        only rules whose input fields changed since the search was last
+        checked, and the agent is only asked about rule types with changes.
+        """
         report_id = str(uuid.uuid4())
+        rules_to_check = rules_to_check or list(ComplianceRule)
         
-        # Use agent to check compliance
-        checks = await self.agent.check_compliance(
-            search_id=search_id,
-            property_address=property_address,
-            jurisdiction=jurisdiction,
-            rules_to_check=rules_to_check or list(ComplianceRule)
-        )
+        if transaction_data is not None and search_id:
+            plan = self.engine.plan_recheck(search_id, transaction_data, jurisdiction, rules_to_check)
+            changed = self.engine.changed_rule_types(
+                search_id, transaction_data, jurisdiction, rules_to_check, plan=plan
+            )
+            checks = self.engine.recheck(search_id, transaction_data, jurisdiction, rules_to_check, plan=plan)
+            checks += await self._agent_checks(
+                search_id, property_address, jurisdiction, rules_to_check, changed, transaction_data
+            )
+        else:
+            # Use agent to check compliance
+            checks = await self.agent.check_compliance(
+                search_id=search_id,
+                property_address=property_address,
+                jurisdiction=jurisdiction,
+                rules_to_check=rules_to_check,
+                transaction_data=transaction_data
+            )
         
         # Determine overall status
         overall_status = self._determine_overall_status(checks)
@@ -57,6 +87,43 @@ class ComplianceService:
         
         return report
     
+    async def _agent_checks(
+        self,
+        search_id: str,
+        property_address: Optional[Dict[str, str]],
+        jurisdiction: str,
+        rules_to_check: List[ComplianceRule],
+        changed: List[ComplianceRule],
+        transaction_data: Dict[str, Any]
+    ) -> List[ComplianceCheck]:
+        """Agent checks for a search, re-asking the agent only for changed or uncached rule types"""
+        key = (
+            search_id,
+            normalize_jurisdiction(jurisdiction),
+            json.dumps(property_address, sort_keys=True, default=str)
+        )
+        cached = _agent_checks.get(key, {})
+        to_run = [rule for rule in rules_to_check if rule in changed or rule not in cached]
+        
+        if to_run:
+            results = await self.agent.check_compliance(
+                search_id=search_id,
+                property_address=property_address,
+                jurisdiction=jurisdiction,
+                rules_to_check=to_run,
+                transaction_data=transaction_data
+            )
+            cached = dict(cached)
+            for rule in to_run:
+                cached[rule] = [check for check in results if check.rule_type == rule]
+        
+        _agent_checks[key] = cached
+        _agent_checks.move_to_end(key)
+        while len(_agent_checks) > AGENT_CHECK_CACHE_SIZE:
+            _agent_checks.popitem(last=False)
+        
+        return [check for rule in rules_to_check for check in cached[rule]]
+    
     def _determine_overall_status(self, checks: List[Any]) -> ComplianceStatus:
         """Determine overall compliance status from checks"""
         if not checks:
@@ -0,0 +1,263 @@
+"""
+Document Pipeline
+Page-parallel rasterization and OCR for uploaded documents
+"""
+import asyncio
+import hashlib
+import io
+import os
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "10000"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+
+# Shared across service instances so every request reuses the same warm workers
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_ocr_executor() -> ProcessPoolExecutor:
+    """Get the process pool used for OCR, sized to the machine's cores"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+    return _executor
+
+
+@dataclass
+class PageText:
+    """OCR result for a single page"""
+    page_number: int
+    text: str
+    page_hash: str
+    cached: bool = False
+
+
+def split_pages(
+    file_content: bytes,
+    file_name: str,
+    max_pages: Optional[int] = None
+) -> List[Tuple[bytes, str]]:
+    """
+    Split a document into independently processable pages
+
+    Args:
+        file_content: Raw file bytes
+        file_name: Original file name (used to detect the format)
+        max_pages: Only split the first N pages (optional)
+
+    Returns:
+        List of (page bytes, page format) tuples in page order
+    """
+    ext = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    if not ext:
+        if file_content.startswith(b"%PDF"):
+            ext = "pdf"
+        elif file_content[:4] in (b"II*\x00", b"MM\x00*"):
+            ext = "tiff"
+
+    if ext == "pdf":
+        import fitz
+
+        pages = []
+        with fitz.open(stream=file_content, filetype="pdf") as source:
+            page_count = source.page_count
+            if max_pages is not None:
+                page_count = min(page_count, max_pages)
+            for index in range(page_count):
+                page_doc = fitz.open()
+                page_doc.insert_pdf(source, from_page=index, to_page=index)
+                # no_new_id keeps the bytes (and therefore the page hash) stable
+                pages.append((page_doc.tobytes(garbage=3, deflate=True, no_new_id=True), "pdf"))
+                page_doc.close()
+        return pages
+
+    if ext in ("tif", "tiff"):
+        from PIL import Image, ImageSequence
+
+        pages = []
+        with Image.open(io.BytesIO(file_content)) as image:
+            for frame in ImageSequence.Iterator(image):
+                if max_pages is not None and len(pages) >= max_pages:
+                    break
+                # PNG cannot store CMYK or YCbCr frames
+                if frame.mode not in ("1", "L", "LA", "P", "RGB", "RGBA", "I;16"):
+                    frame = frame.convert("RGB")
+                buffer = io.BytesIO()
+                frame.save(buffer, format="PNG")
+                pages.append((buffer.getvalue(), "image"))
+        return pages
+
+    return [(file_content, "image")]
+
+
+def ocr_page(page_bytes: bytes, page_format: str, dpi: int, language: str) -> str:
+    """
+    Rasterize and OCR a single page (runs inside a worker process)
+
+    Args:
+        page_bytes: Single-page PDF or image bytes
+        page_format: "pdf" or "image"
+        dpi: Rasterization resolution for PDF pages
+        language: Tesseract language code
+
+    Returns:
+        Extracted page text
+    """
+    import pytesseract
+    from PIL import Image
+
+    if page_format == "pdf":
+        import fitz
+
+        with fitz.open(stream=page_bytes, filetype="pdf") as doc:
+            page = doc[0]
+            # Born-digital pages already carry a text layer, no need to OCR them
+            text = page.get_text().strip()
+            if text:
+                return text
+            pixmap = page.get_pixmap(dpi=dpi)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        image = Image.open(io.BytesIO(page_bytes))
+
+    return pytesseract.image_to_string(image, lang=language)
+
+
+class PageTextCache:
+    """In-memory LRU cache of OCR text keyed by page hash"""
+
+    def __init__(self, max_entries: int = OCR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, page_hash: str) -> Optional[str]:
+        text = self._entries.get(page_hash)
+        if text is not None:
+            self._entries.move_to_end(page_hash)
+        return text
+
+    def set(self, page_hash: str, text: str):
+        self._entries[page_hash] = text
+        self._entries.move_to_end(page_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_page_cache = PageTextCache()
+
+
+class DocumentPipeline:
+    """Split documents into pages and OCR them in parallel"""
+
+    def __init__(
+        self,
+        dpi: int = OCR_DPI,
+        language: str = OCR_LANGUAGE,
+        cache: Optional[PageTextCache] = None
+    ):
+        """
+        Initialize document pipeline
+
+        Args:
+            dpi: Rasterization resolution for PDF pages
+            language: Tesseract language code
+            cache: Page text cache (defaults to the process-wide cache)
+        """
+        self.dpi = dpi
+        self.language = language
+        self.cache = cache or _page_cache
+
+    def _page_hash(self, page_bytes: bytes) -> str:
+        digest = hashlib.sha256(page_bytes)
+        digest.update(f"|{self.dpi}|{self.language}".encode("utf-8"))
+        return digest.hexdigest()
+
+    async def iter_pages(
+        self,
+        file_content: bytes,
+        file_name: str,
+        max_pages: Optional[int] = None
+    ) -> AsyncIterator[PageText]:
+        """
+        OCR a document, yielding pages as they complete (not in page order)
+
+        At most OCR_WORKERS pages are submitted to the process pool at a
+        time. If the consumer stops early, pages not yet submitted are
+        never OCR'd; pages already running in a worker cannot be
+        interrupted and finish in the background.
+
+        Args:
+            file_content: Raw file bytes
+            file_name: Original file name
+            max_pages: Only OCR the first N pages (optional)
+
+        Yields:
+            PageText for each page
+        """
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(None, split_pages, file_content, file_name, max_pages)
+        executor = get_ocr_executor()
+
+        to_ocr: List[Tuple[int, str, bytes, str]] = []
+        cached: List[PageText] = []
+        for page_number, (page_bytes, page_format) in enumerate(pages, start=1):
+            page_hash = self._page_hash(page_bytes)
+            text = self.cache.get(page_hash)
+            if text is not None:
+                cached.append(PageText(page_number, text, page_hash, cached=True))
+            else:
+                to_ocr.append((page_number, page_hash, page_bytes, page_format))
+
+        logger.info(
+            f"OCR {file_name}: {len(pages)} pages, {len(to_ocr)} to process "
+            f"on {OCR_WORKERS} workers"
+        )
+
+        pending: Dict[asyncio.Future, Tuple[int, str]] = {}
+        queued = iter(to_ocr)
+
+        def submit():
+            # Keep the pool busy without queueing pages a closed consumer no longer needs
+            while len(pending) < OCR_WORKERS:
+                item = next(queued, None)
+                if item is None:
+                    return
+                page_number, page_hash, page_bytes, page_format = item
+                future = loop.run_in_executor(
+                    executor, ocr_page, page_bytes, page_format, self.dpi, self.language
+                )
+                pending[future] = (page_number, page_hash)
+
+        try:
+            submit()
+            for page in cached:
+                yield page
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    page_number, page_hash = pending.pop(future)
+                    text = future.result()
+                    self.cache.set(page_hash, text)
+                    submit()
+                    yield PageText(page_number, text, page_hash)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def extract_text(
+        self,
+        file_content: bytes,
+        file_name: str,
+        max_pages: Optional[int] = None
+    ) -> List[PageText]:
+        """OCR a document and return its pages in page order"""
+        pages = [page async for page in self.iter_pages(file_content, file_name, max_pages)]
+        return sorted(pages, key=lambda page: page.page_number)
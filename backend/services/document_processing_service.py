@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from backend.models.document import Document, DocumentType, DocumentStatus
 from backend.agents.document_agent import DocumentAgent
+from backend.services.document_pipeline import DocumentPipeline
 from backend.utils.database import get_db_session
 
 
@@ -15,6 +16,7 @@ class DocumentProcessingService:
     
     def __init__(self):
         self.agent = DocumentAgent()
+        self.pipeline = DocumentPipeline()
     
     async def upload_document(
         self,
@@ -28,7 +30,7 @@ class DocumentProcessingService:
         
         # Detect document type if not provided
         if not document_type:
-            document_type = await self.agent.detect_document_type(file_content)
+            document_type = await self.agent.detect_document_type(file_content, file_name)
         
         # Create document record
         document = Document(
@@ -49,11 +51,20 @@ class DocumentProcessingService:
         
         return document_id
     
-    async def process_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+    async def process_document(
+        self,
+        document_id: str,
+        file_content: Optional[bytes] = None,
+        file_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """Process a document and extract structured data"""
-        # TODO: Load document from database
-        # For now, use agent to process
-        result = await self.agent.extract_document_data(document_id)
+        # TODO: Load document content from S3 when not provided
+        pages = None
+        if file_content is not None and file_name:
+            # Pages stream into extraction as OCR completes
+            pages = self.pipeline.iter_pages(file_content, file_name)
+        
+        result = await self.agent.extract_document_data(document_id, pages=pages)
         
         # TODO: Update document in database with extracted data
         return result
@@ -2,12 +2,26 @@
 Risk Scoring Service
 Provides risk assessment and scoring for title searches
 """
+import asyncio
 import uuid
+import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from backend.models.risk_score import RiskScore, RiskLevel
+from typing import Optional, List, Dict, Any, AsyncIterator
+import numpy as np
+from backend.models.risk_score import RiskScore, RiskLevel, RiskFactor
 from backend.agents.risk_agent import RiskAgent
 from backend.utils.database import get_db_session
+from models.risk_scoring.feature_store import get_feature_store
+from models.risk_scoring.risk_model import FEATURE_NAMES, get_risk_model
+
+logger = logging.getLogger(__name__)
+
+# Narrative recommendations still being generated, keyed by score_id
+_pending_recommendations: Dict[str, asyncio.Task] = {}
+RECOMMENDATIONS_RETENTION_SECONDS = 600
+
+# Factors that move the score by less than this many points are omitted
+MIN_FACTOR_IMPACT = 0.5
 
 
 class RiskScoringService:
@@ -24,7 +38,51 @@ class RiskScoringService:
         include_recommendations: bool,
         user_id: str
     ) -> RiskScore:
-        """Calculate risk score using AI models"""
+        """
+        Calculate risk score
+        
+        Scores come from the local risk model when the search is in the
+        feature store; the LLM is then only used, in the background, to
+        write recommendations. Otherwise falls back to the LLM agent.
+        """
+        model = get_risk_model()
+        features = get_feature_store().get_features(search_id) if search_id else None
+        if model is None or features is None:
+            return await self._calculate_with_agent(
+                search_id, property_address, include_recommendations
+            )
+        
+        score_id = str(uuid.uuid4())
+        scores, contributions, _ = model.explain_features(features)
+        score = float(scores[0])
+        factors = self._build_risk_factors(features[0], contributions[0])
+        
+        pending = False
+        if include_recommendations:
+            self._schedule_recommendations(score_id, score, factors, search_id, property_address)
+            pending = True
+        
+        # TODO: Save to database
+        return RiskScore(
+            score_id=score_id,
+            search_id=search_id,
+            property_address=property_address,
+            overall_risk_score=score,
+            risk_level=self._determine_risk_level(score),
+            risk_factors=factors,
+            recommendations=[],
+            recommendations_pending=pending,
+            created_at=datetime.utcnow(),
+            model_version=self.model_version
+        )
+    
+    async def _calculate_with_agent(
+        self,
+        search_id: Optional[str],
+        property_address: Optional[Dict[str, str]],
+        include_recommendations: bool
+    ) -> RiskScore:
+        """Calculate risk score with the LLM agent"""
         score_id = str(uuid.uuid4())
         
         # Use agent to calculate risk
@@ -54,6 +112,156 @@ class RiskScoringService:
         
         return risk_score
     
+    def _build_risk_factors(
+        self,
+        features: np.ndarray,
+        contributions: np.ndarray
+    ) -> List[RiskFactor]:
+        """
+        Map per-feature model contributions onto risk factors
+        
+        Args:
+            features: Feature vector, ordered as FEATURE_NAMES
+            contributions: Score points each feature added or removed
+            
+        Returns:
+            Risk factors ordered by impact, largest first
+        """
+        factors = []
+        for idx in np.argsort(-np.abs(contributions)):
+            impact = float(contributions[idx])
+            if abs(impact) < MIN_FACTOR_IMPACT:
+                continue
+            name = FEATURE_NAMES[idx]
+            label = name.replace("_", " ")
+            factors.append(RiskFactor(
+                factor_name=label.title(),
+                factor_type=name,
+                severity=self._severity(impact),
+                description=(
+                    f"{label.capitalize()} of {features[idx]:g} "
+                    f"{'raises' if impact > 0 else 'lowers'} the score by {abs(impact):.1f} points"
+                ),
+                impact_score=round(impact, 2),
+                evidence={"value": float(features[idx])}
+            ))
+        return factors
+    
+    def _severity(self, impact: float) -> str:
+        """Severity of a factor from the score points it adds"""
+        if impact < 5:
+            return "low"
+        elif impact < 10:
+            return "medium"
+        elif impact < 20:
+            return "high"
+        return "critical"
+    
+    def _schedule_recommendations(
+        self,
+        score_id: str,
+        score: float,
+        factors: List[RiskFactor],
+        search_id: Optional[str],
+        property_address: Optional[Dict[str, str]]
+    ):
+        """Generate recommendations with the LLM in the background"""
+        task = asyncio.create_task(self.agent.generate_recommendations(
+            score=score,
+            factors=[factor.model_dump() for factor in factors],
+            search_id=search_id,
+            property_address=property_address
+        ))
+        _pending_recommendations[score_id] = task
+        asyncio.get_running_loop().call_later(
+            RECOMMENDATIONS_RETENTION_SECONDS,
+            _pending_recommendations.pop, score_id, None
+        )
+    
+    async def get_recommendations(
+        self,
+        score_id: str,
+        timeout: float = 30.0
+    ) -> Optional[List[str]]:
+        """
+        Wait for the recommendations of a locally computed score
+        
+        Args:
+            score_id: Risk score ID
+            timeout: Seconds to wait for the LLM
+            
+        Returns:
+            Recommendations, or None if none are pending for this score
+        """
+        task = _pending_recommendations.get(score_id)
+        if task is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            # Still generating, callers can retry
+            raise
+        except Exception as e:
+            logger.error(f"Error generating recommendations for {score_id}: {e}")
+            return []
+    
+    async def score_batch(
+        self,
+        search_ids: List[str],
+        chunk_size: int = 500
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Score many searches with the local model, one chunk at a time
+        
+        Each chunk is a single vectorized pass over the forest. Results are
+        yielded per chunk so callers can stream them without holding the
+        whole portfolio in memory.
+        
+        Args:
+            search_ids: Title search identifiers
+            chunk_size: Searches scored per model call
+            
+        Yields:
+            List of JSON-serializable results, one per search in the chunk
+            
+        Raises:
+            RuntimeError: If no local risk model is loaded
+        """
+        model = get_risk_model()
+        if model is None:
+            raise RuntimeError("Local risk model not loaded")
+        store = get_feature_store()
+        
+        for start in range(0, len(search_ids), chunk_size):
+            chunk = search_ids[start:start + chunk_size]
+            features, found = store.get_matrix(chunk)
+            results = []
+            if len(features):
+                scores, contributions, _ = model.explain_features(features)
+            
+            row = 0
+            created_at = datetime.utcnow()
+            for search_id, is_found in zip(chunk, found):
+                if not is_found:
+                    results.append({"search_id": search_id, "error": "Search not found in feature store"})
+                    continue
+                score = float(scores[row])
+                results.append(RiskScore(
+                    score_id=str(uuid.uuid4()),
+                    search_id=search_id,
+                    overall_risk_score=score,
+                    risk_level=self._determine_risk_level(score),
+                    risk_factors=self._build_risk_factors(features[row], contributions[row]),
+                    recommendations=[],
+                    created_at=created_at,
+                    model_version=self.model_version
+                ).model_dump(mode="json"))
+                row += 1
+            
+            yield results
+            # Let other requests run between chunks
+            await asyncio.sleep(0)
+    
     def _determine_risk_level(self, score: float) -> RiskLevel:
         """Determine risk level from score"""
         if score < 25:
@@ -9,6 +9,7 @@ from backend.models.property import PropertyAddress
 from backend.models.title_search import TitleSearch, TitleSearchStatus
 from backend.agents.title_search_agent import TitleSearchAgent
 from backend.utils.database import get_db_session
+from models.risk_scoring.feature_store import get_feature_store
 
 
 class TitleSearchService:
@@ -54,6 +55,7 @@ class TitleSearchService:
         result = await self.agent.search_title(search_id)
         
         # TODO: Update search in database with results
+        get_feature_store().upsert_search(search_id, result, result.get("property_id"))
         return result
     
     async def get_search_result(self, search_id: str) -> Optional[TitleSearch]:
@@ -0,0 +1,84 @@
+"""
+APR Verification Tests
+Checks against Regulation Z Appendix J examples and tolerances
+"""
+import numpy as np
+
+from models.compliance.apr import (
+    FINANCE_CHARGE_TOLERANCE,
+    IRREGULAR_APR_TOLERANCE,
+    REGULAR_APR_TOLERANCE,
+    is_irregular,
+    solve_level_apr,
+    verify_tila
+)
+
+
+def test_level_payment_loans():
+    # $5,000 repaid in 24 or 36 monthly payments at 1% per month is a 12.00% APR
+    apr = solve_level_apr(
+        amount_financed=np.array([5000.0, 5000.0]),
+        payment=np.array([235.37, 166.07]),
+        n_payments=np.array([24.0, 36.0]),
+        periods_per_year=np.array([12.0, 12.0])
+    )
+    np.testing.assert_allclose(apr, [12.0, 12.0], atol=0.005)
+
+
+def test_interest_free_loan_has_zero_apr():
+    result = verify_tila([{"amount_financed": 1200, "payment_amount": 100, "term_months": 12, "apr": 0}])
+    assert result.computed_apr[0] == 0.0
+    assert not result.apr_violation[0]
+
+
+def test_schedule_matches_level_solution():
+    # Same loan given as an explicit schedule, with an odd final payment
+    schedule = [166.07] * 35 + [166.10]
+    result = verify_tila([{"amount_financed": 5000, "payments": schedule, "apr": 12.0}])
+    assert abs(result.computed_apr[0] - 12.0) < 0.01
+    assert result.apr_tolerance[0] == REGULAR_APR_TOLERANCE
+    assert not result.apr_violation[0]
+
+
+def test_irregular_schedule_uses_wider_tolerance():
+    schedule = [100.0] * 12 + [150.0] * 12 + [100.0] * 12
+    assert is_irregular(schedule)
+    assert not is_irregular([50.0] + [100.0] * 10 + [75.0])
+
+    result = verify_tila([{"amount_financed": 3500, "payments": schedule}])
+    assert result.apr_tolerance[0] == IRREGULAR_APR_TOLERANCE
+    computed = result.computed_apr[0]
+
+    within = verify_tila([{"amount_financed": 3500, "payments": schedule, "apr": computed + 0.2}])
+    outside = verify_tila([{"amount_financed": 3500, "payments": schedule, "apr": computed + 0.3}])
+    assert not within.apr_violation[0]
+    assert outside.apr_violation[0]
+
+
+def test_regular_apr_tolerance():
+    base = {"amount_financed": 5000, "payment_amount": 166.07, "term_months": 36}
+    result = verify_tila([
+        dict(base, apr=12.1),
+        dict(base, apr=12.2),
+        dict(base, apr=11.85)
+    ])
+    assert result.apr_violation.tolist() == [False, True, True]
+
+
+def test_finance_charge_understatement():
+    # Total of payments 5,978.52 less 5,000 financed is a 978.52 finance charge
+    base = {"amount_financed": 5000, "payment_amount": 166.07, "term_months": 36, "apr": 12.0}
+    result = verify_tila([
+        dict(base, finance_charge=978.52),
+        dict(base, finance_charge=978.52 - FINANCE_CHARGE_TOLERANCE),
+        dict(base, finance_charge=978.52 - FINANCE_CHARGE_TOLERANCE - 1),
+        dict(base, finance_charge=2000)
+    ])
+    assert result.finance_charge_violation.tolist() == [False, False, True, False]
+
+
+def test_loans_without_schedule_are_not_checked():
+    result = verify_tila([{"apr": 6.5}, {"amount_financed": 0, "payment_amount": 100, "term_months": 12}])
+    assert result.has_schedule.tolist() == [False, False]
+    assert result.apr_checked.tolist() == [False, False]
+    assert result.apr_violation.tolist() == [False, False]
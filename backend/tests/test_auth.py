@@ -0,0 +1,89 @@
+"""
+Auth API Tests
+Verified token cache expiry and eviction
+"""
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from backend.api import auth
+
+
+def make_token(subject: str, expires_in: float) -> str:
+    claims = {"sub": subject, "exp": int(time.time() + expires_in)}
+    return jwt.encode(claims, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(auth, "_verified_tokens", type(auth._verified_tokens)())
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    decode = auth.jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_verified_token_is_cached(decode_calls):
+    token = make_token("alice", 600)
+    assert auth.verify_token(token)["sub"] == "alice"
+    assert auth.verify_token(token)["sub"] == "alice"
+    assert len(decode_calls) == 1
+
+
+def test_cached_token_is_reverified_after_exp(decode_calls, monkeypatch):
+    token = make_token("alice", 600)
+    auth.verify_token(token)
+    auth.verify_token(token)
+    assert len(decode_calls) == 1
+
+    now = time.time()
+    monkeypatch.setattr(auth.time, "time", lambda: now + 601)
+    auth.verify_token(token)
+    assert len(decode_calls) == 2
+
+
+def test_expired_token_is_rejected():
+    with pytest.raises(JWTError):
+        auth.verify_token(make_token("alice", -10))
+    assert len(auth._verified_tokens) == 0
+
+
+def test_invalid_token_is_not_cached():
+    token = make_token("alice", 600)
+    with pytest.raises(JWTError):
+        auth.verify_token(token[:-2] + ("aa" if not token.endswith("aa") else "bb"))
+    assert len(auth._verified_tokens) == 0
+
+
+def test_token_without_exp_is_verified_every_time(decode_calls):
+    token = jwt.encode({"sub": "svc"}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+    auth.verify_token(token)
+    auth.verify_token(token)
+    assert len(decode_calls) == 2
+
+
+def test_least_recently_used_token_is_evicted(decode_calls, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_SIZE", 2)
+    first, second, third = (make_token(name, 600) for name in ("a", "b", "c"))
+
+    auth.verify_token(first)
+    auth.verify_token(second)
+    auth.verify_token(first)
+    auth.verify_token(third)
+    assert len(auth._verified_tokens) == 2
+
+    decode_calls.clear()
+    auth.verify_token(first)
+    assert decode_calls == []
+    auth.verify_token(second)
+    assert decode_calls == [second]
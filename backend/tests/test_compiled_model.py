@@ -0,0 +1,59 @@
+"""
+Compiled Risk Model Tests
+CompiledForest must reproduce the sklearn forest it was compiled from
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from models.risk_scoring.compiled_model import CompiledForest
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(7)
+    X = rng.normal(loc=[100, 0.5, 30, -2], scale=[25, 0.2, 10, 1], size=(400, 4))
+    y = X[:, 0] * 0.01 + np.sin(X[:, 2]) - X[:, 3] ** 2 + rng.normal(scale=0.1, size=400)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0)
+    forest.fit(scaler.transform(X), y)
+    X_test = rng.normal(loc=[100, 0.5, 30, -2], scale=[25, 0.2, 10, 1], size=(200, 4))
+    return forest, scaler, X_test
+
+
+def test_predict_matches_sklearn(fitted):
+    forest, scaler, X_test = fitted
+    compiled = CompiledForest.from_sklearn(forest, scaler)
+
+    expected = forest.predict(scaler.transform(X_test))
+    np.testing.assert_allclose(compiled.predict(X_test), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_single_row_matches_sklearn(fitted):
+    forest, scaler, X_test = fitted
+    compiled = CompiledForest.from_sklearn(forest, scaler)
+
+    expected = forest.predict(scaler.transform(X_test[:1]))
+    np.testing.assert_allclose(compiled.predict(X_test[0]), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_contributions_sum_to_prediction(fitted):
+    forest, scaler, X_test = fitted
+    compiled = CompiledForest.from_sklearn(forest, scaler)
+
+    predictions, contributions, bias = compiled.predict_with_contributions(X_test)
+
+    np.testing.assert_allclose(predictions, forest.predict(scaler.transform(X_test)), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(contributions.sum(axis=1) + bias, predictions, rtol=1e-9, atol=1e-9)
+
+
+def test_save_load_round_trip(fitted, tmp_path):
+    forest, scaler, X_test = fitted
+    compiled = CompiledForest.from_sklearn(forest, scaler)
+    compiled.save(str(tmp_path), metadata={"model_version": "test"})
+
+    loaded = CompiledForest.load(str(tmp_path))
+
+    assert loaded.n_trees == forest.n_estimators
+    np.testing.assert_array_equal(loaded.predict(X_test), compiled.predict(X_test))
@@ -0,0 +1,121 @@
+"""
+Document Pipeline Tests
+Bounded OCR submission and cleanup when the consumer stops early
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.services import document_pipeline
+from backend.services.document_pipeline import DocumentPipeline, PageTextCache
+
+WORKERS = 2
+PAGES = 6
+
+
+class FakeOCR:
+    """Blocking stand-in for ocr_page that records concurrency"""
+
+    def __init__(self, instant=()):
+        self.instant = set(instant)
+        self.lock = threading.Lock()
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self.release = threading.Event()
+
+    def __call__(self, page_bytes, page_format, dpi, language):
+        with self.lock:
+            self.started.append(page_bytes)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        if page_bytes not in self.instant:
+            self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        return page_bytes.decode("utf-8").upper()
+
+
+def install(monkeypatch, fake: FakeOCR, executor_workers: int):
+    executor = ThreadPoolExecutor(max_workers=executor_workers)
+    monkeypatch.setattr(document_pipeline, "OCR_WORKERS", WORKERS)
+    monkeypatch.setattr(document_pipeline, "get_ocr_executor", lambda: executor)
+    monkeypatch.setattr(document_pipeline, "ocr_page", fake)
+    monkeypatch.setattr(
+        document_pipeline, "split_pages",
+        lambda content, name, max_pages: [(f"page {n}".encode("utf-8"), "png") for n in range(1, PAGES + 1)][:max_pages]
+    )
+    return executor
+
+
+@pytest.fixture
+def ocr(monkeypatch):
+    fake = FakeOCR()
+    executor = install(monkeypatch, fake, PAGES)
+    yield fake
+    fake.release.set()
+    executor.shutdown(wait=True)
+
+
+async def wait_for_started(ocr: FakeOCR, count: int):
+    for _ in range(500):
+        if len(ocr.started) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_submission_is_bounded_by_workers(ocr):
+    async def scenario():
+        pipeline = DocumentPipeline(cache=PageTextCache())
+        consumer = asyncio.create_task(pipeline.extract_text(b"doc", "doc.pdf"))
+
+        await wait_for_started(ocr, WORKERS)
+        await asyncio.sleep(0.05)
+        assert len(ocr.started) == WORKERS
+
+        ocr.release.set()
+        return await asyncio.wait_for(consumer, 5)
+
+    pages = asyncio.run(scenario())
+    assert [page.page_number for page in pages] == list(range(1, PAGES + 1))
+    assert pages[0].text == "PAGE 1"
+    assert ocr.max_running <= WORKERS
+
+
+def test_cached_pages_are_not_ocrd_again(ocr):
+    ocr.release.set()
+    cache = PageTextCache()
+    pipeline = DocumentPipeline(cache=cache)
+
+    asyncio.run(pipeline.extract_text(b"doc", "doc.pdf", max_pages=3))
+    assert len(ocr.started) == 3
+
+    pages = asyncio.run(pipeline.extract_text(b"doc", "doc.pdf"))
+    assert len(ocr.started) == PAGES
+    assert [page.cached for page in pages] == [True] * 3 + [False] * 3
+
+
+def test_closing_early_cancels_queued_pages(monkeypatch):
+    # One executor thread: page 2 blocks it, so page 3 waits in the executor queue
+    fake = FakeOCR(instant=[b"page 1"])
+    executor = install(monkeypatch, fake, 1)
+
+    async def scenario():
+        pipeline = DocumentPipeline(cache=PageTextCache())
+        pages = pipeline.iter_pages(b"doc", "doc.pdf")
+        page = await asyncio.wait_for(pages.__anext__(), 5)
+        await pages.aclose()
+        return page
+
+    try:
+        page = asyncio.run(scenario())
+    finally:
+        fake.release.set()
+        executor.shutdown(wait=True)
+
+    assert page.page_number == 1
+    # Page 2 may already be running; page 3 was queued behind it and cancelled
+    assert fake.started[0] == b"page 1"
+    assert set(fake.started) <= {b"page 1", b"page 2"}
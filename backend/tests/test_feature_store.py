@@ -0,0 +1,104 @@
+"""
+Risk Feature Store Tests
+Incremental record application and persistence
+"""
+import asyncio
+
+import numpy as np
+
+from models.risk_scoring import feature_store
+from models.risk_scoring.feature_store import RiskFeatureStore
+from models.risk_scoring.risk_model import FEATURE_NAMES
+
+COLUMN = {name: idx for idx, name in enumerate(FEATURE_NAMES)}
+
+SEARCH = {
+    "property_age": 40,
+    "liens": [{"id": "l1", "amount": 5000}],
+    "deeds": [{"id": "d1", "recording_date": "2020-01-15"}],
+    "encumbrances": [],
+    "judgments": []
+}
+
+
+def test_records_for_unknown_searches_are_ignored():
+    store = RiskFeatureStore()
+    store.add_judgment("s1", {"id": "j1"})
+    store.add_lien("s1", {"id": "l9", "amount": 100})
+    assert "s1" not in store
+
+    store.upsert_search("s1", SEARCH)
+    features = store.get_features("s1")
+    assert features[0, COLUMN["has_judgments"]] == 0
+    assert features[0, COLUMN["lien_count"]] == 1
+    assert features[0, COLUMN["property_age"]] == 40
+
+
+def test_records_are_applied_once():
+    store = RiskFeatureStore()
+    store.upsert_search("s1", SEARCH, property_id="p1")
+    store.add_lien("s1", {"id": "l1", "amount": 5000})
+    store.add_lien("s1", {"id": "l2", "amount": 250})
+    store.add_lien("s1", {"id": "l2", "amount": 250})
+    store.add_judgment("s1", {"case_number": "x"})
+
+    features = store.get_features_for_property("p1")
+    assert features[0, COLUMN["lien_count"]] == 2
+    assert features[0, COLUMN["total_lien_amount"]] == 5250
+    assert features[0, COLUMN["has_judgments"]] == 1
+
+
+def test_save_load_round_trip(tmp_path):
+    store = RiskFeatureStore(capacity=1)
+    store.upsert_search("s1", SEARCH, property_id="p1")
+    store.upsert_search("s2", dict(SEARCH, liens=[]))
+    store.save(str(tmp_path))
+
+    loaded = RiskFeatureStore.load(str(tmp_path))
+    matrix, found = loaded.get_matrix(["s2", "missing", "s1"])
+    expected, _ = store.get_matrix(["s2", "s1"])
+    assert found.tolist() == [True, False, True]
+    np.testing.assert_array_equal(matrix, expected)
+
+    # Records applied before saving are still de-duplicated after loading
+    loaded.add_lien("s1", {"id": "l1", "amount": 5000})
+    assert loaded.get_features("s1")[0, COLUMN["lien_count"]] == 1
+
+
+def test_dedup_ids_are_bounded_and_evicted_rows_go_stale():
+    store = RiskFeatureStore(dedup_searches=2)
+    for search_id in ("s1", "s2", "s3"):
+        store.upsert_search(search_id, SEARCH)
+
+    # s1's record ids were dropped when s3 was ingested, so its row is recomputed on next use
+    assert store.get_features("s1") is None
+    assert store.get_features("s3") is not None
+    store.add_lien("s1", {"id": "l1", "amount": 5000})
+
+    store.upsert_search("s1", SEARCH)
+    assert store.get_features("s1")[0, COLUMN["lien_count"]] == 1
+    assert store.get_features("s2") is None
+
+
+def test_persist_saves_only_changes(tmp_path, monkeypatch):
+    store = RiskFeatureStore()
+    monkeypatch.setattr(feature_store, "_feature_store", store)
+    monkeypatch.setattr(feature_store, "_saved_changes", 0)
+    monkeypatch.setattr(feature_store, "_write", None)
+    monkeypatch.setattr(feature_store, "RISK_FEATURE_STORE_PATH", str(tmp_path))
+
+    asyncio.run(feature_store.persist_feature_store())
+    assert not (tmp_path / "index.json").exists()
+
+    store.upsert_search("s1", SEARCH)
+    asyncio.run(feature_store.persist_feature_store())
+    saved = (tmp_path / "index.json").stat().st_mtime_ns
+
+    store.add_lien("s1", {"id": "l1", "amount": 5000})
+    asyncio.run(feature_store.persist_feature_store())
+    assert (tmp_path / "index.json").stat().st_mtime_ns == saved
+
+    store.add_lien("s1", {"id": "l2", "amount": 100})
+    asyncio.run(feature_store.persist_feature_store())
+    loaded = RiskFeatureStore.load(str(tmp_path))
+    assert loaded.get_features("s1")[0, COLUMN["lien_count"]] == 2
@@ -0,0 +1,28 @@
+"""
+OIDC Metadata Cache Tests
+Cache lifetimes derived from Cache-Control and Age headers
+"""
+import pytest
+
+from integrations.auth.oidc_cache import (
+    OIDC_CACHE_DEFAULT_TTL,
+    OIDC_CACHE_MAX_TTL,
+    OIDC_CACHE_MIN_TTL,
+    cache_ttl
+)
+
+
+@pytest.mark.parametrize("cache_control, age, expected", [
+    (None, None, OIDC_CACHE_DEFAULT_TTL),
+    ("public", None, OIDC_CACHE_DEFAULT_TTL),
+    ("public, max-age=7200", None, 7200),
+    ("Public, Max-Age=7200", "200", 7000),
+    ("max-age=7200", "not-a-number", 7200),
+    ("max-age=10", None, OIDC_CACHE_MIN_TTL),
+    ("max-age=100", "90", OIDC_CACHE_MIN_TTL),
+    ("max-age=999999", None, OIDC_CACHE_MAX_TTL),
+    ("no-cache", None, OIDC_CACHE_MIN_TTL),
+    ("no-store, max-age=7200", None, OIDC_CACHE_MIN_TTL),
+])
+def test_cache_ttl(cache_control, age, expected):
+    assert cache_ttl(cache_control, age) == expected
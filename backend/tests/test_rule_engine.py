@@ -0,0 +1,99 @@
+"""
+Compliance Rule Engine Tests
+Batch checks must agree with per-transaction checks
+"""
+import pytest
+
+from backend.models.compliance import ComplianceRule
+from models.compliance.rule_engine import STATUS_CODES, ComplianceRuleEngine
+
+EDGE_CASES = [
+    {},
+    {"disclosures": ["loan_estimate", "closing_disclosure", "servicing_disclosure"]},
+    {"disclosures": None, "fees": None, "loan_terms": None},
+    {"disclosures": {"loan_estimate": "le.pdf", "closing_disclosure": "cd.pdf", "servicing_disclosure": "sd.pdf"}},
+    {"fees": {"origination": 1500, "appraisal": 600.5}},
+    {"fees": {"origination": 9000, "title_insurance": 2500}},
+    {"fees": {"origination": "1500"}},
+    {"fees": {"origination": True}},
+    {"fees": [1500, 600]},
+    {"loan_terms": [5.5, 30]},
+    {"loan_terms": {"apr": 75}},
+    {
+        "loan_terms": {
+            "apr": 12.0, "finance_charge": 978.52, "amount_financed": 5000,
+            "total_payments": 5978.52, "payment_amount": 166.07, "term_months": 36
+        }
+    },
+    {
+        "loan_terms": {
+            "apr": 9.0, "finance_charge": 500, "amount_financed": 5000,
+            "total_payments": 5978.52, "payment_amount": 166.07, "term_months": 36
+        }
+    },
+    {"fees": {"documentary_transfer_tax": 1, "recording": 2}, "disclosures": {"transfer_disclosure_statement": 1}},
+    {"fees": {"origination": 16000}, "disclosures": ["seller_disclosure_notice", "property_condition_disclosure"]},
+    {"loan_terms": {"apr": "6.5"}},
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ComplianceRuleEngine()
+
+
+@pytest.mark.parametrize("jurisdiction", ["CA", "NY", "TX", "ZZ"])
+def test_batch_matches_per_transaction(engine, jurisdiction):
+    result = engine.check_compliance_batch(EDGE_CASES, jurisdiction)
+    rule_index = {rule["name"]: col for col, (_, rule) in enumerate(result.rules)}
+
+    for row, transaction in enumerate(EDGE_CASES):
+        checks = [
+            check
+            for rule_type in ComplianceRule
+            for check in engine.check_compliance(rule_type, transaction, jurisdiction)
+        ]
+        assert len(checks) == len(result.rules)
+        for check in checks:
+            batch_status = STATUS_CODES[result.status[row, rule_index[check.rule_name]]]
+            assert batch_status == check.status, (row, check.rule_name, check.violations)
+
+
+def test_invalid_mappings_fail_with_a_message(engine):
+    checks = {
+        check.rule_name: check
+        for rule_type in (ComplianceRule.RESPA, ComplianceRule.TILA)
+        for check in engine.check_compliance(
+            rule_type, {"disclosures": ["loan_estimate"], "fees": [1], "loan_terms": [1]}, "ZZ"
+        )
+    }
+    for check in checks.values():
+        assert check.status == STATUS_CODES[2]
+        assert not any(v.startswith("Error during check") for v in check.violations)
+
+
+def test_recheck_reuses_unchanged_rules(engine):
+    transaction = {"fees": {"origination": 1500}, "loan_terms": {"apr": 6.5}}
+    engine.recheck("search-1", transaction, "ZZ")
+
+    changed = engine.changed_rule_types("search-1", dict(transaction), "ZZ")
+    assert changed == []
+
+    changed = engine.changed_rule_types("search-1", dict(transaction, fees={"origination": 2000}), "ZZ")
+    assert changed == [ComplianceRule.RESPA]
+
+    changed = engine.changed_rule_types("search-1", transaction, "CA")
+    assert changed == [ComplianceRule.RESPA, ComplianceRule.TILA, ComplianceRule.STATE_SPECIFIC]
+    engine.forget("search-1")
+
+
+def test_rules_without_declared_inputs_are_always_rechecked(engine):
+    rule = dict(engine.state_fallback_rule, inputs=None)
+    engine.recheck("search-2", {}, "ZZ", [ComplianceRule.STATE_SPECIFIC])
+    original, engine.state_fallback_rule = engine.state_fallback_rule, rule
+    try:
+        plan, _ = engine.plan_recheck("search-2", {}, "ZZ", [ComplianceRule.STATE_SPECIFIC])
+    finally:
+        engine.state_fallback_rule = original
+        engine.forget("search-2")
+    assert [stale for _, _, stale in plan] == [True]
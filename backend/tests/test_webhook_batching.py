@@ -0,0 +1,78 @@
+"""
+Webhook Batching Tests
+Coalescing and grouping of claimed deliveries into requests
+"""
+import json
+
+from integrations.webhooks.batching import BatchConfig, build_batches, coalesce
+
+
+def delivery(delivery_id, webhook_id, payload, batch_config=None, event_type="title.updated"):
+    return {
+        "delivery_id": delivery_id,
+        "webhook_id": webhook_id,
+        "url": f"https://hooks.example.com/{webhook_id}",
+        "secret": "s3cret",
+        "batch_config": batch_config,
+        "event_type": event_type,
+        "payload": json.dumps(payload),
+        "created_at": delivery_id
+    }
+
+
+def test_batch_config_from_config():
+    assert BatchConfig.from_config(None) is None
+    assert BatchConfig.from_config({}) is None
+    config = BatchConfig.from_config('{"max_events": 0, "max_wait_ms": -5, "coalesce_key": "id"}')
+    assert config == BatchConfig(max_events=1, max_wait_ms=0, coalesce_key="id")
+
+
+def test_coalesce_keeps_latest_per_entity_and_event_type():
+    deliveries = [
+        delivery(1, "w", {"id": "a", "v": 1}),
+        delivery(2, "w", {"id": "b", "v": 1}),
+        delivery(3, "w", {"id": "a", "v": 2}),
+        delivery(4, "w", {"id": "a", "v": 3}, event_type="title.deleted"),
+        delivery(5, "w", {"v": 1}),
+        delivery(6, "w", ["not", "a", "dict"]),
+    ]
+    kept, superseded = coalesce(deliveries, "id")
+    assert [d["delivery_id"] for d in kept] == [2, 3, 4, 5, 6]
+    assert [d["delivery_id"] for d in superseded] == [1]
+
+
+def test_unbatched_webhooks_get_one_request_per_delivery():
+    batches = build_batches([delivery(1, "w", {"id": 1}), delivery(2, "w", {"id": 2})])
+    assert len(batches) == 2
+    assert batches[0].event_type == "title.updated"
+    assert batches[0].payload() == {"id": 1}
+
+
+def test_batched_webhooks_are_grouped_coalesced_and_split():
+    config = {"max_events": 2, "coalesce_key": "id"}
+    deliveries = [
+        delivery(5, "w1", {"id": "c"}, config),
+        delivery(1, "w1", {"id": "a"}, config),
+        delivery(2, "w2", {"id": "x"}, {"max_events": 10}),
+        delivery(3, "w1", {"id": "a"}, config),
+        delivery(4, "w1", {"id": "b"}, config),
+        delivery(6, "w3", {"id": "z"}),
+    ]
+    batches = build_batches(deliveries)
+
+    by_webhook = {}
+    for batch in batches:
+        by_webhook.setdefault(batch.webhook_id, []).append(batch)
+
+    w1 = by_webhook["w1"]
+    assert [[d["delivery_id"] for d in b.deliveries] for b in w1] == [[3, 4], [5]]
+    assert [d["delivery_id"] for d in w1[0].superseded] == [1]
+    assert w1[1].superseded == []
+    assert w1[0].event_type == "batch"
+    assert w1[0].payload() == [
+        {"delivery_id": "3", "event_type": "title.updated", "payload": {"id": "a"}},
+        {"delivery_id": "4", "event_type": "title.updated", "payload": {"id": "b"}}
+    ]
+
+    assert [[d["delivery_id"] for d in b.deliveries] for b in by_webhook["w2"]] == [[2]]
+    assert by_webhook["w3"][0].config is None
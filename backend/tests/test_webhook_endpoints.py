@@ -0,0 +1,161 @@
+"""
+Webhook Endpoint Limits Tests
+Circuit breaker transitions, adaptive concurrency and the retry budget
+"""
+import asyncio
+
+import pytest
+
+from integrations.webhooks import endpoints
+from integrations.webhooks.endpoints import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    EndpointLimiter,
+    RetryBudget,
+    endpoint_key
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(endpoints, "time", fake)
+    return fake
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(failure_rate=0.5, window=10, min_requests=4, open_seconds=30, max_open_seconds=100)
+
+
+def test_endpoint_key():
+    assert endpoint_key("HTTPS://Example.com:8443/hooks/a?x=1") == "https://example.com:8443"
+    assert endpoint_key("https://example.com/a") == endpoint_key("https://example.com/b")
+
+
+def test_breaker_needs_min_requests_before_opening(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+
+def test_breaker_stays_closed_below_failure_rate(clock):
+    breaker = make_breaker()
+    for success in [True, True, False, True, True, False, True]:
+        breaker.record(success)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_half_open_probe_success_closes(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    # Outcomes from before the circuit opened are forgotten
+    breaker.record(False)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_failed_probe_doubles_open_time(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    for expected in [60, 100, 100]:
+        clock.now += breaker.retry_after()
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == expected
+
+
+def test_breaker_release_frees_the_probe(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    clock.now += 30
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_limiter_shrinks_with_latency():
+    async def scenario():
+        limiter = EndpointLimiter(max_concurrency=8, target_latency=0.5)
+        assert limiter.limit == 8
+
+        await limiter.acquire()
+        await limiter.release(2.0)
+        assert limiter.limit == 2
+
+        for _ in range(30):
+            await limiter.acquire()
+            await limiter.release(0.1)
+        assert limiter.limit == 8
+        assert limiter.deliveries == 31
+
+    asyncio.run(scenario())
+
+
+def test_limiter_blocks_at_limit():
+    async def scenario():
+        limiter = EndpointLimiter(max_concurrency=2, target_latency=1.0)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.free_slots == 0
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        assert not waiter.done()
+
+        await limiter.release(0.1)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+        assert limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_retry_budget(clock):
+    budget = RetryBudget(ratio=0.5, min_per_second=1.0, max_tokens=2.0)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    assert budget.rejected == 1
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    clock.now += 1
+    assert budget.withdraw()
@@ -4,10 +4,12 @@ ETL processes for county recorder office data
 """
 import asyncio
 import aiohttp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+from models.risk_scoring.feature_store import get_feature_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -122,6 +124,36 @@ class CountyRecordsIngester:
         except Exception as e:
             logger.error(f"Error fetching encumbrances: {e}")
             return []
+    
+    async def ingest_property(self, property_id: str, search_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Fetch a property's deeds, liens and encumbrances into the risk feature store
+        
+        Args:
+            property_id: Property identifier
+            search_id: Title search to update (default: latest search for the property)
+            
+        Returns:
+            Number of records fetched by type
+        """
+        store = get_feature_store()
+        search_id = search_id or store.search_for_property(property_id)
+        if search_id is None:
+            logger.warning(f"No title search for property {property_id}, skipping ingestion")
+            return {}
+        
+        deeds, liens, encumbrances = await asyncio.gather(
+            self.fetch_deeds(property_id),
+            self.fetch_liens(property_id),
+            self.fetch_encumbrances(property_id)
+        )
+        for deed in deeds:
+            store.add_deed(search_id, deed)
+        for lien in liens:
+            store.add_lien(search_id, lien)
+        for encumbrance in encumbrances:
+            store.add_encumbrance(search_id, encumbrance)
+        return {"deeds": len(deeds), "liens": len(liens), "encumbrances": len(encumbrances)}
 
 
 class CountyScraper:
@@ -8,6 +8,8 @@ from typing import List, Dict, Any
 from datetime import datetime
 import logging
 
+from models.risk_scoring.feature_store import get_feature_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -99,4 +101,27 @@ class CourtRecordsIngester:
         except Exception as e:
             logger.error(f"Error fetching legal actions: {e}")
             return []
-
+    
+    async def ingest_judgments(self, search_id: str, property_address: str) -> int:
+        """
+        Fetch judgments against a property into the risk feature store
+        
+        The search must already be in the store; its row is created from the
+        full search data when the search is processed.
+        
+        Args:
+            search_id: Title search to update
+            property_address: Property address to search
+            
+        Returns:
+            Number of judgments fetched
+        """
+        store = get_feature_store()
+        if search_id not in store:
+            logger.warning(f"Title search {search_id} is not in the feature store, skipping judgments")
+            return 0
+        
+        judgments = await self.fetch_judgments(property_address=property_address)
+        for judgment in judgments:
+            store.add_judgment(search_id, judgment)
+        return len(judgments)
@@ -0,0 +1,38 @@
+"""
+Webhook outbox migration
+Adds scheduling and lease columns used by the webhook delivery dispatcher
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add outbox columns to webhook_deliveries"""
+    op.add_column(
+        'webhook_deliveries',
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'))
+    )
+    op.add_column('webhook_deliveries', sa.Column('locked_until', sa.DateTime(timezone=True)))
+    op.add_column('webhook_deliveries', sa.Column('last_error', sa.Text()))
+    
+    # Dispatchers only scan deliveries that are still in flight
+    op.create_index(
+        'idx_webhook_deliveries_due',
+        'webhook_deliveries',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('pending', 'delivering')")
+    )
+
+
+def downgrade():
+    """Remove outbox columns"""
+    op.drop_index('idx_webhook_deliveries_due', table_name='webhook_deliveries')
+    op.drop_column('webhook_deliveries', 'last_error')
+    op.drop_column('webhook_deliveries', 'locked_until')
+    op.drop_column('webhook_deliveries', 'next_attempt_at')
@@ -0,0 +1,24 @@
+"""
+Webhook batching migration
+Adds opt-in batch delivery settings to webhooks
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add batch_config to webhooks"""
+    # e.g. {"max_events": 100, "max_wait_ms": 1000, "coalesce_key": "order_id"}; NULL = one request per event
+    op.add_column('webhooks', sa.Column('batch_config', postgresql.JSONB))
+
+
+def downgrade():
+    """Remove batch_config"""
+    op.drop_column('webhooks', 'batch_config')
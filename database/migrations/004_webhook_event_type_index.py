@@ -0,0 +1,22 @@
+"""
+Webhook event type index migration
+Indexes active webhooks by subscribed event type for outbox fan-out
+"""
+from alembic import op
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add event type index"""
+    # Outbox fan-out matches subscribers with event_types @> ARRAY[event]
+    op.execute("CREATE INDEX idx_webhooks_event_types ON webhooks USING GIN (event_types) WHERE is_active")
+
+
+def downgrade():
+    """Remove event type index"""
+    op.execute("DROP INDEX IF EXISTS idx_webhooks_event_types")
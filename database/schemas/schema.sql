@@ -175,11 +175,15 @@ CREATE TABLE webhooks (
     event_types TEXT[] NOT NULL,
     secret VARCHAR(255),
     is_active BOOLEAN DEFAULT TRUE,
+    batch_config JSONB, -- opt-in batching: max_events, max_wait_ms, coalesce_key
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     INDEX idx_webhooks_user_id (user_id)
 );
 
+-- Outbox fan-out matches subscribers with event_types @> ARRAY[event]
+CREATE INDEX idx_webhooks_event_types ON webhooks USING GIN (event_types) WHERE is_active;
+
 -- Webhook deliveries table
 CREATE TABLE webhook_deliveries (
     delivery_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -192,6 +196,9 @@ CREATE TABLE webhook_deliveries (
     attempts INTEGER DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     delivered_at TIMESTAMP WITH TIME ZONE,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    locked_until TIMESTAMP WITH TIME ZONE, -- lease held by a dispatcher while delivering
+    last_error TEXT,
     INDEX idx_webhook_deliveries_webhook_id (webhook_id),
     INDEX idx_webhook_deliveries_status (status)
 );
@@ -3,14 +3,37 @@ OAuth 2.0 / OIDC Authentication
 OAuth 2.0 and OpenID Connect integration
 """
 from typing import Optional, Dict, Any
-import aiohttp
-from authlib.integrations.starlette_client import OAuth
+import os
+from authlib.integrations.starlette_client import OAuth, StarletteOAuth2App
 from starlette.config import Config
 import logging
 
+from integrations.auth.oidc_cache import get_oidc_cache
+
 logger = logging.getLogger(__name__)
 
 
+class CachedOAuth2App(StarletteOAuth2App):
+    """OAuth 2.0 / OIDC client reading discovery metadata and JWKS from the shared OIDC cache"""
+    
+    async def load_server_metadata(self):
+        if self._server_metadata_url:
+            self.server_metadata.update(await get_oidc_cache().metadata(self._server_metadata_url))
+        return self.server_metadata
+    
+    async def fetch_jwk_set(self, force=False):
+        # authlib forces a refresh when the ID token's kid is not in the key set
+        metadata = await self.load_server_metadata()
+        if not metadata.get("jwks_uri"):
+            raise RuntimeError('Missing "jwks_uri" in metadata')
+        return await get_oidc_cache().jwks(metadata["jwks_uri"], force=force)
+
+
+class CachedOAuth(OAuth):
+    """OAuth registry whose OAuth 2.0 clients use the shared OIDC cache"""
+    oauth2_client_cls = CachedOAuth2App
+
+
 class OAuthAuthenticator:
     """OAuth 2.0 / OIDC authentication handler"""
     
@@ -22,7 +45,7 @@ class OAuthAuthenticator:
             oauth_config: OAuth configuration dictionary
         """
         self.config = oauth_config
-        self.oauth = OAuth(Config())
+        self.oauth = CachedOAuth(Config())
         
         # Register OAuth providers
         if oauth_config.get("google"):
@@ -52,6 +75,24 @@ class OAuthAuthenticator:
                 server_metadata_url=f"https://{okta_domain}/.well-known/openid-configuration",
                 client_kwargs={"scope": "openid email profile"}
             )
+        
+        self.providers = [
+            name for name, key in (("google", "google"), ("azure", "azure_ad"), ("okta", "okta"))
+            if oauth_config.get(key)
+        ]
+    
+    async def warm_cache(self):
+        """
+        Fetch discovery metadata and JWKS of all providers into the shared cache
+        
+        Call at startup so the first SSO login only pays the token exchange.
+        """
+        for provider in self.providers:
+            try:
+                client = self.oauth.create_client(provider)
+                await client.fetch_jwk_set()
+            except Exception as e:
+                logger.warning(f"Could not prefetch OIDC metadata for {provider}: {e}")
     
     async def get_authorization_url(
         self,
@@ -109,3 +150,36 @@ class OAuthAuthenticator:
             logger.error(f"Error processing OAuth callback: {e}")
             return None
 
+
+def oauth_config_from_env() -> Dict[str, Any]:
+    """OAuth configuration for every provider whose client ID is set in the environment"""
+    config: Dict[str, Any] = {}
+    if os.getenv("GOOGLE_CLIENT_ID"):
+        config["google"] = {
+            "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+            "client_secret": os.getenv("GOOGLE_CLIENT_SECRET")
+        }
+    if os.getenv("AZURE_AD_CLIENT_ID"):
+        config["azure_ad"] = {
+            "client_id": os.getenv("AZURE_AD_CLIENT_ID"),
+            "client_secret": os.getenv("AZURE_AD_CLIENT_SECRET"),
+            "tenant_id": os.getenv("AZURE_AD_TENANT_ID", "common")
+        }
+    if os.getenv("OKTA_CLIENT_ID"):
+        config["okta"] = {
+            "client_id": os.getenv("OKTA_CLIENT_ID"),
+            "client_secret": os.getenv("OKTA_CLIENT_SECRET"),
+            "domain": os.getenv("OKTA_DOMAIN")
+        }
+    return config
+
+
+_oauth_authenticator: Optional[OAuthAuthenticator] = None
+
+
+def get_oauth_authenticator() -> OAuthAuthenticator:
+    """Get the process-wide OAuth authenticator, configured from the environment"""
+    global _oauth_authenticator
+    if _oauth_authenticator is None:
+        _oauth_authenticator = OAuthAuthenticator(oauth_config_from_env())
+    return _oauth_authenticator
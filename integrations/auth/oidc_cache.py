@@ -0,0 +1,194 @@
+"""
+OIDC Metadata Cache
+Shared cache of OpenID Connect discovery documents and JWKS key sets
+"""
+import asyncio
+import os
+import re
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+OIDC_CACHE_DEFAULT_TTL = float(os.getenv("OIDC_CACHE_DEFAULT_TTL", "3600"))
+OIDC_CACHE_MIN_TTL = float(os.getenv("OIDC_CACHE_MIN_TTL", "60"))
+OIDC_CACHE_MAX_TTL = float(os.getenv("OIDC_CACHE_MAX_TTL", "86400"))
+# Forced refreshes (unknown kid) of one URL are at most this often, so
+# tokens with made-up key IDs cannot hammer the provider
+OIDC_FORCED_REFRESH_INTERVAL = float(os.getenv("OIDC_FORCED_REFRESH_INTERVAL", "30"))
+# Fraction of the TTL after which an entry is refreshed in the background
+REFRESH_AFTER = 0.8
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+def cache_ttl(cache_control: Optional[str], age: Optional[str] = None) -> float:
+    """
+    Seconds a response may be cached, from its Cache-Control and Age headers
+
+    Clamped to [OIDC_CACHE_MIN_TTL, OIDC_CACHE_MAX_TTL]; the minimum also
+    applies to no-cache responses so logins never wait on every fetch.
+    """
+    ttl = OIDC_CACHE_DEFAULT_TTL
+    if cache_control:
+        directives = cache_control.lower()
+        match = _MAX_AGE.search(directives)
+        if "no-store" in directives or "no-cache" in directives:
+            ttl = 0
+        elif match:
+            ttl = int(match.group(1)) - (int(age) if age and age.isdigit() else 0)
+    return float(min(max(ttl, OIDC_CACHE_MIN_TTL), OIDC_CACHE_MAX_TTL))
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    fetched_at: float
+    refresh_at: float
+    expires_at: float
+
+
+class OIDCCache:
+    """
+    Cache of JSON documents (discovery metadata, JWKS) by URL
+
+    Entries live as long as the provider's Cache-Control allows and are
+    refreshed in the background once REFRESH_AFTER of that time has
+    passed (a timer is set whenever an entry is stored), so requests keep
+    being served from memory. Concurrent fetches
+    of one URL share a single request, and if a refresh fails the
+    previous document is served until a later refresh succeeds.
+    """
+
+    def __init__(self):
+        """Initialize cache"""
+        self._entries: Dict[str, _Entry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hits = 0
+        self.fetches = 0
+        self.errors = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        self.fetches += 1
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            value = await response.json(content_type=None)
+            ttl = cache_ttl(response.headers.get("Cache-Control"), response.headers.get("Age"))
+
+        now = time.monotonic()
+        self._entries[url] = _Entry(value, now, now + ttl * REFRESH_AFTER, now + ttl)
+        self._schedule_refresh(url, ttl * REFRESH_AFTER)
+        return value
+
+    def _schedule_refresh(self, url: str, delay: float):
+        timer = self._timers.pop(url, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[url] = asyncio.get_running_loop().call_later(delay, self._refresh_in_background, url)
+
+    def _start_fetch(self, url: str) -> asyncio.Task:
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return task
+
+    def _refresh_in_background(self, url: str):
+        if url in self._inflight:
+            return
+
+        def log_failure(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                self.errors += 1
+                logger.warning(f"Background refresh of {url} failed: {task.exception()}")
+                # The cached copy is still served; try again later
+                self._schedule_refresh(url, OIDC_CACHE_MIN_TTL)
+
+        self._start_fetch(url).add_done_callback(log_failure)
+
+    async def get(self, url: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Get a JSON document
+
+        Args:
+            url: Document URL
+            force: Fetch again even if cached (rate-limited per URL)
+
+        Returns:
+            Parsed document
+        """
+        entry = self._entries.get(url)
+        now = time.monotonic()
+        if entry is not None:
+            if force and now - entry.fetched_at < OIDC_FORCED_REFRESH_INTERVAL:
+                force = False
+            if not force and now < entry.expires_at:
+                self.hits += 1
+                if now >= entry.refresh_at:
+                    self._refresh_in_background(url)
+                return entry.value
+
+        try:
+            # Shielded so a cancelled caller does not cancel the shared fetch
+            return await asyncio.shield(self._start_fetch(url))
+        except Exception as e:
+            if entry is None:
+                raise
+            self.errors += 1
+            logger.warning(f"Fetching {url} failed, serving cached copy: {e}")
+            return entry.value
+
+    async def metadata(self, url: str) -> Dict[str, Any]:
+        """OIDC discovery document"""
+        return await self.get(url)
+
+    async def jwks(self, url: str, force: bool = False) -> Dict[str, Any]:
+        """
+        JWKS key set
+
+        Args:
+            url: jwks_uri from the discovery document
+            force: Refresh now, e.g. because a token names an unknown kid
+        """
+        return await self.get(url, force=force)
+
+    async def close(self):
+        """Stop scheduled refreshes and close the HTTP session"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "entries": {url: round(entry.expires_at - now, 1) for url, entry in self._entries.items()},
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "errors": self.errors
+        }
+
+
+_oidc_cache: Optional[OIDCCache] = None
+
+
+def get_oidc_cache() -> OIDCCache:
+    """Get the process-wide OIDC cache shared by all authenticators"""
+    global _oidc_cache
+    if _oidc_cache is None:
+        _oidc_cache = OIDCCache()
+    return _oidc_cache
@@ -0,0 +1,260 @@
+"""
+Qualia Order Tracker
+Poll tracked Qualia orders with conditional requests and report real changes
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from integrations.qualia.qualia_client import QualiaClient
+from integrations.webhooks.events import WebhookEventType
+
+logger = logging.getLogger(__name__)
+
+QUALIA_POLL_INTERVAL = float(os.getenv("QUALIA_POLL_INTERVAL", "60"))
+QUALIA_POLL_CONCURRENCY = int(os.getenv("QUALIA_POLL_CONCURRENCY", "10"))
+# Requests per second across all polls
+QUALIA_RATE_LIMIT = float(os.getenv("QUALIA_RATE_LIMIT", "20"))
+
+OrderChangeCallback = Callable[[WebhookEventType, Dict[str, Any]], Awaitable[None]]
+
+
+class RateLimiter:
+    """Token bucket spacing requests to an average rate with a small burst"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Requests per second
+            burst: Requests allowed back to back
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be made"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class TrackedOrder:
+    """Validators and fingerprint of the last seen version of an order"""
+    order_id: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fingerprint: Optional[str] = None
+    status: Optional[str] = None
+
+
+@dataclass
+class TrackerMetrics:
+    """Running counters for an order tracker"""
+    polls: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+
+
+def order_fingerprint(order: Dict[str, Any]) -> str:
+    """Content hash of an order, independent of key order"""
+    return hashlib.sha256(json.dumps(order, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class OrderTracker:
+    """
+    Track many Qualia orders for status changes
+
+    All polls share the client's pooled session and are limited both in
+    concurrency and in request rate. Each poll sends the order's ETag and
+    Last-Modified validators, so an unchanged order costs a bodiless 304.
+    A full response is compared by content hash as well, so
+    TITLE_ORDER_UPDATED is only emitted when the order really changed.
+    The first fetch of an order records its baseline without an event.
+    """
+
+    def __init__(
+        self,
+        client: Optional[QualiaClient] = None,
+        on_change: Optional[OrderChangeCallback] = None,
+        max_concurrency: int = QUALIA_POLL_CONCURRENCY,
+        rate_limit: float = QUALIA_RATE_LIMIT
+    ):
+        """
+        Initialize order tracker
+
+        Args:
+            client: Qualia client whose session and credentials are used
+            on_change: Called with (TITLE_ORDER_UPDATED, payload) per changed order
+            max_concurrency: Polls in flight at once
+            rate_limit: Requests per second
+        """
+        self.client = client or QualiaClient()
+        self.on_change = on_change
+        self.stats = TrackerMetrics()
+        self._orders: Dict[str, TrackedOrder] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._limiter = RateLimiter(rate_limit, burst=max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def track(self, order_id: str):
+        """Start tracking an order"""
+        self._orders.setdefault(order_id, TrackedOrder(order_id))
+
+    def untrack(self, order_id: str):
+        """Stop tracking an order"""
+        self._orders.pop(order_id, None)
+
+    async def poll_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Poll one tracked order
+
+        Args:
+            order_id: Qualia order ID
+
+        Returns:
+            The order if it changed since the last poll, None otherwise
+        """
+        tracked = self._orders.get(order_id)
+        if tracked is None or not self.client.api_key:
+            return None
+
+        headers = dict(self.client.headers)
+        if tracked.etag:
+            headers["If-None-Match"] = tracked.etag
+        if tracked.last_modified:
+            headers["If-Modified-Since"] = tracked.last_modified
+
+        async with self._semaphore:
+            await self._limiter.acquire()
+            self.stats.polls += 1
+            try:
+                async with self.client.session().get(
+                    f"{self.client.base_url}/orders/{order_id}",
+                    headers=headers
+                ) as response:
+                    if response.status == 304:
+                        self.stats.not_modified += 1
+                        return None
+                    if response.status == 404:
+                        logger.warning(f"Qualia order {order_id} not found, no longer tracking it")
+                        self.untrack(order_id)
+                        return None
+                    if response.status != 200:
+                        self.stats.errors += 1
+                        logger.error(f"Qualia API error polling order {order_id}: {response.status}")
+                        return None
+                    body = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"Error polling Qualia order {order_id}: {e}")
+                return None
+
+        self.stats.bytes_received += len(body)
+        try:
+            order = json.loads(body)
+        except ValueError as e:
+            self.stats.errors += 1
+            logger.error(f"Invalid JSON for Qualia order {order_id}: {e}")
+            return None
+        if not isinstance(order, dict):
+            self.stats.errors += 1
+            logger.error(f"Unexpected response for Qualia order {order_id}: {type(order).__name__}")
+            return None
+        fingerprint = order_fingerprint(order)
+        previous = tracked.fingerprint
+        previous_status = tracked.status
+        tracked.etag = etag
+        tracked.last_modified = last_modified
+        tracked.fingerprint = fingerprint
+        tracked.status = order.get("status")
+
+        if previous is None or previous == fingerprint:
+            if previous is not None:
+                self.stats.unchanged += 1
+            return None
+
+        self.stats.changed += 1
+        if self.on_change is not None:
+            try:
+                await self.on_change(WebhookEventType.TITLE_ORDER_UPDATED, {
+                    "order_id": order_id,
+                    "status": tracked.status,
+                    "previous_status": previous_status,
+                    "order": order
+                })
+            except Exception as e:
+                logger.error(f"Order change callback failed for Qualia order {order_id}: {e}")
+        return order
+
+    async def poll_all(self) -> List[str]:
+        """
+        Poll every tracked order concurrently
+
+        Returns:
+            IDs of orders that changed
+        """
+        order_ids = list(self._orders)
+        results = await asyncio.gather(*(self.poll_order(order_id) for order_id in order_ids))
+        return [order_id for order_id, order in zip(order_ids, results) if order is not None]
+
+    async def _run(self, interval: float):
+        while True:
+            started = time.monotonic()
+            try:
+                changed = await self.poll_all()
+                if changed:
+                    logger.info(f"Qualia order tracker: {len(changed)} of {len(self)} orders changed")
+            except Exception as e:
+                logger.error(f"Qualia order tracker error: {e}")
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def start(self, interval: float = QUALIA_POLL_INTERVAL):
+        """Poll all tracked orders every interval seconds on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self):
+        """Stop polling and close the client's session"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.client.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of tracked orders and poll outcomes"""
+        stats = self.stats
+        return {
+            "tracked": len(self._orders),
+            "polls": stats.polls,
+            "not_modified": stats.not_modified,
+            "unchanged": stats.unchanged,
+            "changed": stats.changed,
+            "errors": stats.errors,
+            "bytes_received": stats.bytes_received
+        }
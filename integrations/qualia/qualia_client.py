@@ -9,18 +9,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+QUALIA_MAX_CONNECTIONS = int(os.getenv("QUALIA_MAX_CONNECTIONS", "20"))
+QUALIA_TIMEOUT = float(os.getenv("QUALIA_TIMEOUT", "30"))
+
 
 class QualiaClient:
     """Qualia API client"""
     
-    def __init__(self):
-        """Initialize Qualia client"""
+    def __init__(self, max_connections: int = QUALIA_MAX_CONNECTIONS):
+        """
+        Initialize Qualia client
+        
+        Args:
+            max_connections: Pooled keep-alive connections to the Qualia API
+        """
         self.api_key = os.getenv("QUALIA_API_KEY")
         self.base_url = os.getenv("QUALIA_BASE_URL", "https://api.qualia.com/v1")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, created on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=QUALIA_TIMEOUT)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
     
     async def create_title_order(
         self,
@@ -61,18 +86,17 @@ class QualiaClient:
             order_data["lender"] = {"name": lender_name}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/orders",
-                    headers=self.headers,
-                    json=order_data
-                ) as response:
-                    if response.status == 201:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Qualia API error: {response.status} - {error_text}")
-                        return None
+            async with self.session().post(
+                f"{self.base_url}/orders",
+                headers=self.headers,
+                json=order_data
+            ) as response:
+                if response.status == 201:
+                    return await response.json()
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Qualia API error: {response.status} - {error_text}")
+                    return None
         except Exception as e:
             logger.error(f"Error creating Qualia order: {e}")
             return None
@@ -83,14 +107,13 @@ class QualiaClient:
             return None
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/orders/{order_id}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
+            async with self.session().get(
+                f"{self.base_url}/orders/{order_id}",
+                headers=self.headers
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                return None
         except Exception as e:
             logger.error(f"Error fetching Qualia order: {e}")
             return None
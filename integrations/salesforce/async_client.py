@@ -0,0 +1,191 @@
+"""
+Async Salesforce Client
+Runs Salesforce calls on a bounded thread pool so they never block the event loop
+"""
+import asyncio
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from integrations.salesforce.batch import RecordResult, SalesforceBatch
+from integrations.salesforce.salesforce_client import SalesforceClient
+
+logger = logging.getLogger(__name__)
+
+SALESFORCE_MAX_WORKERS = int(os.getenv("SALESFORCE_MAX_WORKERS", "4"))
+# Calls waiting for a worker beyond this are rejected rather than queued
+SALESFORCE_MAX_QUEUE = int(os.getenv("SALESFORCE_MAX_QUEUE", "500"))
+
+
+@dataclass
+class SalesforceCallMetrics:
+    """Running counters for an async Salesforce client"""
+    calls: int = 0
+    completed: int = 0
+    errors: int = 0
+    rejected: int = 0
+    total_wait_ms: float = 0.0
+    total_call_ms: float = 0.0
+
+
+class AsyncSalesforceClient:
+    """
+    Async facade over SalesforceClient
+
+    simple_salesforce is synchronous, so every call runs on a dedicated
+    pool of max_workers threads. A slow org can only occupy those threads
+    and the bounded queue in front of them; the event loop and the default
+    executor stay free for unrelated requests. All threads share one
+    session, which is logged into on first use and again when it expires.
+    """
+
+    def __init__(
+        self,
+        client: Optional[SalesforceClient] = None,
+        max_workers: int = SALESFORCE_MAX_WORKERS,
+        max_queue: int = SALESFORCE_MAX_QUEUE
+    ):
+        """
+        Initialize async client
+
+        Args:
+            client: Salesforce client (default: one that logs in lazily)
+            max_workers: Threads making Salesforce calls
+            max_queue: Calls allowed to wait for a thread
+        """
+        self.client = client or SalesforceClient(connect=False)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.stats = SalesforceCallMetrics()
+        # Counters are updated from the event loop and from worker threads
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="salesforce")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking Salesforce call on the pool
+
+        Args:
+            fn: Function to call
+            *args: Positional arguments
+
+        Returns:
+            Function result
+
+        Raises:
+            RuntimeError: If the queue is full
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.stats.rejected += 1
+                raise RuntimeError("Salesforce call queue is full")
+            self._queued += 1
+            self.stats.calls += 1
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        # Guarded by self._lock: whichever of work() and the caller gets there
+        # first decides whether the call starts or is abandoned
+        started = abandoned = False
+
+        def work():
+            nonlocal started
+            with self._lock:
+                if abandoned:
+                    return None
+                started = True
+                began = time.perf_counter()
+                self._queued -= 1
+                self._running += 1
+                self.stats.total_wait_ms += (began - submitted) * 1000
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.stats.completed += 1
+                    self.stats.total_call_ms += (time.perf_counter() - began) * 1000
+
+        try:
+            return await loop.run_in_executor(self._executor, work)
+        except Exception:
+            with self._lock:
+                self.stats.errors += 1
+            raise
+        finally:
+            # Cancelled (or failed to submit) before the call started
+            with self._lock:
+                if not started:
+                    abandoned = True
+                    self._queued -= 1
+
+    async def create_title_order(
+        self,
+        property_address: Dict[str, str],
+        contact_id: str,
+        opportunity_id: str = None
+    ) -> Optional[str]:
+        """See SalesforceClient.create_title_order"""
+        return await self.run(self.client.create_title_order, property_address, contact_id, opportunity_id)
+
+    async def update_title_search_result(
+        self,
+        title_order_id: str,
+        search_result: Dict[str, Any]
+    ) -> bool:
+        """See SalesforceClient.update_title_search_result"""
+        return await self.run(self.client.update_title_search_result, title_order_id, search_result)
+
+    async def create_workflow_task(
+        self,
+        title_order_id: str,
+        task_subject: str,
+        task_description: str
+    ) -> Optional[str]:
+        """See SalesforceClient.create_workflow_task"""
+        return await self.run(self.client.create_workflow_task, title_order_id, task_subject, task_description)
+
+    def batch(self) -> SalesforceBatch:
+        """Start a batch of queued writes; send it with flush(batch)"""
+        return self.client.batch()
+
+    async def flush(self, batch: SalesforceBatch) -> List[RecordResult]:
+        """Send a batch's queued writes on the pool"""
+        return await self.run(batch.flush)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, busy threads and call latency"""
+        stats = self.stats
+        completed = max(stats.completed, 1)
+        return {
+            "queue_depth": self._queued,
+            "running": self._running,
+            "max_workers": self.max_workers,
+            "connected": self.client.connected,
+            "calls": stats.calls,
+            "errors": stats.errors,
+            "rejected": stats.rejected,
+            "avg_wait_ms": stats.total_wait_ms / completed,
+            "avg_call_ms": stats.total_call_ms / completed
+        }
+
+    def close(self):
+        """Stop the thread pool once running calls finish"""
+        self._executor.shutdown(wait=False)
+
+
+_async_salesforce_client: Optional[AsyncSalesforceClient] = None
+
+
+def get_async_salesforce_client() -> AsyncSalesforceClient:
+    """Get the process-wide async Salesforce client, sharing its session and thread pool"""
+    global _async_salesforce_client
+    if _async_salesforce_client is None:
+        _async_salesforce_client = AsyncSalesforceClient()
+    return _async_salesforce_client
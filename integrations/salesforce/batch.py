@@ -0,0 +1,269 @@
+"""
+Salesforce Batch Writes
+Queue record writes and flush them through the sObject Collections or Bulk API
+"""
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from integrations.salesforce.salesforce_client import (
+    SalesforceClient,
+    title_order_data,
+    title_search_update,
+    workflow_task_data
+)
+
+logger = logging.getLogger(__name__)
+
+# sObject Collections accepts at most 200 records per request
+COLLECTION_SIZE = 200
+# Groups of at least this many records of one object and operation use the Bulk API
+BULK_THRESHOLD = int(os.getenv("SALESFORCE_BULK_THRESHOLD", "2000"))
+BULK_BATCH_SIZE = int(os.getenv("SALESFORCE_BULK_BATCH_SIZE", "10000"))
+# Record errors worth one more attempt; others are reported as failures
+RETRYABLE_ERRORS = {"UNABLE_TO_LOCK_ROW", "SERVER_UNAVAILABLE", "REQUEST_LIMIT_EXCEEDED"}
+
+# Bulk API errors are "STATUS_CODE:message:fields", e.g. "UNABLE_TO_LOCK_ROW:unable to obtain exclusive access:--"
+_BULK_STATUS_CODE = re.compile(r"[A-Z][A-Z0-9_]*")
+
+CREATE = "create"
+UPDATE = "update"
+
+
+@dataclass
+class RecordResult:
+    """Outcome of one queued write"""
+    ref: Any
+    sobject: str
+    operation: str
+    success: bool = False
+    id: Optional[str] = None
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def retryable(self) -> bool:
+        return bool(self.errors) and all(e.get("statusCode") in RETRYABLE_ERRORS for e in self.errors)
+
+
+@dataclass
+class _QueuedWrite:
+    ref: Any
+    sobject: str
+    operation: str
+    record: Dict[str, Any]
+
+
+class SalesforceBatch:
+    """
+    Queued Salesforce writes, sent in bulk on flush
+
+    Writes are grouped by object and operation. Groups are sent 200 records
+    per sObject Collections request with allOrNone disabled, so one bad
+    record does not fail the others; groups of BULK_THRESHOLD records or
+    more go through the Bulk API. Every write gets its own RecordResult.
+    Records that fail with a transient error are retried once.
+
+    Records referencing a title order created in the same batch need its
+    ID, so queue them in a later batch.
+    """
+
+    def __init__(self, client: SalesforceClient, bulk_threshold: int = BULK_THRESHOLD):
+        """
+        Initialize batch
+
+        Args:
+            client: Connected Salesforce client
+            bulk_threshold: Group size from which the Bulk API is used
+        """
+        self.client = client
+        self.bulk_threshold = bulk_threshold
+        self.api_calls = 0  # requests made by flushes
+        self._queue: List[_QueuedWrite] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __enter__(self) -> "SalesforceBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def _add(self, sobject: str, operation: str, record: Dict[str, Any], ref: Any) -> Any:
+        ref = len(self._queue) if ref is None else ref
+        self._queue.append(_QueuedWrite(ref, sobject, operation, record))
+        return ref
+
+    def create_title_order(
+        self,
+        property_address: Dict[str, str],
+        contact_id: str,
+        opportunity_id: str = None,
+        ref: Any = None
+    ) -> Any:
+        """
+        Queue a Title Order creation
+
+        Args:
+            property_address: Property address dictionary
+            contact_id: Salesforce Contact ID
+            opportunity_id: Salesforce Opportunity ID (optional)
+            ref: Caller reference reported in the result (default: queue position)
+
+        Returns:
+            Reference of the queued write
+        """
+        record = title_order_data(property_address, contact_id, opportunity_id)
+        return self._add("Title_Order__c", CREATE, record, ref)
+
+    def update_title_search_result(
+        self,
+        title_order_id: str,
+        search_result: Dict[str, Any],
+        ref: Any = None
+    ) -> Any:
+        """
+        Queue a Title Order update with search results
+
+        Args:
+            title_order_id: Salesforce Title Order ID
+            search_result: Title search result dictionary
+            ref: Caller reference reported in the result (default: queue position)
+
+        Returns:
+            Reference of the queued write
+        """
+        record = {"Id": title_order_id, **title_search_update(search_result)}
+        return self._add("Title_Order__c", UPDATE, record, ref)
+
+    def create_workflow_task(
+        self,
+        title_order_id: str,
+        task_subject: str,
+        task_description: str,
+        ref: Any = None
+    ) -> Any:
+        """
+        Queue a workflow task creation
+
+        Args:
+            title_order_id: Salesforce Title Order ID
+            task_subject: Task subject
+            task_description: Task description
+            ref: Caller reference reported in the result (default: queue position)
+
+        Returns:
+            Reference of the queued write
+        """
+        record = workflow_task_data(title_order_id, task_subject, task_description)
+        return self._add("Task", CREATE, record, ref)
+
+    def flush(self) -> List[RecordResult]:
+        """
+        Send all queued writes
+
+        Returns:
+            Results in queue order
+        """
+        queue, self._queue = self._queue, []
+        results = [RecordResult(w.ref, w.sobject, w.operation) for w in queue]
+        if not queue:
+            return results
+        if not self.client.configured:
+            logger.error("Salesforce not connected")
+            for result in results:
+                result.errors = [{"statusCode": "NOT_CONNECTED", "message": "Salesforce not connected"}]
+            return results
+
+        groups: Dict[tuple, List[int]] = {}
+        for idx, write in enumerate(queue):
+            groups.setdefault((write.sobject, write.operation), []).append(idx)
+
+        for (sobject, operation), indices in groups.items():
+            self._send_group(sobject, operation, queue, results, indices)
+            retry = [idx for idx in indices if results[idx].retryable]
+            if retry:
+                logger.info(f"Retrying {len(retry)} {sobject} {operation} records after transient errors")
+                self._send_group(sobject, operation, queue, results, retry)
+
+        failed = [r for r in results if not r.success]
+        if failed:
+            logger.warning(
+                f"Salesforce batch: {len(failed)} of {len(results)} writes failed "
+                f"(first: {failed[0].errors[:1]})"
+            )
+        return results
+
+    def _send_group(
+        self,
+        sobject: str,
+        operation: str,
+        queue: List[_QueuedWrite],
+        results: List[RecordResult],
+        indices: List[int]
+    ):
+        if len(indices) >= self.bulk_threshold:
+            chunks = [indices]
+            send = self._send_bulk
+        else:
+            chunks = [indices[i:i + COLLECTION_SIZE] for i in range(0, len(indices), COLLECTION_SIZE)]
+            send = self._send_collection
+
+        for chunk in chunks:
+            records = [queue[idx].record for idx in chunk]
+            try:
+                responses = send(sobject, operation, records)
+            except Exception as e:
+                logger.error(f"Salesforce {operation} of {len(chunk)} {sobject} records failed: {e}")
+                responses = [
+                    {"success": False, "errors": [{"statusCode": type(e).__name__, "message": str(e)}]}
+                ] * len(chunk)
+
+            for idx, response in zip(chunk, responses):
+                result = results[idx]
+                result.success = bool(response.get("success"))
+                result.id = response.get("id") or queue[idx].record.get("Id")
+                result.errors = [_error(e) for e in response.get("errors") or []]
+
+    def _send_collection(self, sobject: str, operation: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One sObject Collections request; results are in record order"""
+        self.api_calls += 1
+        return self.client.call(lambda sf: sf.restful(
+            "composite/sobjects",
+            method="POST" if operation == CREATE else "PATCH",
+            json={
+                "allOrNone": False,
+                "records": [{"attributes": {"type": sobject}, **record} for record in records]
+            }
+        ))
+
+    def _send_bulk(self, sobject: str, operation: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One Bulk API job; results are in record order"""
+        self.api_calls += 1  # counted per job; the job itself makes a few polling requests
+        if operation == CREATE:
+            return self.client.call(lambda sf: getattr(sf.bulk, sobject).insert(records, batch_size=BULK_BATCH_SIZE))
+        return self.client.call(lambda sf: getattr(sf.bulk, sobject).update(records, batch_size=BULK_BATCH_SIZE))
+
+
+def _error(error: Any) -> Dict[str, Any]:
+    """Normalize Collections and Bulk API record errors"""
+    if isinstance(error, dict):
+        return {
+            "statusCode": error.get("statusCode"),
+            "message": error.get("message"),
+            "fields": error.get("fields", [])
+        }
+    status_code, _, rest = str(error).partition(":")
+    if rest and _BULK_STATUS_CODE.fullmatch(status_code):
+        message, sep, fields = rest.rpartition(":")
+        if not sep:
+            message, fields = rest, ""
+        return {
+            "statusCode": status_code,
+            "message": message,
+            "fields": [f.strip() for f in fields.strip(" -").split(",") if f.strip()]
+        }
+    return {"statusCode": None, "message": str(error), "fields": []}
@@ -3,38 +3,126 @@ Salesforce Integration Client
 Connects to Salesforce API for CRM integration
 """
 import os
-from typing import Dict, Any, List, Optional
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Callable, List, Optional
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
 import logging
 
+if TYPE_CHECKING:
+    from integrations.salesforce.batch import SalesforceBatch
+
 logger = logging.getLogger(__name__)
 
 
+def title_order_data(
+    property_address: Dict[str, str],
+    contact_id: str,
+    opportunity_id: str = None
+) -> Dict[str, Any]:
+    """Title_Order__c fields for a new title order"""
+    data = {
+        "Property_Address__c": f"{property_address.get('street')}, {property_address.get('city')}, {property_address.get('state')} {property_address.get('zip_code')}",
+        "Contact__c": contact_id,
+        "Status__c": "New"
+    }
+    if opportunity_id:
+        data["Opportunity__c"] = opportunity_id
+    return data
+
+
+def title_search_update(search_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Title_Order__c fields updated from a title search result"""
+    return {
+        "Search_Status__c": search_result.get("status"),
+        "Risk_Score__c": search_result.get("risk_score"),
+        "Number_of_Liens__c": len(search_result.get("liens", [])),
+        "Number_of_Encumbrances__c": len(search_result.get("encumbrances", []))
+    }
+
+
+def workflow_task_data(title_order_id: str, task_subject: str, task_description: str) -> Dict[str, Any]:
+    """Task fields for a workflow task on a title order"""
+    return {
+        "WhatId": title_order_id,
+        "Subject": task_subject,
+        "Description": task_description,
+        "Status": "Not Started",
+        "Priority": "Normal"
+    }
+
+
 class SalesforceClient:
     """Salesforce API client"""
     
-    def __init__(self):
-        """Initialize Salesforce client"""
+    def __init__(self, connect: bool = True):
+        """
+        Initialize Salesforce client
+        
+        Args:
+            connect: Log in now; otherwise on first call
+        """
         self.username = os.getenv("SALESFORCE_USERNAME")
         self.password = os.getenv("SALESFORCE_PASSWORD")
         self.security_token = os.getenv("SALESFORCE_SECURITY_TOKEN")
         self.domain = os.getenv("SALESFORCE_DOMAIN", "login")
+        self.configured = bool(self.username and self.password)
+        self.sf: Optional[Salesforce] = None
+        self.connected = False
+        self._login_lock = threading.Lock()
         
-        if self.username and self.password:
-            try:
-                self.sf = Salesforce(
-                    username=self.username,
-                    password=self.password,
-                    security_token=self.security_token,
-                    domain=self.domain
-                )
-                self.connected = True
-            except Exception as e:
-                logger.error(f"Failed to connect to Salesforce: {e}")
-                self.connected = False
-        else:
-            self.connected = False
+        if not self.configured:
             logger.warning("Salesforce credentials not configured")
+        elif connect:
+            self.login()
+    
+    def login(self) -> bool:
+        """
+        Log in and replace the session
+        
+        Returns:
+            True if logged in, False otherwise
+        """
+        try:
+            self.sf = Salesforce(
+                username=self.username,
+                password=self.password,
+                security_token=self.security_token,
+                domain=self.domain
+            )
+            self.connected = True
+        except Exception as e:
+            logger.error(f"Failed to connect to Salesforce: {e}")
+            self.connected = False
+        return self.connected
+    
+    def _session(self, stale: Optional[Salesforce] = None) -> Salesforce:
+        """Current session, logging in if there is none or it is the stale one"""
+        with self._login_lock:
+            # Another thread may have logged in while this one waited
+            if self.sf is None or self.sf is stale:
+                if not self.configured or not self.login():
+                    raise RuntimeError("Salesforce not connected")
+            return self.sf
+    
+    def call(self, operation: Callable[[Salesforce], Any]) -> Any:
+        """
+        Run an operation with the shared session
+        
+        Logs in on first use, and once more if the session has expired.
+        
+        Args:
+            operation: Function of the Salesforce session
+            
+        Returns:
+            Operation result
+        """
+        sf = self.sf if self.sf is not None else self._session()
+        try:
+            return operation(sf)
+        except SalesforceExpiredSession:
+            logger.info("Salesforce session expired, logging in again")
+            return operation(self._session(stale=sf))
     
     def create_title_order(
         self,
@@ -53,22 +141,15 @@ class SalesforceClient:
         Returns:
             Salesforce record ID or None
         """
-        if not self.connected:
+        if not self.configured:
             logger.error("Salesforce not connected")
             return None
         
         try:
             # Create Title Order record
-            title_order_data = {
-                "Property_Address__c": f"{property_address.get('street')}, {property_address.get('city')}, {property_address.get('state')} {property_address.get('zip_code')}",
-                "Contact__c": contact_id,
-                "Status__c": "New"
-            }
-            
-            if opportunity_id:
-                title_order_data["Opportunity__c"] = opportunity_id
-            
-            result = self.sf.Title_Order__c.create(title_order_data)
+            result = self.call(lambda sf: sf.Title_Order__c.create(
+                title_order_data(property_address, contact_id, opportunity_id)
+            ))
             return result.get("id")
         except Exception as e:
             logger.error(f"Error creating Title Order in Salesforce: {e}")
@@ -89,18 +170,11 @@ class SalesforceClient:
         Returns:
             True if successful, False otherwise
         """
-        if not self.connected:
+        if not self.configured:
             return False
         
         try:
-            update_data = {
-                "Search_Status__c": search_result.get("status"),
-                "Risk_Score__c": search_result.get("risk_score"),
-                "Number_of_Liens__c": len(search_result.get("liens", [])),
-                "Number_of_Encumbrances__c": len(search_result.get("encumbrances", []))
-            }
-            
-            self.sf.Title_Order__c.update(title_order_id, update_data)
+            self.call(lambda sf: sf.Title_Order__c.update(title_order_id, title_search_update(search_result)))
             return True
         except Exception as e:
             logger.error(f"Error updating Title Order in Salesforce: {e}")
@@ -123,21 +197,29 @@ class SalesforceClient:
         Returns:
             Task ID or None
         """
-        if not self.connected:
+        if not self.configured:
             return None
         
         try:
-            task_data = {
-                "WhatId": title_order_id,
-                "Subject": task_subject,
-                "Description": task_description,
-                "Status": "Not Started",
-                "Priority": "Normal"
-            }
-            
-            result = self.sf.Task.create(task_data)
+            result = self.call(lambda sf: sf.Task.create(
+                workflow_task_data(title_order_id, task_subject, task_description)
+            ))
             return result.get("id")
         except Exception as e:
             logger.error(f"Error creating task in Salesforce: {e}")
             return None
+    
+    def batch(self) -> "SalesforceBatch":
+        """
+        Start a batch of queued writes
+        
+        Use for bulk syncs: writes are sent 200 per request through the
+        sObject Collections API (or the Bulk API for large jobs) when the
+        batch is flushed, instead of one request per record.
+        
+        Returns:
+            SalesforceBatch (flushed on leaving a with block)
+        """
+        from integrations.salesforce.batch import SalesforceBatch
+        return SalesforceBatch(self)
 
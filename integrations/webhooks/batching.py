@@ -0,0 +1,143 @@
+"""
+Webhook Batching
+Group queued deliveries into batched, coalesced requests per subscriber
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class BatchConfig:
+    """
+    Batch delivery settings of a webhook (webhooks.batch_config)
+
+    Attributes:
+        max_events: Events sent per request
+        max_wait_ms: How long events are held back so more can accumulate
+        coalesce_key: Payload field identifying the entity an event updates;
+            when set, only the latest event per (event type, key) is sent
+    """
+    max_events: int = 100
+    max_wait_ms: int = 1000
+    coalesce_key: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["BatchConfig"]:
+        """Parse a batch_config column value; None means batching is off"""
+        if isinstance(config, str):
+            config = json.loads(config)
+        if not config:
+            return None
+        return cls(
+            max_events=max(1, int(config.get("max_events", cls.max_events))),
+            max_wait_ms=max(0, int(config.get("max_wait_ms", cls.max_wait_ms))),
+            coalesce_key=config.get("coalesce_key")
+        )
+
+
+@dataclass
+class DeliveryBatch:
+    """Deliveries sent to one webhook in one request"""
+    webhook_id: Any
+    url: str
+    secret: Optional[str]
+    config: Optional[BatchConfig]
+    deliveries: List[Dict[str, Any]] = field(default_factory=list)
+    superseded: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def event_type(self) -> str:
+        return self.deliveries[0]["event_type"] if self.config is None else "batch"
+
+    def payload(self) -> Any:
+        """Request body: the event payload, or an array of events when batched"""
+        if self.config is None:
+            return _payload(self.deliveries[0])
+        return [
+            {
+                "delivery_id": str(delivery["delivery_id"]),
+                "event_type": delivery["event_type"],
+                "payload": _payload(delivery)
+            }
+            for delivery in self.deliveries
+        ]
+
+
+def _payload(delivery: Dict[str, Any]) -> Any:
+    payload = delivery["payload"]
+    return json.loads(payload) if isinstance(payload, str) else payload
+
+
+def coalesce(deliveries: List[Dict[str, Any]], key: str):
+    """
+    Drop events superseded by a later event for the same entity
+
+    Args:
+        deliveries: Deliveries in event order
+        key: Payload field identifying the entity
+
+    Returns:
+        (deliveries to send, superseded deliveries)
+    """
+    entities = []
+    latest: Dict[Any, int] = {}
+    for idx, delivery in enumerate(deliveries):
+        payload = _payload(delivery)
+        entity = payload.get(key) if isinstance(payload, dict) else None
+        entities.append(entity)
+        if entity is not None:
+            latest[(delivery["event_type"], json.dumps(entity, sort_keys=True, default=str))] = idx
+
+    keep = set(latest.values())
+    kept, superseded = [], []
+    for idx, (delivery, entity) in enumerate(zip(deliveries, entities)):
+        (kept if entity is None or idx in keep else superseded).append(delivery)
+    return kept, superseded
+
+
+def build_batches(deliveries: List[Dict[str, Any]]) -> List[DeliveryBatch]:
+    """
+    Group claimed deliveries into requests
+
+    Deliveries to webhooks without batch_config are sent one per request.
+    Deliveries to batching webhooks are grouped per webhook in event order,
+    coalesced if configured, and split into requests of max_events.
+
+    Args:
+        deliveries: Claimed delivery rows (with webhook_id, url, secret,
+            batch_config, event_type, payload, created_at)
+
+    Returns:
+        Delivery batches
+    """
+    batches: List[DeliveryBatch] = []
+    grouped: Dict[Any, List[Dict[str, Any]]] = {}
+
+    for delivery in deliveries:
+        config = BatchConfig.from_config(delivery.get("batch_config"))
+        if config is None:
+            batches.append(DeliveryBatch(
+                delivery["webhook_id"], delivery["url"], delivery["secret"], None, [delivery]
+            ))
+        else:
+            grouped.setdefault(delivery["webhook_id"], []).append(delivery)
+
+    for webhook_id, group in grouped.items():
+        group.sort(key=lambda d: d["created_at"])
+        first = group[0]
+        config = BatchConfig.from_config(first["batch_config"])
+        superseded = []
+        if config.coalesce_key:
+            group, superseded = coalesce(group, config.coalesce_key)
+
+        first_batch = len(batches)
+        for start in range(0, len(group), config.max_events):
+            batches.append(DeliveryBatch(
+                webhook_id, first["url"], first["secret"], config,
+                group[start:start + config.max_events]
+            ))
+        # Superseded events are settled together with the group's first request
+        batches[first_batch].superseded = superseded
+
+    return batches
@@ -0,0 +1,241 @@
+"""
+Webhook Endpoint Limits
+Per-endpoint concurrency limits, circuit breakers and the global retry budget
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+
+
+def endpoint_key(url: str) -> str:
+    """Endpoint identity for limits and statistics: scheme, host and port"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class EndpointLimiter:
+    """
+    Concurrency limit and latency statistics for one endpoint
+
+    The limit shrinks in proportion to how far the endpoint's average
+    latency exceeds target_latency, so a slow receiver holds only a few
+    delivery slots and cannot tie up the global in-flight budget.
+    """
+
+    def __init__(self, max_concurrency: int, target_latency: float):
+        """
+        Initialize limiter
+
+        Args:
+            max_concurrency: Concurrent deliveries allowed for a fast endpoint
+            target_latency: Latency (seconds) at or below which the full limit applies
+        """
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.waiting = 0
+        self.latency_ewma: Optional[float] = None
+        self.deliveries = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit"""
+        if not self.latency_ewma or self.latency_ewma <= self.target_latency:
+            return self.max_concurrency
+        return max(1, int(self.max_concurrency * self.target_latency / self.latency_ewma))
+
+    async def acquire(self):
+        """Wait for a delivery slot"""
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, latency: float):
+        """Release a slot and record the attempt's latency"""
+        async with self._condition:
+            self.in_flight -= 1
+            self.deliveries += 1
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += LATENCY_EWMA_ALPHA * (latency - self.latency_ewma)
+            self._condition.notify_all()
+
+    @property
+    def free_slots(self) -> int:
+        """Slots not taken by deliveries in flight or already waiting"""
+        return max(self.limit - self.in_flight - self.waiting, 0)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "limit": self.limit,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma else None,
+            "deliveries": self.deliveries
+        }
+
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one endpoint
+
+    The circuit opens when at least failure_rate of the last window
+    attempts failed. While open, deliveries are refused without a request.
+    Once open_seconds have passed, one probe is let through (half-open):
+    success closes the circuit, failure reopens it for twice as long, up
+    to max_open_seconds.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window: int,
+        min_requests: int,
+        open_seconds: float,
+        max_open_seconds: float
+    ):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_rate: Fraction of failed attempts that opens the circuit
+            window: Recent attempts the failure rate is computed over
+            min_requests: Attempts in the window before the circuit can open
+            open_seconds: Time before the first probe of an open circuit
+            max_open_seconds: Upper bound of the doubling open time
+        """
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._open_for = open_seconds
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether an attempt may be made now; may start a half-open probe"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self._opened_at + self._open_for:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self):
+        """Give back an allowed attempt that was not made"""
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """Seconds until an attempt may be allowed"""
+        if self.state == OPEN:
+            return max(0.0, self._opened_at + self._open_for - time.monotonic())
+        if self.state == HALF_OPEN:
+            return self.open_seconds
+        return 0.0
+
+    def record(self, success: bool):
+        """Record the outcome of an allowed attempt"""
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if success:
+                self.state = CLOSED
+                self._outcomes.clear()
+                self._open_for = self.open_seconds
+            else:
+                self._open(min(self._open_for * 2, self.max_open_seconds))
+            return
+
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if (
+            self.state == CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and failures >= self.failure_rate * len(self._outcomes)
+        ):
+            self._open(self.open_seconds)
+
+    def _open(self, open_for: float):
+        self.state = OPEN
+        self.opened += 1
+        self._open_for = open_for
+        self._opened_at = time.monotonic()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self._outcomes.count(False) / len(self._outcomes), 3) if self._outcomes else 0.0,
+            "retry_after_s": round(self.retry_after(), 1),
+            "opened": self.opened
+        }
+
+
+class RetryBudget:
+    """
+    Global budget capping retries relative to first attempts
+
+    Every first attempt earns ratio retry tokens and min_per_second tokens
+    accrue over time; a retry spends one token. When endpoints fail en
+    masse, retries are capped at a fraction of new traffic instead of
+    multiplying it.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = 100.0):
+        """
+        Initialize retry budget
+
+        Args:
+            ratio: Retry tokens earned per first attempt
+            min_per_second: Retry tokens accrued per second regardless of traffic
+            max_tokens: Token cap
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.rejected = 0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        """Record a first attempt"""
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for a retry; False when the budget is exhausted"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.rejected += 1
+        return False
+
+    def metrics(self) -> Dict[str, Any]:
+        self._refill()
+        return {"tokens": round(self.tokens, 1), "rejected": self.rejected}
@@ -0,0 +1,422 @@
+"""
+Webhook Outbox
+Transactional webhook outbox and background delivery dispatcher
+
+Usage:
+    python -m integrations.webhooks.outbox --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.utils.database import AsyncSessionLocal
+from backend.utils.logging import setup_logging
+from integrations.webhooks.batching import BatchConfig, DeliveryBatch, build_batches
+from integrations.webhooks.endpoints import endpoint_key
+from integrations.webhooks.webhook_handler import WebhookHandler, get_webhook_handler
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("WEBHOOK_OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("WEBHOOK_OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_BASE_DELAY = float(os.getenv("WEBHOOK_OUTBOX_BASE_DELAY", "5"))
+OUTBOX_MAX_DELAY = float(os.getenv("WEBHOOK_OUTBOX_MAX_DELAY", "3600"))
+# A claimed delivery not finished within the lease is picked up again (e.g. after a crash)
+OUTBOX_LEASE_SECONDS = int(os.getenv("WEBHOOK_OUTBOX_LEASE_SECONDS", "120"))
+
+# Delivery statuses
+PENDING = "pending"
+DELIVERING = "delivering"
+DELIVERED = "delivered"
+FAILED = "failed"
+SUPERSEDED = "superseded"  # coalesced away by a later event for the same entity
+
+_ENQUEUE_SQL = text("""
+    INSERT INTO webhook_deliveries (webhook_id, event_type, payload, status, next_attempt_at)
+    SELECT webhook_id, :event_type, CAST(:payload AS JSONB), :status,
+           -- Batching webhooks hold events back so a batch can accumulate
+           CURRENT_TIMESTAMP + make_interval(secs => COALESCE((batch_config->>'max_wait_ms')::float8, 0) / 1000)
+    FROM webhooks
+    WHERE is_active AND event_types @> ARRAY[CAST(:event_type AS TEXT)]
+""")
+
+# Due deliveries, plus the held-back first attempts of batching webhooks that
+# already have max_events of them, so a full batch does not wait out
+# max_wait_ms. Deliveries deferred past their batching window (retries, open
+# circuits) are not held back and keep their schedule.
+_CLAIM_TEMPLATE = f"""
+    WITH held_back AS (
+        SELECT d.delivery_id,
+               COUNT(*) OVER (PARTITION BY d.webhook_id) AS queued,
+               GREATEST(COALESCE((w.batch_config->>'max_events')::int, {BatchConfig.max_events}), 1) AS max_events
+        FROM webhook_deliveries d
+        JOIN webhooks w ON w.webhook_id = d.webhook_id
+        WHERE d.status = :pending AND d.attempts = 0 AND d.next_attempt_at > CURRENT_TIMESTAMP
+          AND w.batch_config IS NOT NULL
+          AND d.next_attempt_at <= d.created_at
+              + make_interval(secs => COALESCE((w.batch_config->>'max_wait_ms')::float8, 0) / 1000)
+    ),
+    claimed AS (
+        SELECT delivery_id
+        FROM webhook_deliveries
+        WHERE ((status = :pending AND next_attempt_at <= CURRENT_TIMESTAMP)
+           OR (status = :pending AND delivery_id IN (SELECT delivery_id FROM held_back WHERE queued >= max_events))
+           OR (status = :delivering AND locked_until < CURRENT_TIMESTAMP))
+          {{webhook_filter}}
+        ORDER BY next_attempt_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE webhook_deliveries d
+    SET status = :delivering,
+        attempts = d.attempts + 1,
+        locked_until = CURRENT_TIMESTAMP + make_interval(secs => :lease_seconds)
+    FROM claimed, webhooks w
+    WHERE d.delivery_id = claimed.delivery_id AND w.webhook_id = d.webhook_id
+    RETURNING d.delivery_id, d.webhook_id, d.event_type, d.payload, d.attempts, d.created_at,
+              d.locked_until, w.url, w.secret, w.batch_config
+"""
+
+_CLAIM_SQL = text(_CLAIM_TEMPLATE.format(webhook_filter=""))
+
+# Tops up a batching webhook's claim so one request carries up to max_events
+_CLAIM_WEBHOOK_SQL = text(_CLAIM_TEMPLATE.format(webhook_filter="AND webhook_id = :webhook_id"))
+
+# Write-backs only apply while the row is still under this claim's lease
+# (locked_until acts as the claim token): once the lease expires and another
+# worker re-claims the row, a late write-back from the first worker matches nothing
+_CLAIMED = "delivery_id = :delivery_id AND status = :delivering AND locked_until = :locked_until"
+
+_DELIVERED_SQL = text(f"""
+    UPDATE webhook_deliveries
+    SET status = :status, response_code = :response_code, delivered_at = CURRENT_TIMESTAMP,
+        locked_until = NULL, last_error = NULL
+    WHERE {_CLAIMED}
+""")
+
+_SUPERSEDED_SQL = text(f"""
+    UPDATE webhook_deliveries
+    SET status = :status, locked_until = NULL
+    WHERE {_CLAIMED}
+""")
+
+# A deferred attempt was never made, so it does not count against max attempts
+_DEFER_SQL = text(f"""
+    UPDATE webhook_deliveries
+    SET status = :status, attempts = attempts - 1, locked_until = NULL,
+        next_attempt_at = CURRENT_TIMESTAMP + make_interval(secs => :delay)
+    WHERE {_CLAIMED}
+""")
+
+# Holds back a webhook's queued deliveries while its endpoint's circuit is open,
+# so they are not claimed until the endpoint is probed again
+_DEFER_WEBHOOK_SQL = text("""
+    UPDATE webhook_deliveries
+    SET next_attempt_at = CURRENT_TIMESTAMP + make_interval(secs => :delay)
+    WHERE webhook_id = :webhook_id AND status = :status
+      AND next_attempt_at < CURRENT_TIMESTAMP + make_interval(secs => :delay)
+""")
+
+_RETRY_SQL = text(f"""
+    UPDATE webhook_deliveries
+    SET status = :status, response_code = :response_code, response_body = :response_body,
+        last_error = :last_error, locked_until = NULL,
+        next_attempt_at = CURRENT_TIMESTAMP + make_interval(secs => :delay)
+    WHERE {_CLAIMED}
+""")
+
+
+async def enqueue_webhook_event(
+    session: AsyncSession,
+    event_type: str,
+    payload: Dict[str, Any]
+) -> int:
+    """
+    Queue an event for every active webhook subscribed to it
+
+    Runs in the caller's session and is committed (or rolled back) together
+    with the caller's business change. Returns without waiting for delivery.
+
+    Args:
+        session: Caller's database session
+        event_type: Event type
+        payload: JSON-serializable payload
+
+    Returns:
+        Number of deliveries queued
+    """
+    result = await session.execute(_ENQUEUE_SQL, {
+        "event_type": event_type,
+        "payload": json.dumps(payload),
+        "status": PENDING
+    })
+    return result.rowcount
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter
+
+    The delay doubles with every attempt up to OUTBOX_MAX_DELAY; the upper
+    half is randomized so deliveries that failed together do not retry together.
+
+    Args:
+        attempts: Attempts made so far
+
+    Returns:
+        Seconds until the next attempt
+    """
+    delay = min(OUTBOX_MAX_DELAY, OUTBOX_BASE_DELAY * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class WebhookDispatcher:
+    """
+    Deliver queued webhook events from webhook_deliveries
+
+    Each worker claims a batch of due deliveries with FOR UPDATE SKIP
+    LOCKED, so any number of workers and processes can dispatch in parallel
+    without delivering the same row twice. Claimed rows are leased rather
+    than held locked while HTTP requests are in flight.
+    
+    Deliveries to an endpoint whose circuit is open stay queued until the
+    handler's next probe of that endpoint, and retries the handler's retry
+    budget refuses are pushed back; neither spends an attempt.
+    
+    Only as many batches per endpoint are sent as the endpoint has free
+    slots; the rest are returned to the queue at once rather than waiting
+    for a slot while their lease runs out.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        handler: Optional[WebhookHandler] = None,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ):
+        """
+        Initialize dispatcher
+
+        Args:
+            session_factory: Database session factory
+            handler: Webhook handler used for delivery attempts
+            batch_size: Deliveries claimed per round
+            poll_interval: Seconds to wait when no deliveries are due
+            max_attempts: Attempts before a delivery is marked failed
+        """
+        self.session_factory = session_factory
+        self.handler = handler or get_webhook_handler()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        params = {
+            "pending": PENDING,
+            "delivering": DELIVERING,
+            "batch_size": self.batch_size,
+            "lease_seconds": OUTBOX_LEASE_SECONDS
+        }
+        async with self.session_factory() as session:
+            result = await session.execute(_CLAIM_SQL, params)
+            rows = [dict(row) for row in result.mappings()]
+
+            claimed: Dict[Any, int] = {}
+            configs: Dict[Any, BatchConfig] = {}
+            for row in rows:
+                config = BatchConfig.from_config(row["batch_config"])
+                if config is not None:
+                    claimed[row["webhook_id"]] = claimed.get(row["webhook_id"], 0) + 1
+                    configs[row["webhook_id"]] = config
+            for webhook_id, count in claimed.items():
+                if count < configs[webhook_id].max_events:
+                    result = await session.execute(_CLAIM_WEBHOOK_SQL, {
+                        **params,
+                        "webhook_id": webhook_id,
+                        "batch_size": configs[webhook_id].max_events - count
+                    })
+                    rows.extend(dict(row) for row in result.mappings())
+
+            await session.commit()
+        return rows
+
+    async def _send(self, batch: DeliveryBatch) -> Dict[str, Any]:
+        return await self.handler.attempt_delivery(
+            url=batch.url,
+            event_type=batch.event_type,
+            payload=batch.payload(),
+            secret=batch.secret,
+            delivery_id=str(batch.deliveries[0]["delivery_id"]) if batch.config is None else None,
+            retry=any(delivery["attempts"] > 1 for delivery in batch.deliveries)
+        )
+
+    async def _update(self, session: AsyncSession, sql: Any, delivery: Dict[str, Any], params: Dict[str, Any]):
+        """Write back a claimed delivery; skipped if the claim was lost meanwhile"""
+        result = await session.execute(sql, {
+            **params,
+            "delivery_id": delivery["delivery_id"],
+            "delivering": DELIVERING,
+            "locked_until": delivery["locked_until"]
+        })
+        if result.rowcount == 0:
+            logger.warning(
+                f"Webhook delivery {delivery['delivery_id']} lease expired before its result "
+                f"was recorded; leaving it to the worker that re-claimed it"
+            )
+
+    async def _record(self, batches: List[DeliveryBatch], results: List[Dict[str, Any]]):
+        async with self.session_factory() as session:
+            for batch, result in zip(batches, results):
+                for delivery in batch.superseded:
+                    await self._update(session, _SUPERSEDED_SQL, delivery, {"status": SUPERSEDED})
+                if result.get("deferred"):
+                    await self._defer(session, batch, result)
+                    continue
+                for delivery in batch.deliveries:
+                    await self._record_delivery(session, delivery, result)
+            await session.commit()
+    
+    async def _defer(self, session: AsyncSession, batch: DeliveryBatch, result: Dict[str, Any]):
+        """Return a batch that was not attempted to the queue"""
+        # Spread deferred deliveries so they do not all come due at once
+        delay = result["retry_after"] + random.uniform(0, OUTBOX_POLL_INTERVAL)
+        for delivery in batch.deliveries:
+            await self._update(session, _DEFER_SQL, delivery, {"status": PENDING, "delay": delay})
+        if result.get("circuit_open"):
+            await session.execute(_DEFER_WEBHOOK_SQL, {
+                "webhook_id": batch.webhook_id,
+                "status": PENDING,
+                "delay": delay
+            })
+
+    async def _record_delivery(self, session: AsyncSession, delivery: Dict[str, Any], result: Dict[str, Any]):
+        """Mark a delivery delivered, or schedule its retry"""
+        if result["success"]:
+            await self._update(session, _DELIVERED_SQL, delivery, {
+                "status": DELIVERED,
+                "response_code": result["status_code"]
+            })
+            return
+
+        exhausted = delivery["attempts"] >= self.max_attempts
+        if exhausted:
+            logger.error(
+                f"Webhook delivery {delivery['delivery_id']} to {delivery['url']} failed "
+                f"after {delivery['attempts']} attempts: {result['error']}"
+            )
+        await self._update(session, _RETRY_SQL, delivery, {
+            "status": FAILED if exhausted else PENDING,
+            "response_code": result["status_code"],
+            "response_body": result["response_body"],
+            "last_error": result["error"],
+            "delay": 0 if exhausted else retry_delay(delivery["attempts"])
+        })
+
+    async def dispatch_once(self) -> int:
+        """
+        Claim and deliver one batch of due deliveries
+
+        Returns:
+            Number of deliveries attempted
+        """
+        deliveries = await self._claim()
+        if not deliveries:
+            return 0
+
+        batches, busy = self._fit_endpoint_slots(build_batches(deliveries))
+        results = await asyncio.gather(*(self._send(b) for b in batches), return_exceptions=True)
+        results = [
+            r if not isinstance(r, BaseException)
+            else {"success": False, "status_code": None, "response_body": None, "error": str(r)}
+            for r in results
+        ]
+        busy_result = {
+            "success": False,
+            "status_code": None,
+            "response_body": None,
+            "error": "endpoint busy",
+            "deferred": True,
+            "retry_after": self.poll_interval
+        }
+        await self._record(batches + busy, results + [busy_result] * len(busy))
+        return sum(len(batch.deliveries) for batch in batches)
+    
+    def _fit_endpoint_slots(self, batches: List[DeliveryBatch]):
+        """Split batches into those the endpoints can take now and the rest"""
+        slots: Dict[str, int] = {}
+        ready, busy = [], []
+        for batch in batches:
+            key = endpoint_key(batch.url)
+            if key not in slots:
+                slots[key] = self.handler.endpoint_slots(batch.url)
+            if slots[key] > 0:
+                slots[key] -= 1
+                ready.append(batch)
+            else:
+                busy.append(batch)
+        if busy:
+            logger.debug(f"Returned {len(busy)} webhook batches to the queue, endpoints busy")
+        return ready, busy
+
+    async def _run_worker(self, worker_id: int):
+        logger.info(f"Webhook dispatcher worker {worker_id} started")
+        while not self._stopping.is_set():
+            try:
+                attempted = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Webhook dispatcher worker {worker_id} error: {e}")
+                attempted = 0
+
+            # Keep draining while there is a backlog; otherwise poll
+            if attempted < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        logger.info(f"Webhook dispatcher worker {worker_id} stopped")
+
+    def start(self, workers: int = 1):
+        """Start dispatcher workers on the running event loop"""
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._run_worker(i)) for i in range(workers)]
+
+    async def stop(self):
+        """Stop workers after their current batch"""
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+async def _serve(workers: int):
+    dispatcher = WebhookDispatcher()
+    dispatcher.start(workers)
+    try:
+        await asyncio.gather(*dispatcher._tasks)
+    finally:
+        await dispatcher.stop()
+        await dispatcher.handler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEBHOOK_DISPATCHER_WORKERS", "2")))
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(_serve(args.workers))
+
+
+if __name__ == "__main__":
+    main()
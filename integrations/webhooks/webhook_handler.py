@@ -7,20 +7,134 @@ import aiohttp
 import hmac
 import hashlib
 import json
-from typing import Dict, Any, List, Optional
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import logging
 
+from integrations.webhooks.endpoints import CircuitBreaker, EndpointLimiter, RetryBudget, endpoint_key
+
 logger = logging.getLogger(__name__)
 
+# Characters of a failed response body kept for diagnostics
+MAX_RESPONSE_BODY = 2000
+
+WEBHOOK_MAX_IN_FLIGHT = int(os.getenv("WEBHOOK_MAX_IN_FLIGHT", "200"))
+WEBHOOK_MAX_PER_ENDPOINT = int(os.getenv("WEBHOOK_MAX_PER_ENDPOINT", "8"))
+WEBHOOK_TARGET_LATENCY = float(os.getenv("WEBHOOK_TARGET_LATENCY", "1.0"))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "30"))
+
+WEBHOOK_CIRCUIT_FAILURE_RATE = float(os.getenv("WEBHOOK_CIRCUIT_FAILURE_RATE", "0.5"))
+WEBHOOK_CIRCUIT_WINDOW = int(os.getenv("WEBHOOK_CIRCUIT_WINDOW", "20"))
+WEBHOOK_CIRCUIT_MIN_REQUESTS = int(os.getenv("WEBHOOK_CIRCUIT_MIN_REQUESTS", "5"))
+WEBHOOK_CIRCUIT_OPEN_SECONDS = float(os.getenv("WEBHOOK_CIRCUIT_OPEN_SECONDS", "30"))
+WEBHOOK_CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("WEBHOOK_CIRCUIT_MAX_OPEN_SECONDS", "600"))
+WEBHOOK_RETRY_BUDGET_RATIO = float(os.getenv("WEBHOOK_RETRY_BUDGET_RATIO", "0.2"))
+WEBHOOK_RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("WEBHOOK_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+
 
 class WebhookHandler:
-    """Handle webhook deliveries"""
+    """
+    Handle webhook deliveries
+    
+    Deliveries share one HTTP session with pooled keep-alive connections
+    per host. Concurrency is capped per endpoint (adapting to endpoint
+    latency) and globally, so a burst of events cannot open unbounded
+    sockets and slow receivers cannot starve fast ones.
     
-    def __init__(self):
-        """Initialize webhook handler"""
+    Each endpoint also has a circuit breaker: while it is open, attempts
+    return a deferred result immediately instead of making a request.
+    Retries draw on a global retry budget.
+    """
+    
+    def __init__(
+        self,
+        max_in_flight: int = WEBHOOK_MAX_IN_FLIGHT,
+        max_per_endpoint: int = WEBHOOK_MAX_PER_ENDPOINT,
+        target_latency: float = WEBHOOK_TARGET_LATENCY
+    ):
+        """
+        Initialize webhook handler
+        
+        Args:
+            max_in_flight: Concurrent deliveries across all endpoints
+            max_per_endpoint: Concurrent deliveries to one fast endpoint
+            target_latency: Endpoint latency (seconds) above which its limit shrinks
+        """
         self.max_retries = 3
         self.retry_delays = [1, 5, 15]  # seconds
+        self.max_in_flight = max_in_flight
+        self.max_per_endpoint = max_per_endpoint
+        self.target_latency = target_latency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._active = 0
+        self._endpoints: Dict[str, EndpointLimiter] = {}
+        self._circuits: Dict[str, CircuitBreaker] = {}
+        self.retry_budget = RetryBudget(WEBHOOK_RETRY_BUDGET_RATIO, WEBHOOK_RETRY_BUDGET_MIN_PER_SECOND)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, created on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=self.max_per_endpoint,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT)
+            )
+        return self._session
+    
+    def _endpoint(self, url: str) -> EndpointLimiter:
+        key = endpoint_key(url)
+        limiter = self._endpoints.get(key)
+        if limiter is None:
+            limiter = EndpointLimiter(self.max_per_endpoint, self.target_latency)
+            self._endpoints[key] = limiter
+        return limiter
+    
+    def endpoint_slots(self, url: str) -> int:
+        """Deliveries a URL's endpoint can take now without waiting for a slot"""
+        return self._endpoint(url).free_slots
+    
+    def circuit(self, url: str) -> CircuitBreaker:
+        """Circuit breaker of a URL's endpoint"""
+        key = endpoint_key(url)
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = CircuitBreaker(
+                failure_rate=WEBHOOK_CIRCUIT_FAILURE_RATE,
+                window=WEBHOOK_CIRCUIT_WINDOW,
+                min_requests=WEBHOOK_CIRCUIT_MIN_REQUESTS,
+                open_seconds=WEBHOOK_CIRCUIT_OPEN_SECONDS,
+                max_open_seconds=WEBHOOK_CIRCUIT_MAX_OPEN_SECONDS
+            )
+            self._circuits[key] = circuit
+        return circuit
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of in-flight deliveries, per-endpoint limits, latency and circuits"""
+        return {
+            "in_flight": self._active,
+            "max_in_flight": self.max_in_flight,
+            "retry_budget": self.retry_budget.metrics(),
+            "endpoints": {
+                key: {
+                    **(self._endpoints[key].metrics() if key in self._endpoints else {}),
+                    "circuit": circuit.metrics()
+                }
+                for key, circuit in self._circuits.items()
+            }
+        }
     
     def generate_signature(
         self,
@@ -43,24 +157,24 @@ class WebhookHandler:
             hashlib.sha256
         ).hexdigest()
     
-    async def deliver_webhook(
+    def build_request(
         self,
-        url: str,
         event_type: str,
-        payload: Dict[str, Any],
-        secret: Optional[str] = None
-    ) -> Dict[str, Any]:
+        payload: Any,
+        secret: Optional[str] = None,
+        delivery_id: Optional[str] = None
+    ) -> Tuple[str, Dict[str, str]]:
         """
-        Deliver webhook to URL
+        Serialize a payload and build signed request headers
         
         Args:
-            url: Webhook URL
             event_type: Event type
-            payload: Payload dictionary
+            payload: JSON-serializable payload
             secret: Optional webhook secret for signing
+            delivery_id: Optional delivery ID, sent so receivers can deduplicate retries
             
         Returns:
-            Delivery result dictionary
+            (payload JSON, headers)
         """
         payload_json = json.dumps(payload)
         headers = {
@@ -68,34 +182,142 @@ class WebhookHandler:
             "X-Webhook-Event": event_type,
             "X-Webhook-Timestamp": datetime.utcnow().isoformat()
         }
+        if delivery_id:
+            headers["X-Webhook-Delivery"] = delivery_id
         
         # Add signature if secret provided
         if secret:
             signature = self.generate_signature(payload_json, secret)
             headers["X-Webhook-Signature"] = f"sha256={signature}"
         
+        return payload_json, headers
+    
+    async def attempt_delivery(
+        self,
+        url: str,
+        event_type: str,
+        payload: Any,
+        secret: Optional[str] = None,
+        delivery_id: Optional[str] = None,
+        retry: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Make a single delivery attempt, without retrying
+        
+        No request is made while the endpoint's circuit is open, or for a
+        retry when the retry budget is exhausted; the result then has
+        deferred set and retry_after (seconds) instead.
+        
+        Args:
+            url: Webhook URL
+            event_type: Event type
+            payload: JSON-serializable payload
+            secret: Optional webhook secret for signing
+            delivery_id: Optional delivery ID
+            retry: Whether this is a retry of a failed attempt
+            
+        Returns:
+            Delivery result with success, status_code, response_body and error
+        """
+        circuit = self.circuit(url)
+        if not circuit.allow():
+            return _deferred("circuit open", circuit.retry_after(), circuit_open=True)
+        if retry and not self.retry_budget.withdraw():
+            circuit.release()
+            return _deferred("retry budget exhausted", 1.0)
+        if not retry:
+            self.retry_budget.deposit()
+        
+        success = False
+        try:
+            result = await self._attempt(url, event_type, payload, secret, delivery_id)
+            success = result["success"]
+            return result
+        finally:
+            circuit.record(success)
+    
+    async def _attempt(
+        self,
+        url: str,
+        event_type: str,
+        payload: Any,
+        secret: Optional[str],
+        delivery_id: Optional[str]
+    ) -> Dict[str, Any]:
+        payload_json, headers = self.build_request(event_type, payload, secret, delivery_id)
+        endpoint = self._endpoint(url)
+        
+        # Take the endpoint slot first so requests queued for a slow endpoint
+        # do not hold global slots while they wait
+        await endpoint.acquire()
+        started = time.monotonic()
+        try:
+            async with self._in_flight:
+                self._active += 1
+                started = time.monotonic()
+                try:
+                    return await self._post(url, payload_json, headers)
+                finally:
+                    self._active -= 1
+        finally:
+            await endpoint.release(time.monotonic() - started)
+    
+    async def _post(self, url: str, payload_json: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            async with self._get_session().post(url, data=payload_json, headers=headers) as response:
+                if response.status >= 200 and response.status < 300:
+                    return {"success": True, "status_code": response.status, "response_body": None, "error": None}
+                
+                error_text = await response.text()
+                logger.warning(f"Webhook delivery failed: {response.status} - {error_text}")
+                return {
+                    "success": False,
+                    "status_code": response.status,
+                    "response_body": error_text[:MAX_RESPONSE_BODY],
+                    "error": f"HTTP {response.status}"
+                }
+        except Exception as e:
+            logger.error(f"Webhook delivery error for {url}: {e}")
+            return {"success": False, "status_code": None, "response_body": None, "error": str(e) or type(e).__name__}
+    
+    async def deliver_webhook(
+        self,
+        url: str,
+        event_type: str,
+        payload: Dict[str, Any],
+        secret: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Deliver webhook to URL, retrying inline
+        
+        Blocks the caller for the whole retry sequence; prefer
+        enqueue_webhook_event, which hands delivery to the outbox dispatcher.
+        
+        Args:
+            url: Webhook URL
+            event_type: Event type
+            payload: Payload dictionary
+            secret: Optional webhook secret for signing
+            
+        Returns:
+            Delivery result dictionary
+        """
         for attempt in range(self.max_retries):
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        url,
-                        data=payload_json,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        if response.status >= 200 and response.status < 300:
-                            return {
-                                "success": True,
-                                "status_code": response.status,
-                                "attempt": attempt + 1
-                            }
-                        else:
-                            error_text = await response.text()
-                            logger.warning(
-                                f"Webhook delivery failed: {response.status} - {error_text}"
-                            )
-            except Exception as e:
-                logger.error(f"Webhook delivery error (attempt {attempt + 1}): {e}")
+            result = await self.attempt_delivery(url, event_type, payload, secret, retry=attempt > 0)
+            if result["success"]:
+                return {
+                    "success": True,
+                    "status_code": result["status_code"],
+                    "attempt": attempt + 1
+                }
+            if result.get("deferred"):
+                # Open circuit or no retry budget: give up now rather than sleep
+                return {
+                    "success": False,
+                    "status_code": None,
+                    "attempt": attempt,
+                    "error": result["error"]
+                }
             
             # Wait before retry (except on last attempt)
             if attempt < self.max_retries - 1:
@@ -116,6 +338,9 @@ class WebhookHandler:
         """
         Deliver webhook to multiple endpoints
         
+        All deliveries are started at once; the handler's per-endpoint and
+        global limits decide how many are actually in flight.
+        
         Args:
             webhooks: List of webhook configurations
             event_type: Event type
@@ -138,3 +363,26 @@ class WebhookHandler:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return results
 
+
+def _deferred(error: str, retry_after: float, circuit_open: bool = False) -> Dict[str, Any]:
+    """Result of an attempt that was not made"""
+    return {
+        "success": False,
+        "status_code": None,
+        "response_body": None,
+        "error": error,
+        "deferred": True,
+        "circuit_open": circuit_open,
+        "retry_after": retry_after
+    }
+
+
+_webhook_handler: Optional[WebhookHandler] = None
+
+
+def get_webhook_handler() -> WebhookHandler:
+    """Get the process-wide webhook handler, sharing its connection pools and limits"""
+    global _webhook_handler
+    if _webhook_handler is None:
+        _webhook_handler = WebhookHandler()
+    return _webhook_handler
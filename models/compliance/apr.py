@@ -0,0 +1,230 @@
+"""
+APR Verification
+Vectorized Regulation Z APR and finance charge verification
+"""
+from typing import Any, Dict, List, Sequence
+from dataclasses import dataclass
+import numpy as np
+
+# Regulation Z 1026.22(a)(2)-(3): tolerance in percentage points
+REGULAR_APR_TOLERANCE = 0.125
+IRREGULAR_APR_TOLERANCE = 0.25
+# Regulation Z 1026.18(d)(1): mortgage finance charge may be understated by up to $100
+FINANCE_CHARGE_TOLERANCE = 100.0
+
+MAX_NEWTON_ITERATIONS = 50
+NEWTON_TOLERANCE = 1e-10
+# Rows per padded schedule matrix, bounding memory for long irregular schedules
+SCHEDULE_CHUNK_SIZE = 2048
+
+
+def is_irregular(payments: Sequence[float]) -> bool:
+    """
+    Whether a schedule has irregular payment amounts
+
+    An odd first or last payment does not make a transaction irregular.
+    """
+    middle = payments[1:-1]
+    return bool(middle) and max(middle) - min(middle) > 0.005
+
+
+def solve_level_apr(
+    amount_financed: np.ndarray,
+    payment: np.ndarray,
+    n_payments: np.ndarray,
+    periods_per_year: np.ndarray
+) -> np.ndarray:
+    """
+    Solve APR for level-payment loans with the annuity formula
+
+    Args:
+        amount_financed: Amount financed per loan
+        payment: Payment per unit period per loan
+        n_payments: Number of payments per loan
+        periods_per_year: Unit periods per year per loan
+
+    Returns:
+        APR in percent, NaN where Newton's method did not converge
+    """
+    total = payment * n_payments
+    # Interest-free loans have an APR of zero and break the annuity formula
+    has_interest = total > amount_financed + 0.005
+    rate = np.where(has_interest, 2 * (total - amount_financed) / (amount_financed * (n_payments + 1)), 0.0)
+    converged = ~has_interest
+
+    for _ in range(MAX_NEWTON_ITERATIONS):
+        active = ~converged
+        if not active.any():
+            break
+        i, n, p = rate[active], n_payments[active], payment[active]
+        discount = (1 + i) ** -n
+        value = p * (1 - discount) / i - amount_financed[active]
+        slope = p * (n * discount / (1 + i) * i - (1 - discount)) / i ** 2
+        step = value / slope
+        rate[active] = np.maximum(i - step, 1e-12)
+        converged[active] = np.abs(step) < NEWTON_TOLERANCE
+
+    return np.where(converged, rate * periods_per_year * 100, np.nan)
+
+
+def solve_schedule_apr(
+    amount_financed: np.ndarray,
+    schedules: List[np.ndarray],
+    periods_per_year: np.ndarray
+) -> np.ndarray:
+    """
+    Solve APR for arbitrary payment schedules
+
+    Schedules are padded with zeros into a (loans x periods) matrix, so one
+    Newton step evaluates the present value of every loan at once. Loans are
+    processed in chunks of SCHEDULE_CHUNK_SIZE to bound memory.
+
+    Args:
+        amount_financed: Amount financed per loan
+        schedules: Payment amounts per unit period per loan
+        periods_per_year: Unit periods per year per loan
+
+    Returns:
+        APR in percent, NaN where Newton's method did not converge
+    """
+    apr = np.full(len(schedules), np.nan)
+    for start in range(0, len(schedules), SCHEDULE_CHUNK_SIZE):
+        chunk = schedules[start:start + SCHEDULE_CHUNK_SIZE]
+        amounts = amount_financed[start:start + len(chunk)]
+
+        payments = np.zeros((len(chunk), max(len(s) for s in chunk)))
+        for row, schedule in enumerate(chunk):
+            payments[row, :len(schedule)] = schedule
+        periods = np.arange(1, payments.shape[1] + 1, dtype=np.float64)
+
+        total = payments.sum(axis=1)
+        has_interest = total > amounts + 0.005
+        mean_term = (payments * periods).sum(axis=1) / np.where(total > 0, total, 1)
+        rate = np.where(has_interest, (total - amounts) / (amounts * np.maximum(mean_term, 1)), 0.0)
+        converged = ~has_interest
+
+        for _ in range(MAX_NEWTON_ITERATIONS):
+            active = ~converged
+            if not active.any():
+                break
+            i = rate[active][:, None]
+            discount = (1 + i) ** -periods
+            value = (payments[active] * discount).sum(axis=1) - amounts[active]
+            slope = -(payments[active] * periods * discount).sum(axis=1) / (1 + i[:, 0])
+            step = value / slope
+            rate[active] = np.maximum(i[:, 0] - step, 1e-12)
+            converged[active] = np.abs(step) < NEWTON_TOLERANCE
+
+        apr[start:start + len(chunk)] = np.where(
+            converged, rate * periods_per_year[start:start + len(chunk)] * 100, np.nan
+        )
+    return apr
+
+
+@dataclass
+class TilaVerification:
+    """Per-loan APR and finance charge verification results"""
+    has_schedule: np.ndarray
+    computed_apr: np.ndarray
+    disclosed_apr: np.ndarray
+    apr_tolerance: np.ndarray
+    computed_finance_charge: np.ndarray
+    disclosed_finance_charge: np.ndarray
+
+    @property
+    def apr_checked(self) -> np.ndarray:
+        return self.has_schedule & ~np.isnan(self.disclosed_apr) & ~np.isnan(self.computed_apr)
+
+    @property
+    def apr_unverifiable(self) -> np.ndarray:
+        return self.has_schedule & np.isnan(self.computed_apr)
+
+    @property
+    def apr_error(self) -> np.ndarray:
+        return np.where(self.apr_checked, np.abs(self.disclosed_apr - self.computed_apr), 0.0)
+
+    @property
+    def apr_violation(self) -> np.ndarray:
+        return self.apr_checked & (self.apr_error > self.apr_tolerance + 1e-9)
+
+    @property
+    def finance_charge_understatement(self) -> np.ndarray:
+        understatement = self.computed_finance_charge - self.disclosed_finance_charge
+        return np.where(np.isnan(understatement), 0.0, understatement)
+
+    @property
+    def finance_charge_violation(self) -> np.ndarray:
+        return self.finance_charge_understatement > FINANCE_CHARGE_TOLERANCE
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def verify_tila(loan_terms: List[Dict[str, Any]]) -> TilaVerification:
+    """
+    Recompute APR and finance charge for many loans
+
+    Level-payment loans are solved with the closed-form annuity; loans with
+    varying payments are solved over a padded schedule matrix. Both use
+    vectorized Newton iteration across all loans.
+
+    Args:
+        loan_terms: Loan terms dictionaries with amount_financed and either
+            payments (amount per unit period) or payment_amount and
+            term_months; optionally apr (percent), finance_charge and
+            periods_per_year (default 12)
+
+    Returns:
+        TilaVerification
+    """
+    n = len(loan_terms)
+    amount_financed = np.array([_number(t.get("amount_financed")) for t in loan_terms], dtype=np.float64)
+    periods_per_year = np.array([_number(t.get("periods_per_year", 12)) for t in loan_terms], dtype=np.float64)
+    total_payments = np.full(n, np.nan)
+    irregular = np.zeros(n, dtype=bool)
+    level_rows, level_payment, level_count = [], [], []
+    schedule_rows, schedules = [], []
+
+    # One pass over the terms sorts loans into level and scheduled groups
+    for row, terms in enumerate(loan_terms):
+        if not amount_financed[row] > 0:
+            continue
+        payments = terms.get("payments")
+        if payments:
+            total_payments[row] = sum(payments)
+            if max(payments) - min(payments) <= 0.005:
+                level_rows.append(row)
+                level_payment.append(payments[0])
+                level_count.append(len(payments))
+            else:
+                schedule_rows.append(row)
+                schedules.append(np.asarray(payments, dtype=np.float64))
+                irregular[row] = is_irregular(payments)
+        elif terms.get("payment_amount") and terms.get("term_months"):
+            level_rows.append(row)
+            level_payment.append(float(terms["payment_amount"]))
+            level_count.append(int(terms["term_months"]))
+            total_payments[row] = level_payment[-1] * level_count[-1]
+
+    computed_apr = np.full(n, np.nan)
+    if level_rows:
+        computed_apr[level_rows] = solve_level_apr(
+            amount_financed[level_rows],
+            np.array(level_payment, dtype=np.float64),
+            np.array(level_count, dtype=np.float64),
+            periods_per_year[level_rows]
+        )
+    if schedule_rows:
+        computed_apr[schedule_rows] = solve_schedule_apr(
+            amount_financed[schedule_rows], schedules, periods_per_year[schedule_rows]
+        )
+
+    return TilaVerification(
+        has_schedule=~np.isnan(total_payments),
+        computed_apr=computed_apr,
+        disclosed_apr=np.array([_number(t.get("apr")) for t in loan_terms], dtype=np.float64),
+        apr_tolerance=np.where(irregular, IRREGULAR_APR_TOLERANCE, REGULAR_APR_TOLERANCE),
+        computed_finance_charge=total_payments - amount_financed,
+        disclosed_finance_charge=np.array([_number(t.get("finance_charge")) for t in loan_terms], dtype=np.float64)
+    )
@@ -0,0 +1,207 @@
+"""
+Columnar Transaction Batches
+Column views over many transactions for vectorized compliance checks
+"""
+from typing import Any, Dict, Iterable, List, Tuple, Union
+from itertools import chain
+import numpy as np
+
+
+def get_path(record: Any, parts: List[str]) -> Any:
+    """Follow a dotted path through nested dictionaries"""
+    for part in parts:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(part)
+    return record
+
+
+def mapping_at(record: Any, path: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Mapping at a dotted path, as every compliance check reads it
+
+    Returns:
+        (mapping, {} if missing or not a mapping; whether a non-mapping value is present)
+    """
+    value = get_path(record, path.split("."))
+    if isinstance(value, dict):
+        return value, False
+    return {}, value is not None
+
+
+def sum_values(mapping: Dict[str, Any]) -> Tuple[float, bool]:
+    """
+    Sum of a mapping's values, e.g. total fees
+
+    Returns:
+        (sum of the numeric values, whether any value is not a number)
+    """
+    values = [_to_float(v) for v in mapping.values()]
+    bad = any(v != v for v in values)  # NaN
+    return sum(v for v in values if v == v), bad
+
+
+class KeyPresence:
+    """
+    Which keys each transaction has under a mapping field
+
+    Keys are interned into a vocabulary and stored as a boolean matrix
+    (transactions x distinct keys), so "has disclosure X" is a column read.
+    """
+
+    def __init__(self, vocab: Dict[str, int], matrix: np.ndarray):
+        self.vocab = vocab
+        self.matrix = matrix
+
+    def has(self, key: str) -> np.ndarray:
+        """Boolean mask of transactions that have key"""
+        column = self.vocab.get(key)
+        if column is None:
+            return np.zeros(len(self.matrix), dtype=bool)
+        return self.matrix[:, column]
+
+    def has_all(self, keys: Iterable[str]) -> np.ndarray:
+        """Boolean mask of transactions that have every key"""
+        mask = np.ones(len(self.matrix), dtype=bool)
+        for key in keys:
+            mask &= self.has(key)
+        return mask
+
+
+class TransactionBatch:
+    """
+    Many transactions viewed as columns
+
+    Columns are extracted from the transaction dictionaries on first use and
+    cached, so every rule that reads the same field shares one extraction.
+    The original records are kept so individual transactions can still be
+    passed to the per-transaction rule checks.
+    """
+
+    def __init__(
+        self,
+        records: List[Dict[str, Any]],
+        jurisdictions: Union[str, List[str]]
+    ):
+        """
+        Initialize batch
+
+        Args:
+            records: Transaction data dictionaries
+            jurisdictions: One jurisdiction for every transaction, or one per transaction
+        """
+        if isinstance(jurisdictions, str):
+            jurisdictions = [jurisdictions] * len(records)
+        if len(jurisdictions) != len(records):
+            raise ValueError("jurisdictions must match the number of records")
+
+        self.records = records
+        self.jurisdictions = np.asarray(jurisdictions, dtype=object)
+        self._keys: Dict[str, KeyPresence] = {}
+        self._sums: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._numeric: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def subset(self, indices: np.ndarray) -> "TransactionBatch":
+        """New batch holding only the transactions at indices"""
+        return TransactionBatch(
+            [self.records[i] for i in indices.tolist()],
+            self.jurisdictions[indices].tolist()
+        )
+
+    def mappings(self, path: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Mapping at path for every record, with a mask of non-mapping values"""
+        pairs = [mapping_at(record, path) for record in self.records]
+        values = [mapping for mapping, _ in pairs]
+        invalid = np.fromiter((bad for _, bad in pairs), dtype=bool, count=len(pairs))
+        return values, invalid
+
+    def keys(self, path: str) -> KeyPresence:
+        """
+        Key presence for a mapping field
+
+        Args:
+            path: Dotted path to a mapping, e.g. "disclosures"
+
+        Returns:
+            KeyPresence for the field
+        """
+        if path not in self._keys:
+            mappings, _ = self.mappings(path)
+            lengths = np.fromiter(map(len, mappings), dtype=np.int64, count=len(mappings))
+            keys = list(chain.from_iterable(mappings))
+            vocab = {key: idx for idx, key in enumerate(dict.fromkeys(keys))}
+
+            matrix = np.zeros((len(mappings), len(vocab)), dtype=bool)
+            rows = np.repeat(np.arange(len(mappings)), lengths)
+            cols = np.fromiter(map(vocab.__getitem__, keys), dtype=np.int64, count=len(keys))
+            matrix[rows, cols] = True
+            self._keys[path] = KeyPresence(vocab, matrix)
+        return self._keys[path]
+
+    def value_sum(self, path: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sum of the values of a mapping field, e.g. total fees
+
+        Args:
+            path: Dotted path to a mapping of numbers
+
+        Returns:
+            (sums, mask of transactions whose values could not be summed)
+        """
+        if path not in self._sums:
+            mappings, invalid = self.mappings(path)
+            lengths = np.fromiter(map(len, mappings), dtype=np.int64, count=len(mappings))
+            rows = np.repeat(np.arange(len(mappings)), lengths)
+            values = list(chain.from_iterable(m.values() for m in mappings))
+            # Converted like sum_values: numeric strings are not numbers here
+            weights = np.fromiter(map(_to_float, values), dtype=np.float64, count=len(values))
+            bad = np.isnan(weights)
+            if bad.any():
+                invalid = invalid | np.bincount(rows[bad], minlength=len(mappings)).astype(bool)
+                weights[bad] = 0.0
+
+            sums = np.bincount(rows, weights=weights, minlength=len(mappings))
+            self._sums[path] = (sums, invalid)
+        return self._sums[path]
+
+    def numeric(self, path: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Numeric field as a float column
+
+        Numbers and numeric strings are converted with to_number, the same
+        way the per-transaction checks convert them.
+
+        Args:
+            path: Dotted path, e.g. "loan_terms.apr"
+
+        Returns:
+            (values, NaN where the field is missing or not a number;
+            mask of transactions where the field is present but not a number)
+        """
+        if path not in self._numeric:
+            parts = path.split(".")
+            values = [get_path(record, parts) for record in self.records]
+            column = np.array([to_number(v) for v in values], dtype=np.float64)
+            present = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+            self._numeric[path] = (column, present & np.isnan(column))
+        return self._numeric[path]
+
+
+def to_number(value: Any) -> float:
+    """Convert a number or numeric string to float, NaN if not a number"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return float("nan")
+    return _to_float(value)
+
+
+def _to_float(value: Any) -> float:
+    """Convert to float, NaN if not a number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float("nan")
@@ -0,0 +1,274 @@
+"""
+Jurisdiction Rule Packs
+Declarative state and local compliance rules compiled into a dispatch table
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import time
+import logging
+import threading
+import numpy as np
+import yaml
+
+from backend.models.compliance import ComplianceRule, ComplianceStatus
+from models.compliance.batch import TransactionBatch, get_path, mapping_at, sum_values, to_number
+
+logger = logging.getLogger(__name__)
+
+RULE_PACKS_DIR = os.getenv(
+    "COMPLIANCE_RULE_PACKS_DIR",
+    os.path.join(os.path.dirname(__file__), "rule_packs")
+)
+RULE_PACKS_RELOAD_INTERVAL = float(os.getenv("COMPLIANCE_RULE_PACKS_RELOAD_INTERVAL", "5"))
+
+# Batch status codes, matching rule_engine.STATUS_CODES
+_STATUS_CODE = {ComplianceStatus.PASS: 0, ComplianceStatus.WARNING: 1, ComplianceStatus.FAIL: 2}
+
+
+def normalize_jurisdiction(jurisdiction: str) -> str:
+    """Canonical form of a jurisdiction key, e.g. " ca " -> "CA" """
+    return (jurisdiction or "").strip().upper()
+
+
+def _result(violations: List[str], status: ComplianceStatus, recommendation: Optional[str]) -> Dict[str, Any]:
+    return {
+        "status": status if violations else ComplianceStatus.PASS,
+        "violations": violations,
+        "recommendations": [recommendation] if violations and recommendation else []
+    }
+
+
+def _compile_required_keys(spec: Dict[str, Any], default_field: Optional[str], label: str):
+    """Every key in spec['keys'] must be present in a mapping field"""
+    field = spec.get("field", default_field)
+    if not field:
+        raise ValueError(f"Rule '{spec['name']}' needs a field")
+    keys = list(spec["keys"])
+    status = ComplianceStatus(spec.get("status", "fail"))
+    recommendation = spec.get("recommendation")
+
+    def check(transaction_data: Dict[str, Any], jurisdiction: str) -> Dict[str, Any]:
+        present, _ = mapping_at(transaction_data, field)
+        violations = [f"Missing required {label}: {key}" for key in keys if key not in present]
+        return _result(violations, status, recommendation)
+
+    def batch_check(batch: TransactionBatch) -> np.ndarray:
+        present = batch.keys(field).has_all(keys)
+        return np.where(present, 0, _STATUS_CODE[status])
+
+    return check, batch_check
+
+
+def _compile_max_total(spec: Dict[str, Any]):
+    """Sum of the values of a mapping field must not exceed spec['max']"""
+    field = spec.get("field", "fees")
+    maximum = float(spec["max"])
+    status = ComplianceStatus(spec.get("status", "warning"))
+    message = spec.get("violation", f"Total {field} exceed {maximum:,.2f}")
+    recommendation = spec.get("recommendation")
+
+    def check(transaction_data: Dict[str, Any], jurisdiction: str) -> Dict[str, Any]:
+        values, invalid = mapping_at(transaction_data, field)
+        total, bad_values = sum_values(values)
+        if invalid or bad_values:
+            return _result([f"{field} must be a mapping of numbers"], ComplianceStatus.FAIL, recommendation)
+        return _result([message] if total > maximum else [], status, recommendation)
+
+    def batch_check(batch: TransactionBatch) -> np.ndarray:
+        totals, invalid = batch.value_sum(field)
+        codes = np.where(totals > maximum, _STATUS_CODE[status], 0)
+        return np.where(invalid, _STATUS_CODE[ComplianceStatus.FAIL], codes)
+
+    return check, batch_check
+
+
+def _compile_field_range(spec: Dict[str, Any]):
+    """
+    A numeric field, when present, must lie within [spec['min'], spec['max']]
+
+    Numeric strings count as numbers; any other present value fails.
+    """
+    field = spec["field"]
+    parts = field.split(".")
+    minimum = float(spec.get("min", -np.inf))
+    maximum = float(spec.get("max", np.inf))
+    status = ComplianceStatus(spec.get("status", "warning"))
+    message = spec.get("violation", f"{field} outside allowed range")
+    recommendation = spec.get("recommendation")
+
+    def check(transaction_data: Dict[str, Any], jurisdiction: str) -> Dict[str, Any]:
+        value = get_path(transaction_data, parts)
+        if value is None:
+            return _result([], status, recommendation)
+        number = to_number(value)
+        if np.isnan(number):
+            return _result([f"{field} is not a number"], ComplianceStatus.FAIL, recommendation)
+        out_of_range = number < minimum or number > maximum
+        return _result([message] if out_of_range else [], status, recommendation)
+
+    def batch_check(batch: TransactionBatch) -> np.ndarray:
+        values, invalid = batch.numeric(field)
+        codes = np.where((values < minimum) | (values > maximum), _STATUS_CODE[status], 0)
+        return np.where(invalid, _STATUS_CODE[ComplianceStatus.FAIL], codes)
+
+    return check, batch_check
+
+
+_COMPILERS: Dict[str, Callable[[Dict[str, Any]], Tuple[Callable, Callable]]] = {
+    "required_disclosures": lambda spec: _compile_required_keys(spec, "disclosures", "disclosure"),
+    "required_fields": lambda spec: _compile_required_keys(spec, None, "field"),
+    "max_total": _compile_max_total,
+    "field_range": _compile_field_range,
+}
+
+
+def compile_rule(spec: Dict[str, Any], jurisdiction: str) -> Tuple[ComplianceRule, Dict[str, Any]]:
+    """
+    Compile one declarative rule into the engine's rule format
+
+    Args:
+        spec: Rule definition from a rule pack
+        jurisdiction: Jurisdiction the pack applies to
+
+    Returns:
+        (rule type, rule dictionary with name, description, check and batch_check)
+    """
+    kind = spec.get("kind")
+    if kind not in _COMPILERS:
+        raise ValueError(f"Unknown rule kind '{kind}' in rule '{spec.get('name')}'")
+
+    check, batch_check = _COMPILERS[kind](spec)
+    rule_type = ComplianceRule(spec.get("rule_type", ComplianceRule.STATE_SPECIFIC.value))
+    return rule_type, {
+        "name": spec["name"],
+        "description": spec.get("description", spec["name"]),
+        "jurisdiction": jurisdiction,
+        "check": check,
+        "batch_check": batch_check,
+        "inputs": [spec.get("field", "disclosures" if kind == "required_disclosures" else "fees")]
+    }
+
+
+def compile_packs(directory: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """
+    Compile every rule pack in a directory
+
+    Each .yaml/.yml/.json file holds one jurisdiction:
+
+        jurisdiction: CA
+        rules:
+          - name: California Seller Disclosures
+            kind: required_disclosures
+            keys: [transfer_disclosure_statement, natural_hazard_disclosure]
+
+    Args:
+        directory: Rule pack directory
+
+    Returns:
+        Rules keyed by (jurisdiction, rule type value)
+    """
+    table: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith((".yaml", ".yml", ".json")):
+            continue
+        with open(os.path.join(directory, file_name), "r") as f:
+            pack = yaml.safe_load(f) or {}  # YAML is a superset of JSON
+
+        jurisdiction = normalize_jurisdiction(pack.get("jurisdiction", ""))
+        if not jurisdiction:
+            raise ValueError(f"Rule pack {file_name} has no jurisdiction")
+        for spec in pack.get("rules", []):
+            rule_type, rule = compile_rule(spec, jurisdiction)
+            table.setdefault((jurisdiction, rule_type.value), []).append(rule)
+    return table
+
+
+class RulePackIndex:
+    """
+    Compiled rule packs with hot reload
+
+    Lookups are a single dictionary hit on (jurisdiction, rule type). The
+    pack directory is polled for changes at most once per reload interval;
+    a changed directory is recompiled in full and swapped in atomically,
+    and a pack that fails to compile leaves the previous table in place.
+    """
+
+    def __init__(self, directory: str = RULE_PACKS_DIR, reload_interval: float = RULE_PACKS_RELOAD_INTERVAL):
+        """
+        Initialize index
+
+        Args:
+            directory: Rule pack directory
+            reload_interval: Minimum seconds between change checks (0 = never reload)
+        """
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._table: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._signature: Optional[Tuple] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _directory_signature(self) -> Tuple:
+        if not os.path.isdir(self.directory):
+            return ()
+        return tuple(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in sorted(os.scandir(self.directory), key=lambda e: e.name)
+        )
+
+    def reload(self) -> bool:
+        """
+        Recompile the packs if the directory changed
+
+        Returns:
+            True if a new table was loaded
+        """
+        with self._lock:
+            signature = self._directory_signature()
+            if signature == self._signature:
+                return False
+            try:
+                table = compile_packs(self.directory) if signature else {}
+            except Exception as e:
+                # Remember the broken signature so the error is logged once per change
+                self._signature = signature
+                logger.error(f"Failed to compile rule packs in {self.directory}, keeping previous rules: {e}")
+                return False
+            self._table = table
+            self._signature = signature
+            logger.info(f"Loaded {sum(map(len, table.values()))} jurisdiction rules from {self.directory}")
+            return True
+
+    def _maybe_reload(self):
+        if not self.reload_interval:
+            return
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self.reload()
+
+    def rules_for(self, jurisdiction: str, rule_type: ComplianceRule) -> List[Dict[str, Any]]:
+        """
+        Rules for a jurisdiction and rule type
+
+        Args:
+            jurisdiction: Jurisdiction (state code or local jurisdiction key)
+            rule_type: Compliance rule type
+
+        Returns:
+            Compiled rules (empty if the jurisdiction has none)
+        """
+        self._maybe_reload()
+        return self._table.get((normalize_jurisdiction(jurisdiction), rule_type.value), [])
+
+
+_rule_pack_index: Optional[RulePackIndex] = None
+
+
+def get_rule_pack_index() -> RulePackIndex:
+    """Get the process-wide rule pack index"""
+    global _rule_pack_index
+    if _rule_pack_index is None:
+        _rule_pack_index = RulePackIndex()
+    return _rule_pack_index
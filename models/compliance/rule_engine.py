@@ -2,35 +2,129 @@
 Compliance Rule Engine
 Rule-based compliance checking with ML enhancements
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass
 from enum import Enum
+import json
+import os
 import logging
+import numpy as np
 
 from backend.models.compliance import ComplianceCheck, ComplianceRule, ComplianceStatus
+from models.compliance.apr import TilaVerification, verify_tila
+from models.compliance.batch import TransactionBatch, get_path, mapping_at, sum_values
+from models.compliance.jurisdiction_rules import RulePackIndex, get_rule_pack_index, normalize_jurisdiction
 
 logger = logging.getLogger(__name__)
 
+RESPA_REQUIRED_DISCLOSURES = ["loan_estimate", "closing_disclosure", "servicing_disclosure"]
+TILA_REQUIRED_FIELDS = ["apr", "finance_charge", "amount_financed", "total_payments"]
+RESPA_MAX_TOTAL_FEES = 10000  # Example threshold
+
+# Transactions whose last report is kept for incremental re-checks
+REPORT_CACHE_SIZE = int(os.getenv("COMPLIANCE_REPORT_CACHE_SIZE", "10000"))
+
+# Batch status codes, ordered by severity
+STATUS_CODES = [ComplianceStatus.PASS, ComplianceStatus.WARNING, ComplianceStatus.FAIL]
+PASS, WARNING, FAIL = 0, 1, 2
+
+
+@dataclass
+class BatchComplianceResult:
+    """
+    Compact result of a batch compliance run
+
+    status holds one int8 code per (transaction, rule), indexing
+    STATUS_CODES. ComplianceCheck objects are only built on request, and
+    only for checks that did not pass.
+    """
+    batch: TransactionBatch
+    rules: List[Tuple[ComplianceRule, Dict[str, Any]]]
+    status: np.ndarray
+    engine: "ComplianceRuleEngine"
+    
+    @property
+    def rule_names(self) -> List[str]:
+        """Column labels; jurisdiction rules are suffixed with their jurisdiction"""
+        return [
+            f"{rule['name']} ({rule['jurisdiction']})" if "jurisdiction" in rule else rule["name"]
+            for _, rule in self.rules
+        ]
+    
+    def overall_status(self) -> np.ndarray:
+        """Worst status code per transaction"""
+        if not self.rules:
+            return np.zeros(len(self.batch), dtype=np.int8)
+        return self.status.max(axis=1)
+    
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Count of each status per rule"""
+        return {
+            name: {
+                code.value: int(np.count_nonzero(self.status[:, col] == idx))
+                for idx, code in enumerate(STATUS_CODES)
+            }
+            for col, name in enumerate(self.rule_names)
+        }
+    
+    def failures(self) -> Iterator[Tuple[int, ComplianceCheck]]:
+        """
+        Build check results for every failed or warned check
+        
+        Each failing transaction is re-run through the per-transaction rule
+        so violations and recommendations match check_compliance exactly.
+        
+        Yields:
+            (transaction index, ComplianceCheck)
+        """
+        rows, cols = np.nonzero(self.status != PASS)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            rule_type, rule = self.rules[col]
+            yield row, self.engine._run_rule(
+                rule_type, rule, self.batch.records[row], self.batch.jurisdictions[row]
+            )
+
 
 class ComplianceRuleEngine:
     """Rule engine for compliance checking"""
     
-    def __init__(self):
-        """Initialize compliance rule engine"""
+    def __init__(self, rule_packs: Optional[RulePackIndex] = None):
+        """
+        Initialize compliance rule engine
+        
+        Args:
+            rule_packs: Jurisdiction rule packs (default: process-wide index)
+        """
         self.rules = self._load_rules()
+        self.rule_packs = rule_packs or get_rule_pack_index()
+        # State-specific result for jurisdictions whose packs define no such rules
+        self.state_fallback_rule = {
+            "name": "State-Specific Requirements",
+            "check": self._check_state_requirements,
+            "batch_check": self._batch_check_state_requirements,
+            "inputs": ["jurisdiction", "property_address"],
+            "description": "Verify compliance with state-specific regulations"
+        }
+        # transaction_id -> jurisdiction, input fingerprints and last check per rule
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     def _load_rules(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load compliance rules"""
-        # In production, load from database or config file
+        """Load federal compliance rules; state and local rules come from rule packs"""
         return {
             ComplianceRule.RESPA.value: [
                 {
                     "name": "RESPA Disclosure Requirements",
                     "check": self._check_respa_disclosures,
+                    "batch_check": self._batch_check_respa_disclosures,
+                    "inputs": ["disclosures"],
                     "description": "Verify all required RESPA disclosures are provided"
                 },
                 {
                     "name": "RESPA Fee Restrictions",
                     "check": self._check_respa_fees,
+                    "batch_check": self._batch_check_respa_fees,
+                    "inputs": ["fees"],
                     "description": "Verify fees comply with RESPA restrictions"
                 }
             ],
@@ -38,23 +132,31 @@ class ComplianceRuleEngine:
                 {
                     "name": "TILA Disclosure Requirements",
                     "check": self._check_tila_disclosures,
+                    "batch_check": self._batch_check_tila_disclosures,
+                    "inputs": ["loan_terms"],
                     "description": "Verify all required TILA disclosures are provided"
                 },
                 {
                     "name": "TILA APR Calculation",
                     "check": self._check_tila_apr,
+                    "batch_check": self._batch_check_tila_apr,
+                    "inputs": ["loan_terms"],
                     "description": "Verify APR is calculated correctly per TILA"
                 }
-            ],
-            ComplianceRule.STATE_SPECIFIC.value: [
-                {
-                    "name": "State-Specific Requirements",
-                    "check": self._check_state_requirements,
-                    "description": "Verify compliance with state-specific regulations"
-                }
             ]
         }
     
+    def rules_for(self, rule_type: ComplianceRule, jurisdiction: str) -> List[Dict[str, Any]]:
+        """Federal rules plus the jurisdiction's rule pack rules for a rule type"""
+        return self.rules.get(rule_type.value, []) + self._pack_rules(rule_type, jurisdiction)
+    
+    def _pack_rules(self, rule_type: ComplianceRule, jurisdiction: str) -> List[Dict[str, Any]]:
+        """Rule pack rules, or the state fallback rule if the jurisdiction has no state-specific rules"""
+        rules = self.rule_packs.rules_for(jurisdiction, rule_type)
+        if not rules and rule_type == ComplianceRule.STATE_SPECIFIC:
+            return [self.state_fallback_rule]
+        return rules
+    
     def check_compliance(
         self,
         rule_type: ComplianceRule,
@@ -74,35 +176,262 @@ class ComplianceRuleEngine:
         """
         checks = []
         
-        if rule_type.value not in self.rules:
-            logger.warning(f"No rules found for {rule_type.value}")
+        rules = self.rules_for(rule_type, jurisdiction)
+        if not rules:
+            logger.warning(f"No rules found for {rule_type.value} in {jurisdiction}")
             return checks
         
-        for rule in self.rules[rule_type.value]:
-            try:
-                result = rule["check"](transaction_data, jurisdiction)
-                check = ComplianceCheck(
-                    rule_name=rule["name"],
-                    rule_type=rule_type,
-                    status=result["status"],
-                    description=rule["description"],
-                    violations=result.get("violations", []),
-                    recommendations=result.get("recommendations", [])
+        for rule in rules:
+            checks.append(self._run_rule(rule_type, rule, transaction_data, jurisdiction))
+        
+        return checks
+    
+    def _run_rule(
+        self,
+        rule_type: ComplianceRule,
+        rule: Dict[str, Any],
+        transaction_data: Dict[str, Any],
+        jurisdiction: str
+    ) -> ComplianceCheck:
+        """Run a single rule against one transaction"""
+        try:
+            result = rule["check"](transaction_data, jurisdiction)
+            return ComplianceCheck(
+                rule_name=rule["name"],
+                rule_type=rule_type,
+                status=result["status"],
+                description=rule["description"],
+                violations=result.get("violations", []),
+                recommendations=result.get("recommendations", [])
+            )
+        except Exception as e:
+            logger.error(f"Error checking rule {rule['name']}: {e}")
+            return ComplianceCheck(
+                rule_name=rule["name"],
+                rule_type=rule_type,
+                status=ComplianceStatus.FAIL,
+                description=rule["description"],
+                violations=[f"Error during check: {str(e)}"],
+                recommendations=["Review transaction data"]
+            )
+    
+    @staticmethod
+    def _fingerprint(transaction_data: Dict[str, Any], path: str) -> int:
+        """Hash of the value at a dotted path"""
+        value = get_path(transaction_data, path.split("."))
+        return hash(json.dumps(value, sort_keys=True, default=str))
+    
+    def plan_recheck(
+        self,
+        transaction_id: str,
+        transaction_data: Dict[str, Any],
+        jurisdiction: str,
+        rule_types: Optional[List[ComplianceRule]] = None
+    ) -> Tuple[List[Tuple[ComplianceRule, Dict[str, Any], bool]], Dict[str, int]]:
+        """
+        Work out which rules must be re-run for a transaction
+        
+        A rule is re-run when any field it declares in "inputs" changed since
+        the last check, when it was not checked before (or was redefined by
+        a rule pack reload), or when its inputs are None (unknown). Rules
+        with an empty inputs list depend on no fields and are reused. The
+        plan can be passed to changed_rule_types and recheck so it is only
+        computed once.
+        
+        Args:
+            transaction_id: Transaction (or title search) identifier
+            transaction_data: Current transaction data dictionary
+            jurisdiction: Jurisdiction (state) for state-specific rules
+            rule_types: Rule types to consider (default: all)
+        
+        Returns:
+            ([(rule type, rule, needs re-run)], current input fingerprints)
+        """
+        previous = self._reports.get(transaction_id)
+        if previous is not None and previous["jurisdiction"] != normalize_jurisdiction(jurisdiction):
+            previous = None
+        
+        fingerprints: Dict[str, int] = {}
+        plan = []
+        for rule_type in rule_types or list(ComplianceRule):
+            for rule in self.rules_for(rule_type, jurisdiction):
+                inputs = rule.get("inputs")
+                for path in inputs or []:
+                    if path not in fingerprints:
+                        fingerprints[path] = self._fingerprint(transaction_data, path)
+                
+                last = previous["checks"].get((rule_type.value, rule["name"])) if previous else None
+                stale = (
+                    last is None
+                    or last[0] is not rule
+                    or inputs is None
+                    or any(previous["fingerprints"].get(path) != fingerprints[path] for path in inputs)
                 )
-                checks.append(check)
+                plan.append((rule_type, rule, stale))
+        
+        return plan, fingerprints
+    
+    def changed_rule_types(
+        self,
+        transaction_id: str,
+        transaction_data: Dict[str, Any],
+        jurisdiction: str,
+        rule_types: Optional[List[ComplianceRule]] = None,
+        plan: Optional[Tuple[List[Tuple[ComplianceRule, Dict[str, Any], bool]], Dict[str, int]]] = None
+    ) -> List[ComplianceRule]:
+        """
+        Rule types with at least one rule whose inputs changed since the last recheck
+        
+        Args:
+            transaction_id: Transaction (or title search) identifier
+            transaction_data: Current transaction data dictionary
+            jurisdiction: Jurisdiction (state) for state-specific rules
+            rule_types: Rule types to consider (default: all)
+            plan: Result of plan_recheck for the same arguments (computed if omitted)
+            
+        Returns:
+            Rule types that need re-checking, in rule_types order
+        """
+        plan, _ = plan or self.plan_recheck(transaction_id, transaction_data, jurisdiction, rule_types)
+        changed = {rule_type for rule_type, _, stale in plan if stale}
+        return [rule_type for rule_type in (rule_types or list(ComplianceRule)) if rule_type in changed]
+    
+    def recheck(
+        self,
+        transaction_id: str,
+        transaction_data: Dict[str, Any],
+        jurisdiction: str,
+        rule_types: Optional[List[ComplianceRule]] = None,
+        plan: Optional[Tuple[List[Tuple[ComplianceRule, Dict[str, Any], bool]], Dict[str, int]]] = None
+    ) -> List[ComplianceCheck]:
+        """
+        Run compliance checks, re-running only rules whose inputs changed
+        
+        Results of rules whose inputs are unchanged are taken from the last
+        recheck of the same transaction. The first call for a transaction
+        runs every rule.
+        
+        Args:
+            transaction_id: Transaction (or title search) identifier
+            transaction_data: Current transaction data dictionary
+            jurisdiction: Jurisdiction (state) for state-specific rules
+            rule_types: Rule types to check (default: all)
+            plan: Result of plan_recheck for the same arguments (computed if omitted)
+            
+        Returns:
+            List of compliance check results
+        """
+        plan, fingerprints = plan or self.plan_recheck(transaction_id, transaction_data, jurisdiction, rule_types)
+        previous = self._reports.get(transaction_id)
+        
+        checks = {}
+        for rule_type, rule, stale in plan:
+            key = (rule_type.value, rule["name"])
+            if stale:
+                checks[key] = (rule, self._run_rule(rule_type, rule, transaction_data, jurisdiction))
+            else:
+                checks[key] = previous["checks"][key]
+        
+        rerun = sum(1 for _, _, stale in plan if stale)
+        logger.debug(f"Compliance recheck for {transaction_id}: {rerun}/{len(plan)} rules re-run")
+        
+        # Rule types not requested this time keep their previous results
+        if previous is not None and rule_types and previous["jurisdiction"] == normalize_jurisdiction(jurisdiction):
+            for key, value in previous["checks"].items():
+                checks.setdefault(key, value)
+            fingerprints = {**previous["fingerprints"], **fingerprints}
+        
+        self._reports[transaction_id] = {
+            "jurisdiction": normalize_jurisdiction(jurisdiction),
+            "fingerprints": fingerprints,
+            "checks": checks
+        }
+        self._reports.move_to_end(transaction_id)
+        while len(self._reports) > REPORT_CACHE_SIZE:
+            self._reports.popitem(last=False)
+        
+        return [checks[(rule_type.value, rule["name"])][1] for rule_type, rule, _ in plan]
+    
+    def forget(self, transaction_id: str):
+        """Drop the stored report for a transaction"""
+        self._reports.pop(transaction_id, None)
+    
+    def check_compliance_batch(
+        self,
+        transactions: Union[TransactionBatch, List[Dict[str, Any]]],
+        jurisdictions: Union[str, List[str], None] = None,
+        rule_types: Optional[List[ComplianceRule]] = None
+    ) -> BatchComplianceResult:
+        """
+        Run compliance checks for many transactions at once
+        
+        Each rule is evaluated once over whole columns of the batch instead
+        of once per transaction. Jurisdiction rules are evaluated over the
+        transactions of their jurisdiction only and pass for all others.
+        
+        Args:
+            transactions: TransactionBatch, or transaction data dictionaries
+            jurisdictions: Jurisdiction for all transactions or one per
+                transaction (required unless a TransactionBatch is given)
+            rule_types: Rule types to check (default: all)
+            
+        Returns:
+            BatchComplianceResult
+        """
+        if isinstance(transactions, TransactionBatch):
+            batch = transactions
+        else:
+            if jurisdictions is None:
+                raise ValueError("jurisdictions is required for raw transactions")
+            batch = TransactionBatch(transactions, jurisdictions)
+        
+        rule_types = rule_types or list(ComplianceRule)
+        all_rows = np.arange(len(batch))
+        
+        # (rule type, rule, rows it applies to, batch holding those rows)
+        columns = [
+            (rule_type, rule, all_rows, batch)
+            for rule_type in rule_types
+            for rule in self.rules.get(rule_type.value, [])
+        ]
+        
+        keys = np.array([normalize_jurisdiction(j) for j in batch.jurisdictions], dtype=str)
+        jurisdictions, inverse = np.unique(keys, return_inverse=True)
+        fallback_rows = []
+        for idx, jurisdiction in enumerate(jurisdictions.tolist()):
+            pack_rules = [
+                (rule_type, rule)
+                for rule_type in rule_types
+                for rule in self._pack_rules(rule_type, jurisdiction)
+            ]
+            rows = all_rows if len(jurisdictions) == 1 else np.flatnonzero(inverse == idx)
+            # One state fallback column covers every jurisdiction that needs it
+            if any(rule is self.state_fallback_rule for _, rule in pack_rules):
+                fallback_rows.append(rows)
+                pack_rules = [(t, rule) for t, rule in pack_rules if rule is not self.state_fallback_rule]
+            if not pack_rules:
+                continue
+            subset = batch if len(jurisdictions) == 1 else batch.subset(rows)
+            columns.extend((rule_type, rule, rows, subset) for rule_type, rule in pack_rules)
+        
+        if fallback_rows:
+            rows = np.sort(np.concatenate(fallback_rows))
+            subset = batch if len(rows) == len(batch) else batch.subset(rows)
+            columns.append((ComplianceRule.STATE_SPECIFIC, self.state_fallback_rule, rows, subset))
+        
+        status = np.zeros((len(batch), len(columns)), dtype=np.int8)
+        for col, (rule_type, rule, rows, subset) in enumerate(columns):
+            try:
+                status[rows, col] = rule["batch_check"](subset)
             except Exception as e:
-                logger.error(f"Error checking rule {rule['name']}: {e}")
-                check = ComplianceCheck(
-                    rule_name=rule["name"],
-                    rule_type=rule_type,
-                    status=ComplianceStatus.FAIL,
-                    description=rule["description"],
-                    violations=[f"Error during check: {str(e)}"],
-                    recommendations=["Review transaction data"]
-                )
-                checks.append(check)
+                logger.error(f"Error in batch check for rule {rule['name']}, checking individually: {e}")
+                status[rows, col] = [
+                    STATUS_CODES.index(self._run_rule(rule_type, rule, record, jurisdiction).status)
+                    for record, jurisdiction in zip(subset.records, subset.jurisdictions)
+                ]
         
-        return checks
+        rules = [(rule_type, rule) for rule_type, rule, _, _ in columns]
+        return BatchComplianceResult(batch=batch, rules=rules, status=status, engine=self)
     
     def _check_respa_disclosures(
         self,
@@ -114,14 +443,11 @@ class ComplianceRuleEngine:
         recommendations = []
         
         # Check for required disclosures
-        required_disclosures = [
-            "loan_estimate",
-            "closing_disclosure",
-            "servicing_disclosure"
-        ]
-        
-        for disclosure in required_disclosures:
-            if disclosure not in transaction_data.get("disclosures", {}):
+        disclosures, invalid = mapping_at(transaction_data, "disclosures")
+        if invalid:
+            violations.append("Disclosures must be a mapping of disclosure name to document")
+        for disclosure in RESPA_REQUIRED_DISCLOSURES:
+            if disclosure not in disclosures:
                 violations.append(f"Missing required disclosure: {disclosure}")
         
         status = ComplianceStatus.PASS if not violations else ComplianceStatus.FAIL
@@ -145,12 +471,18 @@ class ComplianceRuleEngine:
         recommendations = []
         
         # Check for excessive fees
-        fees = transaction_data.get("fees", {})
-        total_fees = sum(fees.values())
+        fees, invalid = mapping_at(transaction_data, "fees")
+        total_fees, bad_values = sum_values(fees)
+        if invalid or bad_values:
+            return {
+                "status": ComplianceStatus.FAIL,
+                "violations": ["Fees must be a mapping of fee name to amount"],
+                "recommendations": ["Review transaction data"]
+            }
         
         # RESPA has restrictions on certain fees
         # This is simplified - actual rules are more complex
-        if total_fees > 10000:  # Example threshold
+        if total_fees > RESPA_MAX_TOTAL_FEES:
             violations.append("Total fees exceed reasonable threshold")
             recommendations.append("Review fee structure for RESPA compliance")
         
@@ -172,15 +504,10 @@ class ComplianceRuleEngine:
         recommendations = []
         
         # Check for required TILA disclosures
-        required_fields = [
-            "apr",
-            "finance_charge",
-            "amount_financed",
-            "total_payments"
-        ]
-        
-        loan_terms = transaction_data.get("loan_terms", {})
-        for field in required_fields:
+        loan_terms, invalid = mapping_at(transaction_data, "loan_terms")
+        if invalid:
+            violations.append("Loan terms must be a mapping of field to value")
+        for field in TILA_REQUIRED_FIELDS:
             if field not in loan_terms:
                 violations.append(f"Missing required TILA field: {field}")
         
@@ -195,26 +522,17 @@ class ComplianceRuleEngine:
             "recommendations": recommendations
         }
     
-    def _check_tila_apr(
+    def _check_state_requirements(
         self,
         transaction_data: Dict[str, Any],
         jurisdiction: str
     ) -> Dict[str, Any]:
-        """Check TILA APR calculation"""
+        """Check state-specific requirements of a jurisdiction without rule pack rules"""
         violations = []
         recommendations = []
         
-        loan_terms = transaction_data.get("loan_terms", {})
-        apr = loan_terms.get("apr")
-        
-        if apr:
-            # Simplified APR validation
-            # In production, implement actual APR calculation verification
-            if apr < 0 or apr > 50:
-                violations.append("APR appears to be outside reasonable range")
-                recommendations.append("Verify APR calculation")
-        
-        status = ComplianceStatus.PASS if not violations else ComplianceStatus.WARNING
+        # No state-specific rules are defined for this jurisdiction, so pass
+        status = ComplianceStatus.PASS
         
         return {
             "status": status,
@@ -222,22 +540,88 @@ class ComplianceRuleEngine:
             "recommendations": recommendations
         }
     
-    def _check_state_requirements(
+    def _check_tila_apr(
         self,
         transaction_data: Dict[str, Any],
         jurisdiction: str
     ) -> Dict[str, Any]:
-        """Check state-specific requirements"""
+        """Check TILA APR and finance charge against Regulation Z tolerances"""
         violations = []
         recommendations = []
         
-        # In production, load state-specific rules from database
-        # For now, return pass
-        status = ComplianceStatus.PASS
+        loan_terms, invalid = mapping_at(transaction_data, "loan_terms")
+        if invalid:
+            return {
+                "status": ComplianceStatus.FAIL,
+                "violations": ["Loan terms must be a mapping of field to value"],
+                "recommendations": ["Review transaction data"]
+            }
+        verification = verify_tila([loan_terms])
+        code = int(self._tila_apr_codes(verification)[0])
+        
+        if verification.apr_violation[0]:
+            violations.append(
+                f"Disclosed APR {verification.disclosed_apr[0]:.3f}% differs from computed APR "
+                f"{verification.computed_apr[0]:.3f}% by more than {verification.apr_tolerance[0]} percentage points"
+            )
+        if verification.finance_charge_violation[0]:
+            violations.append(
+                f"Finance charge understated by ${verification.finance_charge_understatement[0]:,.2f}"
+            )
+        if violations:
+            recommendations.append("Recalculate APR and finance charge per Regulation Z Appendix J")
+        elif verification.apr_unverifiable[0]:
+            violations.append("APR could not be computed from the payment schedule")
+            recommendations.append("Verify payment schedule and amount financed")
+        elif code != PASS:
+            # Without a payment schedule only a plausibility check is possible
+            violations.append("APR appears to be outside reasonable range")
+            recommendations.append("Verify APR calculation")
         
         return {
-            "status": status,
+            "status": STATUS_CODES[code],
             "violations": violations,
             "recommendations": recommendations
         }
+    
+    def _tila_apr_codes(self, verification: TilaVerification) -> np.ndarray:
+        """Status codes for TILA APR verification results"""
+        apr = verification.disclosed_apr
+        out_of_range = ~verification.has_schedule & ((apr < 0) | (apr > 50))
+        codes = np.where(out_of_range | verification.apr_unverifiable, WARNING, PASS)
+        return np.where(verification.apr_violation | verification.finance_charge_violation, FAIL, codes)
+    
+    # Vectorized checks: each returns a status code per transaction and
+    # must agree with its per-transaction counterpart above.
+    
+    def _batch_check_respa_disclosures(self, batch: TransactionBatch) -> np.ndarray:
+        present = batch.keys("disclosures").has_all(RESPA_REQUIRED_DISCLOSURES)
+        return np.where(present, PASS, FAIL)
+    
+    def _batch_check_respa_fees(self, batch: TransactionBatch) -> np.ndarray:
+        total_fees, invalid = batch.value_sum("fees")
+        status = np.where(total_fees > RESPA_MAX_TOTAL_FEES, WARNING, PASS)
+        return np.where(invalid, FAIL, status)
+    
+    def _batch_check_tila_disclosures(self, batch: TransactionBatch) -> np.ndarray:
+        present = batch.keys("loan_terms").has_all(TILA_REQUIRED_FIELDS)
+        return np.where(present, PASS, FAIL)
+    
+    def _batch_check_state_requirements(self, batch: TransactionBatch) -> np.ndarray:
+        return np.full(len(batch), PASS)
+    
+    def _batch_check_tila_apr(self, batch: TransactionBatch) -> np.ndarray:
+        loan_terms, invalid = batch.mappings("loan_terms")
+        codes = self._tila_apr_codes(verify_tila(loan_terms))
+        return np.where(invalid, FAIL, codes)
+
+
+_compliance_engine: Optional[ComplianceRuleEngine] = None
+
 
+def get_compliance_engine() -> ComplianceRuleEngine:
+    """Get the process-wide rule engine, which holds the reports used by recheck"""
+    global _compliance_engine
+    if _compliance_engine is None:
+        _compliance_engine = ComplianceRuleEngine()
+    return _compliance_engine
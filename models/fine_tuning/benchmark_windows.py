@@ -0,0 +1,87 @@
+"""
+Sliding-window Benchmark
+Measure classification throughput against accuracy for different window caps
+
+Usage:
+    python -m models.fine_tuning.benchmark_windows MODEL_PATH EVAL_DATA.json
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from models.fine_tuning.document_classifier import DocumentClassifier
+
+
+def benchmark(
+    model_path: str,
+    examples: List[Dict[str, Any]],
+    window_caps: List[Optional[int]],
+    stride: int = 128,
+    batch_size: int = 16
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate the classifier once per window cap
+
+    Args:
+        model_path: Directory containing a trained document model
+        examples: Evaluation examples with 'text' and 'label' keys
+        window_caps: Max windows per document to try (None = truncate at 512 tokens)
+        stride: Tokens shared between consecutive windows
+        batch_size: Documents per forward pass
+
+    Returns:
+        One result dictionary per window cap
+    """
+    classifier = DocumentClassifier(model_path)
+    texts = [ex["text"] for ex in examples]
+    labels = [ex["label"] for ex in examples]
+    results = []
+
+    for cap in window_caps:
+        classifier.window_stride = stride if cap else None
+        classifier.max_windows = cap or 1
+
+        predictions = []
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            predictions.extend(classifier.classify_batch(texts[start:start + batch_size]))
+        elapsed = time.perf_counter() - started
+
+        correct = sum(
+            1 for (label, _), expected in zip(predictions, labels)
+            if label == expected or classifier.labels.index(label) == expected
+        )
+        results.append({
+            "max_windows": cap,
+            "documents": len(texts),
+            "docs_per_second": len(texts) / elapsed if elapsed else 0.0,
+            "accuracy": correct / len(texts) if texts else 0.0
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("model_path")
+    parser.add_argument("eval_data", help="JSON list of {'text', 'label'} examples")
+    parser.add_argument("--caps", default="0,1,2,4,8,16", help="Window caps (0 = truncate)")
+    parser.add_argument("--stride", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    with open(args.eval_data, "r") as f:
+        examples = json.load(f)
+
+    caps = [int(cap) or None for cap in args.caps.split(",")]
+    for result in benchmark(args.model_path, examples, caps, args.stride, args.batch_size):
+        print(
+            f"max_windows={str(result['max_windows']):>4}  "
+            f"docs/s={result['docs_per_second']:8.2f}  "
+            f"accuracy={result['accuracy']:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,10 @@ class FineTuningConfig:
     base_model: str = "bert-base-uncased"
     num_labels: int = 7
     max_length: int = 512
+    # Sliding windows for documents longer than max_length (None = truncate)
+    window_stride: Optional[int] = None
+    max_windows: int = 8
+    window_pooling: str = "mean"
     batch_size: int = 16
     learning_rate: float = 2e-5
     num_epochs: int = 3
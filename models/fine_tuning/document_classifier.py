@@ -0,0 +1,157 @@
+"""
+Document Classifier
+Serve the fine-tuned document model in-process for fast classification
+"""
+import os
+import logging
+import threading
+from typing import List, Optional, Tuple
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import torch
+
+from data.labeling.document_labeler import DocumentLabel
+from models.fine_tuning.inference_server import InferenceServer
+from models.fine_tuning.windowing import encode_windows, pool_logits
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentClassifier:
+    """CPU document classifier with dynamic batching across concurrent callers"""
+
+    def __init__(
+        self,
+        model_path: str,
+        max_batch_size: int = 32,
+        max_latency_ms: float = 10.0,
+        max_length: int = 512,
+        window_stride: Optional[int] = None,
+        max_windows: int = 8,
+        window_pooling: str = "mean"
+    ):
+        """
+        Initialize document classifier
+
+        Args:
+            model_path: Directory containing a model saved by DocumentModelTrainer
+            max_batch_size: Maximum number of documents per forward pass
+            max_latency_ms: Maximum time a request waits for its batch to fill
+            max_length: Maximum tokens per document (or per window)
+            window_stride: Tokens shared between windows (None truncates instead)
+            max_windows: Maximum windows per document
+            window_pooling: How window logits are pooled ("mean" or "max")
+        """
+        self.model_path = model_path
+        self.max_length = max_length
+        self.window_stride = window_stride
+        self.max_windows = max_windows
+        self.window_pooling = window_pooling
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.model.eval()
+        self.labels = self._load_labels()
+        self.server = InferenceServer(
+            self.classify_batch,
+            max_batch_size=max_batch_size,
+            max_latency_ms=max_latency_ms,
+            name="document_classifier"
+        )
+
+    def _load_labels(self) -> List[str]:
+        """Map output indices to DocumentLabel values"""
+        id2label = self.model.config.id2label or {}
+        known = {label.value for label in DocumentLabel}
+        all_labels = list(DocumentLabel)
+        labels = []
+        for idx in range(self.model.config.num_labels):
+            name = str(id2label.get(idx, "")).lower()
+            if name in known:
+                labels.append(name)
+            elif idx < len(all_labels):
+                # Trained without label names, fall back to DocumentLabel order
+                labels.append(all_labels[idx].value)
+            else:
+                labels.append(DocumentLabel.OTHER.value)
+        return labels
+
+    def classify_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Classify a batch of texts in one forward pass
+
+        In windowed mode every window of every document goes into the same
+        padded batch and window logits are pooled per document.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            List of (label, confidence) tuples
+        """
+        if self.window_stride is None:
+            encodings = self.tokenizer(
+                texts,
+                truncation=True,
+                padding=True,
+                max_length=self.max_length,
+                return_tensors="pt"
+            )
+            with torch.inference_mode():
+                logits = self.model(**encodings).logits
+        else:
+            encodings, document_index = encode_windows(
+                self.tokenizer, texts, self.max_length, self.window_stride, self.max_windows
+            )
+            with torch.inference_mode():
+                window_logits = self.model(**encodings).logits
+            logits = pool_logits(window_logits, document_index, len(texts), self.window_pooling)
+        confidences, indices = torch.softmax(logits, dim=-1).max(dim=-1)
+        return [
+            (self.labels[idx], float(conf))
+            for idx, conf in zip(indices.tolist(), confidences.tolist())
+        ]
+
+    async def classify(self, text: str) -> Tuple[str, float]:
+        """
+        Classify a single text, micro-batched with other concurrent callers
+
+        Args:
+            text: Document text
+
+        Returns:
+            (label, confidence) tuple
+        """
+        return await self.server.submit(text)
+
+
+_classifier: Optional[DocumentClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_document_classifier(load: bool = True) -> Optional[DocumentClassifier]:
+    """
+    Get the process-wide document classifier
+
+    The model is loaded once from DOCUMENT_MODEL_PATH, at app startup or
+    on first use. Loading blocks, so call this from a worker thread inside
+    async code. Returns None when no trained model is configured.
+
+    Args:
+        load: Load the model if it is not loaded yet; with False this never
+            blocks and returns None until the model has been loaded
+    """
+    global _classifier
+    if _classifier is None and load:
+        model_path = os.getenv("DOCUMENT_MODEL_PATH", "./models/document_model")
+        if not os.path.isdir(model_path):
+            return None
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = DocumentClassifier(
+                    model_path,
+                    max_batch_size=int(os.getenv("CLASSIFIER_MAX_BATCH_SIZE", "32")),
+                    max_latency_ms=float(os.getenv("CLASSIFIER_MAX_LATENCY_MS", "10")),
+                    window_stride=int(os.getenv("CLASSIFIER_WINDOW_STRIDE", "128")) or None,
+                    max_windows=int(os.getenv("CLASSIFIER_MAX_WINDOWS", "8"))
+                )
+                logger.info(f"Document classifier loaded from {model_path}")
+    return _classifier
@@ -0,0 +1,156 @@
+"""
+Inference Server
+Dynamic micro-batching for in-process model inference
+"""
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InferenceMetrics:
+    """Running counters for an inference server"""
+    requests: int = 0
+    batches: int = 0
+    rejected: int = 0
+    errors: int = 0
+    total_batch_size: int = 0
+    max_batch_size_seen: int = 0
+    total_batch_latency_ms: float = 0.0
+    last_batch_size: int = 0
+    last_batch_latency_ms: float = 0.0
+
+    def record_batch(self, size: int, latency_ms: float):
+        self.batches += 1
+        self.total_batch_size += size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, size)
+        self.total_batch_latency_ms += latency_ms
+        self.last_batch_size = size
+        self.last_batch_latency_ms = latency_ms
+
+
+class InferenceServer:
+    """
+    Collect concurrent requests into micro-batches
+
+    A batch is dispatched as soon as it is full or when the oldest request
+    has waited max_latency_ms, whichever comes first. Each batch is run by
+    a single dedicated thread so forward passes never compete for cores.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_latency_ms: float = 10.0,
+        max_queue_size: int = 1024,
+        name: str = "inference"
+    ):
+        """
+        Initialize inference server
+
+        Args:
+            predict_fn: Function mapping a list of inputs to a list of outputs
+            max_batch_size: Maximum number of inputs per batch
+            max_latency_ms: Maximum time a request waits for its batch to fill
+            max_queue_size: Maximum number of queued requests before rejecting
+            name: Name used in logs and metrics
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.name = name
+        self.stats = InferenceMetrics()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit one input and wait for its result
+
+        Args:
+            item: Model input
+
+        Returns:
+            Model output for this input
+
+        Raises:
+            RuntimeError: If the queue is full
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise RuntimeError(f"{self.name} queue is full")
+        self.stats.requests += 1
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for the first request, then fill the batch until full or the deadline"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Batching loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_fn, items)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.record_batch(len(items), (time.perf_counter() - started) * 1000)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of batch size, queue depth and per-batch latency"""
+        stats = self.stats
+        batches = stats.batches or 1
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": stats.requests,
+            "batches": stats.batches,
+            "rejected": stats.rejected,
+            "errors": stats.errors,
+            "avg_batch_size": stats.total_batch_size / batches,
+            "max_batch_size": stats.max_batch_size_seen,
+            "last_batch_size": stats.last_batch_size,
+            "avg_batch_latency_ms": stats.total_batch_latency_ms / batches,
+            "last_batch_latency_ms": stats.last_batch_latency_ms
+        }
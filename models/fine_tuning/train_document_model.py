@@ -4,7 +4,8 @@ Train custom model for document classification and extraction
 """
 import os
 import json
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
@@ -12,10 +13,13 @@ from transformers import (
     Trainer,
     DataCollatorWithPadding
 )
-from datasets import Dataset
+from datasets import Dataset, load_from_disk
 import torch
 import logging
 
+from models.fine_tuning.inference_server import InferenceServer
+from models.fine_tuning.windowing import encode_windows, pool_logits, window_document_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,13 +48,30 @@ class DocumentModelTrainer:
     
     def prepare_dataset(
         self,
-        training_data: List[Dict[str, Any]]
+        training_data: List[Dict[str, Any]],
+        max_length: int = 512,
+        cache_dir: Optional[str] = "./cache/tokenized",
+        stride: Optional[int] = None,
+        max_windows: int = 8
     ) -> Dataset:
         """
         Prepare training dataset
         
+        Examples are tokenized without padding; DataCollatorWithPadding pads
+        each batch to its own longest example at training time. Tokenized
+        text is cached on disk in Arrow format, keyed by tokenizer and text
+        hash, so repeated runs over the same corpus skip tokenization.
+        
+        When stride is set, long documents are split into overlapping
+        windows of max_length tokens (at most max_windows per document),
+        each labeled with its document's label.
+        
         Args:
             training_data: List of training examples with 'text' and 'label' keys
+            max_length: Maximum tokens per example (or per window)
+            cache_dir: Directory for the tokenized dataset cache (None disables it)
+            stride: Tokens shared between consecutive windows (None disables windowing)
+            max_windows: Maximum windows per document
             
         Returns:
             HuggingFace Dataset
@@ -58,22 +79,75 @@ class DocumentModelTrainer:
         texts = [ex["text"] for ex in training_data]
         labels = [ex["label"] for ex in training_data]
         
-        # Tokenize
-        encodings = self.tokenizer(
-            texts,
-            truncation=True,
-            padding=True,
-            max_length=512
-        )
+        cache_path = None
+        if cache_dir:
+            cache_key = self._tokenization_cache_key(
+                texts, f"{max_length}|{stride}|{max_windows if stride else ''}"
+            )
+            cache_path = os.path.join(cache_dir, cache_key)
         
-        # Create dataset
-        dataset = Dataset.from_dict({
-            "input_ids": encodings["input_ids"],
-            "attention_mask": encodings["attention_mask"],
-            "labels": labels
-        })
+        if cache_path and os.path.isdir(cache_path):
+            dataset = load_from_disk(cache_path)
+            logger.info(f"Loaded tokenized dataset from {cache_path}")
+        else:
+            dataset = Dataset.from_dict({"text": texts}).map(
+                lambda batch, indices: self._tokenize(batch, indices, max_length, stride, max_windows),
+                batched=True,
+                with_indices=True,
+                remove_columns=["text"]
+            )
+            if cache_path:
+                dataset.save_to_disk(cache_path)
+                logger.info(f"Saved tokenized dataset to {cache_path}")
+        
+        # Labels are attached after caching so relabeling never re-tokenizes
+        window_labels = [labels[doc] for doc in dataset["document_index"]]
+        return dataset.add_column("labels", window_labels)
+    
+    def _tokenize(
+        self,
+        batch: Dict[str, List[str]],
+        indices: List[int],
+        max_length: int,
+        stride: Optional[int],
+        max_windows: int
+    ) -> Dict[str, List]:
+        """Tokenize a batch without padding and record sequence lengths"""
+        if stride is None:
+            encodings = self.tokenizer(
+                batch["text"],
+                truncation=True,
+                max_length=max_length
+            )
+            document_index = list(indices)
+        else:
+            windows = self.tokenizer(
+                batch["text"],
+                truncation=True,
+                max_length=max_length,
+                stride=stride,
+                return_overflowing_tokens=True
+            )
+            mapping = windows["overflow_to_sample_mapping"]
+            keep = window_document_index(mapping, max_windows)
+            encodings = {
+                "input_ids": [windows["input_ids"][i] for i in keep],
+                "attention_mask": [windows["attention_mask"][i] for i in keep]
+            }
+            document_index = [indices[mapping[i]] for i in keep]
         
-        return dataset
+        encodings["length"] = [len(ids) for ids in encodings["input_ids"]]
+        encodings["document_index"] = document_index
+        return encodings
+    
+    def _tokenization_cache_key(self, texts: List[str], options: str) -> str:
+        """Cache key from tokenizer identity, tokenization options and corpus text"""
+        digest = hashlib.sha256()
+        digest.update(self.tokenizer.name_or_path.encode("utf-8"))
+        digest.update(f"|{len(self.tokenizer)}|{options}".encode("utf-8"))
+        for text in texts:
+            digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+        return digest.hexdigest()
     
     def train(
         self,
@@ -106,7 +180,10 @@ class DocumentModelTrainer:
             logging_steps=10,
             eval_strategy="epoch" if eval_dataset else "no",
             save_strategy="epoch",
-            load_best_model_at_end=True if eval_dataset else False
+            load_best_model_at_end=True if eval_dataset else False,
+            # Batch examples of similar length so dynamic padding stays small
+            group_by_length="length" in train_dataset.column_names,
+            length_column_name="length"
         )
         
         data_collator = DataCollatorWithPadding(tokenizer=self.tokenizer)
@@ -130,4 +207,72 @@ class DocumentModelTrainer:
         """Load a trained model"""
         self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
         self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+    
+    def predict_batch(
+        self,
+        texts: List[str],
+        max_length: int = 512,
+        stride: Optional[int] = None,
+        max_windows: int = 8,
+        pooling: str = "mean"
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of texts with one padded forward pass
+        
+        Args:
+            texts: Document texts
+            max_length: Maximum tokens per text (or per window)
+            stride: Tokens shared between windows (None truncates instead)
+            max_windows: Maximum windows per document
+            pooling: How window logits are pooled per document ("mean" or "max")
+            
+        Returns:
+            List of dictionaries with 'label' index and 'probabilities'
+        """
+        self.model.eval()
+        if stride is None:
+            encodings = self.tokenizer(
+                texts,
+                truncation=True,
+                padding=True,
+                max_length=max_length,
+                return_tensors="pt"
+            )
+            with torch.inference_mode():
+                logits = self.model(**encodings).logits
+        else:
+            encodings, document_index = encode_windows(
+                self.tokenizer, texts, max_length, stride, max_windows
+            )
+            with torch.inference_mode():
+                window_logits = self.model(**encodings).logits
+            logits = pool_logits(window_logits, document_index, len(texts), pooling)
+        
+        probabilities = torch.softmax(logits, dim=-1)
+        return [
+            {"label": int(row.argmax()), "probabilities": row.tolist()}
+            for row in probabilities
+        ]
+    
+    def create_inference_server(
+        self,
+        max_batch_size: int = 32,
+        max_latency_ms: float = 10.0
+    ) -> InferenceServer:
+        """
+        Create a micro-batching inference server for the loaded model
+        
+        Args:
+            max_batch_size: Maximum number of texts per forward pass
+            max_latency_ms: Maximum time a request waits for its batch to fill
+            
+        Returns:
+            InferenceServer whose submit() classifies a single text
+        """
+        return InferenceServer(
+            self.predict_batch,
+            max_batch_size=max_batch_size,
+            max_latency_ms=max_latency_ms,
+            name="document_model"
+        )
 
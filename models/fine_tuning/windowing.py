@@ -0,0 +1,124 @@
+"""
+Sliding-window Encoding
+Split long documents into overlapping token windows and pool their logits
+"""
+from typing import Any, Dict, List, Tuple
+import torch
+
+
+def select_windows(num_windows: int, max_windows: int) -> List[int]:
+    """
+    Pick which windows to keep when a document has more than the cap
+
+    Windows are spread evenly across the document so the first page, the
+    last page (signatures, recording stamps) and the middle are all seen.
+
+    Args:
+        num_windows: Number of windows produced for the document
+        max_windows: Maximum windows to keep
+
+    Returns:
+        Indices of the windows to keep, in order
+    """
+    if num_windows <= max_windows:
+        return list(range(num_windows))
+    if max_windows == 1:
+        return [0]
+    step = (num_windows - 1) / (max_windows - 1)
+    return sorted({round(i * step) for i in range(max_windows)})
+
+
+def window_document_index(
+    overflow_to_sample_mapping: List[int],
+    max_windows: int
+) -> List[int]:
+    """
+    Choose windows to keep for a tokenized batch
+
+    Args:
+        overflow_to_sample_mapping: Document index of every window
+        max_windows: Maximum windows per document
+
+    Returns:
+        Positions (into the window list) of the windows to keep
+    """
+    positions_by_doc: Dict[int, List[int]] = {}
+    for position, doc in enumerate(overflow_to_sample_mapping):
+        positions_by_doc.setdefault(doc, []).append(position)
+
+    keep = []
+    for doc, positions in positions_by_doc.items():
+        keep.extend(positions[i] for i in select_windows(len(positions), max_windows))
+    return sorted(keep)
+
+
+def encode_windows(
+    tokenizer: Any,
+    texts: List[str],
+    max_length: int = 512,
+    stride: int = 128,
+    max_windows: int = 8
+) -> Tuple[Dict[str, torch.Tensor], List[int]]:
+    """
+    Tokenize texts into padded overlapping windows
+
+    Args:
+        tokenizer: HuggingFace fast tokenizer
+        texts: Document texts
+        max_length: Tokens per window
+        stride: Tokens shared between consecutive windows
+        max_windows: Maximum windows per document
+
+    Returns:
+        (model inputs for every kept window, document index of each window)
+    """
+    encodings = tokenizer(
+        texts,
+        truncation=True,
+        max_length=max_length,
+        stride=stride,
+        return_overflowing_tokens=True
+    )
+    mapping = encodings["overflow_to_sample_mapping"]
+    keep = window_document_index(mapping, max_windows)
+
+    windows = {
+        "input_ids": [encodings["input_ids"][i] for i in keep],
+        "attention_mask": [encodings["attention_mask"][i] for i in keep]
+    }
+    batch = tokenizer.pad(windows, return_tensors="pt")
+    return dict(batch), [mapping[i] for i in keep]
+
+
+def pool_logits(
+    logits: torch.Tensor,
+    document_index: List[int],
+    num_documents: int,
+    pooling: str = "mean"
+) -> torch.Tensor:
+    """
+    Pool window logits into one row per document
+
+    Args:
+        logits: Window logits (num_windows x num_labels)
+        document_index: Document index of each window
+        num_documents: Number of documents in the batch
+        pooling: "mean" or "max"
+
+    Returns:
+        Document logits (num_documents x num_labels)
+    """
+    index = torch.tensor(document_index, device=logits.device)
+    if pooling == "max":
+        pooled = torch.full(
+            (num_documents, logits.shape[-1]), float("-inf"),
+            dtype=logits.dtype, device=logits.device
+        )
+        return pooled.scatter_reduce(
+            0, index.unsqueeze(-1).expand_as(logits), logits, reduce="amax"
+        )
+
+    sums = torch.zeros((num_documents, logits.shape[-1]), dtype=logits.dtype, device=logits.device)
+    sums.index_add_(0, index, logits)
+    counts = torch.bincount(index, minlength=num_documents).clamp(min=1)
+    return sums / counts.unsqueeze(-1).to(logits.dtype)
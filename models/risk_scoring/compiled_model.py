@@ -0,0 +1,230 @@
+"""
+Compiled Risk Model
+Array-based forest runtime for fast, portable risk scoring
+"""
+from typing import Any, Dict, Tuple
+import json
+import os
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPILED_FORMAT_VERSION = 1
+
+_ARRAYS = ("feature", "threshold", "children", "value", "roots", "scaler_mean", "scaler_scale")
+
+
+class CompiledForest:
+    """
+    Regression forest stored as flat node arrays
+
+    All trees share one set of node arrays; roots holds each tree's first
+    node. Nodes are renumbered so that siblings are adjacent: the children
+    of node i are children[i] (left) and children[i] + 1 (right). Leaves
+    point to themselves with an infinite threshold, so every row can be
+    walked through every tree in max_depth vectorized steps.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        scaler_mean: np.ndarray,
+        scaler_scale: np.ndarray,
+        max_depth: int
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.max_depth = max_depth
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.scaler_mean)
+
+    @classmethod
+    def from_sklearn(cls, forest: Any, scaler: Any) -> "CompiledForest":
+        """
+        Compile a fitted RandomForestRegressor and StandardScaler
+
+        Args:
+            forest: Fitted sklearn RandomForestRegressor
+            scaler: Fitted sklearn StandardScaler
+
+        Returns:
+            CompiledForest
+        """
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            order = cls._sibling_order(tree.children_left, tree.children_right)
+            new_id = np.empty(tree.node_count, dtype=np.int64)
+            new_id[order] = np.arange(tree.node_count)
+
+            left = tree.children_left[order]
+            is_leaf = left == -1
+            first_child = np.where(is_leaf, np.arange(tree.node_count), new_id[np.maximum(left, 0)])
+
+            features.append(np.where(is_leaf, 0, tree.feature[order]))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            children.append(first_child + offset)
+            values.append(tree.value[order, 0, 0])
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            scaler_mean=np.asarray(scaler.mean_, dtype=np.float64),
+            scaler_scale=np.asarray(scaler.scale_, dtype=np.float64),
+            max_depth=int(max_depth)
+        )
+
+    @staticmethod
+    def _sibling_order(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+        """Breadth-first node order in which every left child is followed by its right sibling"""
+        order = [0]
+        for node in order:
+            if children_left[node] != -1:
+                order.append(children_left[node])
+                order.append(children_right[node])
+        return np.array(order, dtype=np.int64)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Walk every row through every tree, returning leaf node ids (rows x trees)"""
+        # sklearn compares float32 features against float64 thresholds
+        X_scaled = ((X - self.scaler_mean) / self.scaler_scale).astype(np.float32)
+        n_rows = X_scaled.shape[0]
+        flat = X_scaled.ravel()
+        row_offsets = (np.arange(n_rows) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+
+        # np.take avoids the overhead of fancy indexing, which dominates for single rows
+        for _ in range(self.max_depth):
+            go_right = flat.take(self.feature.take(nodes) + row_offsets) > self.threshold.take(nodes)
+            nodes = self.children.take(nodes) + go_right
+
+        return nodes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict raw forest output
+
+        Args:
+            X: Unscaled feature matrix (rows x features)
+
+        Returns:
+            Predictions, one per row
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        return self.value.take(self._leaves(X)).mean(axis=1)
+
+    def predict_with_contributions(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Predict and attribute each prediction to the input features
+
+        Uses Saabas path attribution: every split on the path from root to
+        leaf credits its feature with the change in node value it causes,
+        averaged over trees. Contributions plus the bias sum exactly to the
+        prediction, and are computed in the same vectorized pass.
+
+        Args:
+            X: Unscaled feature matrix (rows x features)
+
+        Returns:
+            (predictions, contributions (rows x features), bias)
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        X_scaled = ((X - self.scaler_mean) / self.scaler_scale).astype(np.float32)
+        n_rows = X_scaled.shape[0]
+        flat = X_scaled.ravel()
+        row_offsets = (np.arange(n_rows) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+
+        cells, deltas = [], []
+        for _ in range(self.max_depth):
+            split_feature = self.feature.take(nodes)
+            go_right = flat.take(split_feature + row_offsets) > self.threshold.take(nodes)
+            next_nodes = self.children.take(nodes) + go_right
+            # Leaves loop back to themselves, so their delta is zero
+            cells.append(split_feature + row_offsets)
+            deltas.append(self.value.take(next_nodes) - self.value.take(nodes))
+            nodes = next_nodes
+
+        contributions = np.bincount(
+            np.concatenate([c.ravel() for c in cells]),
+            weights=np.concatenate([d.ravel() for d in deltas]),
+            minlength=n_rows * self.n_features
+        ).reshape(n_rows, self.n_features) / self.n_trees
+
+        bias = float(self.value.take(self.roots).mean())
+        predictions = self.value.take(nodes).mean(axis=1)
+        return predictions, contributions, bias
+
+    def save(self, directory: str, metadata: Dict[str, Any] = None):
+        """
+        Save as uncompressed .npy arrays plus a JSON manifest
+
+        Args:
+            directory: Output directory
+            metadata: Extra metadata for the manifest (optional)
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+
+        manifest = {
+            "format_version": COMPILED_FORMAT_VERSION,
+            "max_depth": self.max_depth,
+            "n_trees": self.n_trees,
+            "n_features": self.n_features,
+            "n_nodes": int(len(self.feature)),
+            **(metadata or {})
+        }
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CompiledForest":
+        """
+        Load a compiled forest
+
+        Args:
+            directory: Directory written by save()
+            mmap: Memory-map arrays instead of reading them into memory
+
+        Returns:
+            CompiledForest
+        """
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != COMPILED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {manifest.get('format_version')}")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            # Plain ndarray views over the mapping avoid np.memmap's per-index overhead
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode).view(np.ndarray)
+            for name in _ARRAYS
+        }
+        return cls(max_depth=manifest["max_depth"], **arrays)
@@ -0,0 +1,356 @@
+"""
+Risk Feature Store
+Precomputed, versioned risk feature vectors keyed by search and property
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+import asyncio
+import hashlib
+import json
+import os
+import logging
+import numpy as np
+
+from models.risk_scoring.risk_model import (
+    FEATURE_NAMES,
+    FEATURE_VERSION,
+    YEARS_SINCE_LAST_DEED,
+    to_date,
+)
+
+logger = logging.getLogger(__name__)
+
+RISK_FEATURE_STORE_PATH = os.getenv("RISK_FEATURE_STORE_PATH", "./models/risk_features")
+# Seconds between saves of a changed store
+RISK_FEATURE_STORE_SAVE_INTERVAL = float(os.getenv("RISK_FEATURE_STORE_SAVE_INTERVAL", "300"))
+# Searches whose applied record ids are kept for de-duplication
+RISK_FEATURE_DEDUP_SEARCHES = int(os.getenv("RISK_FEATURE_DEDUP_SEARCHES", "10000"))
+
+_COLUMN = {name: idx for idx, name in enumerate(FEATURE_NAMES)}
+
+
+class RiskFeatureStore:
+    """
+    Table of risk feature vectors, one row per title search
+
+    Rows are kept in a single float matrix whose columns follow
+    FEATURE_NAMES, so a lookup is one dictionary hit plus a row slice and
+    training reads the matrix directly. Rows are created by upsert_search;
+    liens, deeds, encumbrances and judgments can then be applied
+    incrementally as they are ingested without reprocessing the whole
+    search. Records for searches without a row are ignored, and a record
+    already applied to a search (same id) is ignored, so re-ingesting a
+    property is safe.
+
+    Applied record ids are kept for the dedup_searches most recently
+    ingested searches. When a search's ids are dropped, its row is marked
+    stale, so it is recomputed from the full search data on next use
+    instead of counting re-ingested records twice.
+
+    Years since the last deed depends on the current date, so the store
+    keeps the last deed date and fills that column in at read time.
+    """
+
+    def __init__(self, capacity: int = 1024, dedup_searches: int = RISK_FEATURE_DEDUP_SEARCHES):
+        """
+        Initialize feature store
+
+        Args:
+            capacity: Initial number of rows to allocate
+            dedup_searches: Searches whose applied record ids are kept
+        """
+        self.dedup_searches = dedup_searches
+        self._matrix = np.zeros((capacity, len(FEATURE_NAMES)), dtype=np.float64)
+        self._last_deed = np.zeros(capacity, dtype=np.int64)  # date ordinal, 0 = no deed
+        self._versions = np.zeros(capacity, dtype=np.int32)
+        self._size = 0
+        self._rows: Dict[str, int] = {}
+        self._search_ids: List[str] = []
+        self._property_searches: Dict[str, str] = {}
+        self._applied: "OrderedDict[str, set]" = OrderedDict()
+        # Incremented on every modification, so savers can skip an unchanged store
+        self.changes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, search_id: str) -> bool:
+        return search_id in self._rows
+
+    def _row_for(self, search_id: str) -> int:
+        """Get the row for a search, allocating one if needed"""
+        row = self._rows.get(search_id)
+        if row is not None:
+            return row
+
+        if self._size == len(self._matrix):
+            capacity = len(self._matrix) * 2
+            self._matrix = np.resize(self._matrix, (capacity, len(FEATURE_NAMES)))
+            self._last_deed = np.resize(self._last_deed, capacity)
+            self._versions = np.resize(self._versions, capacity)
+
+        row = self._size
+        self._matrix[row] = 0
+        self._last_deed[row] = 0
+        self._versions[row] = FEATURE_VERSION
+        self._rows[search_id] = row
+        self._search_ids.append(search_id)
+        self._size += 1
+        return row
+
+    def upsert_search(
+        self,
+        search_id: str,
+        search_data: Dict[str, Any],
+        property_id: Optional[str] = None
+    ):
+        """
+        Compute and store the full feature vector for a title search
+
+        Args:
+            search_id: Title search identifier
+            search_data: Title search data dictionary
+            property_id: Property identifier (optional)
+        """
+        row = self._row_for(search_id)
+        self._matrix[row] = 0
+        self._last_deed[row] = 0
+        self._versions[row] = FEATURE_VERSION
+        self._applied.pop(search_id, None)
+        self.changes += 1
+        self._matrix[row, _COLUMN["property_age"]] = search_data.get("property_age", 0) or 0
+        self._matrix[row, _COLUMN["has_judgments"]] = 1 if search_data.get("judgments") else 0
+
+        for lien in search_data.get("liens", []):
+            self.add_lien(search_id, lien)
+        for deed in search_data.get("deeds", []):
+            self.add_deed(search_id, deed)
+        for encumbrance in search_data.get("encumbrances", []):
+            self.add_encumbrance(search_id, encumbrance)
+        judgments = search_data.get("judgments")
+        for judgment in judgments if isinstance(judgments, list) else []:
+            self.add_judgment(search_id, judgment)
+
+        if property_id:
+            self._property_searches[property_id] = search_id
+
+    def search_for_property(self, property_id: str) -> Optional[str]:
+        """Latest search stored for a property"""
+        return self._property_searches.get(property_id)
+
+    def _apply_once(self, search_id: str, kind: str, record: Any) -> Optional[int]:
+        """
+        Record that a record was applied to a search
+
+        Returns:
+            Row to apply the record to, or None if the search has no
+            current row or the record was already applied
+        """
+        row = self._rows.get(search_id)
+        if row is None or self._versions[row] != FEATURE_VERSION:
+            logger.debug(f"No current features for search {search_id}, ignoring {kind}")
+            return None
+        record_id = None
+        if isinstance(record, dict):
+            record_id = record.get("id") or record.get("document_number")
+        if record_id is None:
+            # A short digest keeps records without an id from being stored twice
+            content = json.dumps(record, sort_keys=True, default=str).encode("utf-8")
+            record_id = hashlib.blake2b(content, digest_size=8).hexdigest()
+        key = f"{kind}:{record_id}"
+
+        applied = self._applied.get(search_id)
+        if applied is None:
+            applied = self._applied[search_id] = set()
+        self._applied.move_to_end(search_id)
+        while len(self._applied) > self.dedup_searches:
+            evicted, _ = self._applied.popitem(last=False)
+            self._versions[self._rows[evicted]] = 0
+
+        if key in applied:
+            return None
+        applied.add(key)
+        self.changes += 1
+        return row
+
+    def add_lien(self, search_id: str, lien: Dict[str, Any]):
+        """Apply a newly ingested lien"""
+        row = self._apply_once(search_id, "lien", lien)
+        if row is None:
+            return
+        self._matrix[row, _COLUMN["lien_count"]] += 1
+        self._matrix[row, _COLUMN["total_lien_amount"]] += lien.get("amount") or 0
+
+    def add_deed(self, search_id: str, deed: Dict[str, Any]):
+        """Apply a newly ingested deed"""
+        row = self._apply_once(search_id, "deed", deed)
+        if row is None:
+            return
+        self._matrix[row, _COLUMN["deed_count"]] += 1
+        recorded = to_date(deed.get("recording_date"))
+        if recorded is not None:
+            self._last_deed[row] = max(self._last_deed[row], recorded.toordinal())
+
+    def add_encumbrance(self, search_id: str, encumbrance: Dict[str, Any]):
+        """Apply a newly ingested encumbrance"""
+        row = self._apply_once(search_id, "encumbrance", encumbrance)
+        if row is None:
+            return
+        self._matrix[row, _COLUMN["encumbrance_count"]] += 1
+
+    def add_judgment(self, search_id: str, judgment: Dict[str, Any]):
+        """Apply a newly ingested judgment"""
+        row = self._apply_once(search_id, "judgment", judgment)
+        if row is None:
+            return
+        self._matrix[row, _COLUMN["has_judgments"]] = 1
+
+    def _materialize(self, rows: np.ndarray, as_of: Optional[date] = None) -> np.ndarray:
+        """Copy rows out of the table and fill in date-dependent columns"""
+        features = self._matrix[rows]
+        last_deed = self._last_deed[rows]
+        today = (as_of or date.today()).toordinal()
+        features[:, YEARS_SINCE_LAST_DEED] = np.where(
+            last_deed > 0, np.maximum(today - last_deed, 0) / 365.25, 0
+        )
+        return features
+
+    def get_features(self, search_id: str) -> Optional[np.ndarray]:
+        """
+        Get the feature vector for a search
+
+        Args:
+            search_id: Title search identifier
+
+        Returns:
+            Feature array (1 x features), or None if unknown or computed
+            by an older feature version
+        """
+        row = self._rows.get(search_id)
+        if row is None or self._versions[row] != FEATURE_VERSION:
+            return None
+        return self._materialize(np.array([row]))
+
+    def get_features_for_property(self, property_id: str) -> Optional[np.ndarray]:
+        """Get the feature vector of the latest search for a property"""
+        search_id = self._property_searches.get(property_id)
+        return self.get_features(search_id) if search_id else None
+
+    def get_matrix(self, search_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get feature vectors for many searches at once
+
+        Args:
+            search_ids: Title search identifiers
+
+        Returns:
+            (feature matrix for the found searches, boolean found mask)
+        """
+        rows = np.array([self._rows.get(sid, -1) for sid in search_ids], dtype=np.int64)
+        found = rows >= 0
+        found[found] = self._versions[rows[found]] == FEATURE_VERSION
+        return self._materialize(rows[found]), found
+
+    def copy(self) -> "RiskFeatureStore":
+        """Independent copy of the store, e.g. to save it from another thread"""
+        store = RiskFeatureStore(capacity=1, dedup_searches=self.dedup_searches)
+        store._matrix = self._matrix.copy()
+        store._last_deed = self._last_deed.copy()
+        store._versions = self._versions.copy()
+        store._size = self._size
+        store._rows = dict(self._rows)
+        store._search_ids = list(self._search_ids)
+        store._property_searches = dict(self._property_searches)
+        store._applied = OrderedDict((sid, set(keys)) for sid, keys in self._applied.items())
+        store.changes = self.changes
+        return store
+
+    def save(self, directory: str):
+        """Save the store as .npy columns plus a JSON key index"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "features.npy"), self._matrix[:self._size])
+        np.save(os.path.join(directory, "last_deed.npy"), self._last_deed[:self._size])
+        np.save(os.path.join(directory, "versions.npy"), self._versions[:self._size])
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump({
+                "feature_names": FEATURE_NAMES,
+                "search_ids": self._search_ids,
+                "property_searches": self._property_searches,
+                "applied": {sid: sorted(keys) for sid, keys in self._applied.items()}
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "RiskFeatureStore":
+        """Load a store written by save()"""
+        with open(os.path.join(directory, "index.json"), "r") as f:
+            index = json.load(f)
+
+        store = cls(capacity=max(len(index["search_ids"]), 1024))
+        size = len(index["search_ids"])
+        store._matrix[:size] = np.load(os.path.join(directory, "features.npy"))
+        store._last_deed[:size] = np.load(os.path.join(directory, "last_deed.npy"))
+        store._versions[:size] = np.load(os.path.join(directory, "versions.npy"))
+        store._size = size
+        store._search_ids = list(index["search_ids"])
+        store._rows = {sid: row for row, sid in enumerate(store._search_ids)}
+        store._property_searches = dict(index["property_searches"])
+        store._applied = OrderedDict((sid, set(keys)) for sid, keys in index.get("applied", {}).items())
+        return store
+
+
+_feature_store: Optional[RiskFeatureStore] = None
+# Store changes counter at the last save, and the write in progress
+_saved_changes = 0
+_write: Optional[asyncio.Future] = None
+
+
+def get_feature_store() -> RiskFeatureStore:
+    """
+    Get the process-wide feature store
+
+    Loaded once from RISK_FEATURE_STORE_PATH when it exists, otherwise
+    starts empty. Changes are written back by persist_feature_store().
+    """
+    global _feature_store
+    if _feature_store is None:
+        path = RISK_FEATURE_STORE_PATH
+        if os.path.exists(os.path.join(path, "index.json")):
+            _feature_store = RiskFeatureStore.load(path)
+            logger.info(f"Risk feature store loaded from {path} ({len(_feature_store)} rows)")
+        else:
+            _feature_store = RiskFeatureStore()
+    return _feature_store
+
+
+async def persist_feature_store():
+    """
+    Save the process-wide feature store to RISK_FEATURE_STORE_PATH if it changed
+
+    The store is copied on the event loop, where ingestion modifies it, and
+    the copy is written in a worker thread. A write interrupted by
+    cancellation keeps running and is waited for by the next save.
+    """
+    global _saved_changes, _write
+    if _write is not None:
+        await asyncio.wait([_write])
+    store = _feature_store
+    if store is None or store.changes == _saved_changes:
+        return
+    snapshot = store.copy()
+    _write = asyncio.get_running_loop().run_in_executor(None, snapshot.save, RISK_FEATURE_STORE_PATH)
+    await asyncio.wait([_write])
+    write, _write = _write, None
+    write.result()
+    _saved_changes = snapshot.changes
+    logger.info(f"Risk feature store saved to {RISK_FEATURE_STORE_PATH} ({len(snapshot)} rows)")
+
+
+async def save_feature_store_periodically(interval: float = RISK_FEATURE_STORE_SAVE_INTERVAL):
+    """Persist the feature store every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await persist_feature_store()
+        except Exception as e:
+            logger.error(f"Failed to save risk feature store: {e}")
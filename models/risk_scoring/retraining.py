@@ -0,0 +1,173 @@
+"""
+Incremental Risk Model Retraining
+Nightly retraining from RiskLabeler outcomes with cached features and versioned artifacts
+"""
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import logging
+import numpy as np
+
+from models.risk_scoring.feature_store import RiskFeatureStore
+from models.risk_scoring.risk_model import RiskScoringModel
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalRetrainer:
+    """
+    Retrain the risk model from newly labeled outcomes
+
+    Feature rows for every labeled search are cached on disk, so each run
+    only prepares features for new labels. New labels are fitted as
+    additional trees (warm start); once the forest reaches max_trees it is
+    refit from scratch on the cached feature matrix.
+
+    Layout of artifact_dir:
+        features/          cached features.npy, targets.npy, search_ids.npy
+        v<N>/model.joblib  sklearn model for further retraining
+        v<N>/compiled/     compiled runtime for serving
+        manifest.json      latest version and training history
+    """
+
+    def __init__(
+        self,
+        artifact_dir: str,
+        search_data_loader: Callable[[str], Optional[Dict[str, Any]]],
+        trees_per_run: int = 10,
+        max_trees: int = 300,
+        feature_store: Optional[RiskFeatureStore] = None
+    ):
+        """
+        Initialize retrainer
+
+        Args:
+            artifact_dir: Directory for cached features and model versions
+            search_data_loader: Returns title search data for a search_id (or None)
+            trees_per_run: Trees added per incremental run
+            max_trees: Forest size that triggers a full refit
+            feature_store: Read precomputed features from here when available
+        """
+        self.artifact_dir = artifact_dir
+        self.search_data_loader = search_data_loader
+        self.feature_store = feature_store
+        self.trees_per_run = trees_per_run
+        self.max_trees = max_trees
+        self.features_dir = os.path.join(artifact_dir, "features")
+        self.manifest_path = os.path.join(artifact_dir, "manifest.json")
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        return {"latest_version": 0, "versions": []}
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_cache(self):
+        """Load cached (features, targets, search_ids), or empty arrays"""
+        path = os.path.join(self.features_dir, "features.npy")
+        if not os.path.exists(path):
+            return None, np.empty(0), np.empty(0, dtype=str)
+        return (
+            np.load(path),
+            np.load(os.path.join(self.features_dir, "targets.npy")),
+            np.load(os.path.join(self.features_dir, "search_ids.npy"))
+        )
+
+    def _save_cache(self, features: np.ndarray, targets: np.ndarray, search_ids: np.ndarray):
+        os.makedirs(self.features_dir, exist_ok=True)
+        np.save(os.path.join(self.features_dir, "features.npy"), features)
+        np.save(os.path.join(self.features_dir, "targets.npy"), targets)
+        np.save(os.path.join(self.features_dir, "search_ids.npy"), search_ids)
+
+    def version_dir(self, version: int) -> str:
+        return os.path.join(self.artifact_dir, f"v{version}")
+
+    def _features_for(self, model: RiskScoringModel, search_id: str) -> Optional[np.ndarray]:
+        """Feature vector from the store, falling back to raw search data"""
+        if self.feature_store is not None:
+            features = self.feature_store.get_features(search_id)
+            if features is not None:
+                return features
+        search_data = self.search_data_loader(search_id)
+        if search_data is None:
+            return None
+        return model.prepare_features(search_data)
+
+    def run(self, labeled_data: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        Retrain on labels not seen by previous runs
+
+        Args:
+            labeled_data: RiskLabeler records; only records with an
+                actual_outcome are used
+
+        Returns:
+            New model version, or None if there was nothing new to train on
+        """
+        manifest = self._load_manifest()
+        cached_X, cached_y, cached_ids = self._load_cache()
+        seen = set(cached_ids.tolist())
+
+        model = RiskScoringModel()
+        rows, targets, search_ids = [], [], []
+        for record in labeled_data:
+            search_id = record.get("search_id")
+            if not record.get("actual_outcome") or search_id in seen:
+                continue
+            features = self._features_for(model, search_id)
+            if features is None:
+                logger.warning(f"No search data for labeled search {search_id}, skipping")
+                continue
+            rows.append(features)
+            targets.append(float(record["risk_score"]))
+            search_ids.append(search_id)
+            seen.add(search_id)
+
+        if not rows:
+            logger.info("No new risk labels, skipping retraining")
+            return None
+
+        X_new = np.vstack(rows)
+        y_new = np.array(targets)
+        X_all = X_new if cached_X is None else np.vstack([cached_X, X_new])
+        y_all = np.concatenate([cached_y, y_new])
+        ids_all = np.concatenate([cached_ids, np.array(search_ids)])
+
+        previous = manifest["latest_version"]
+        if previous:
+            model.load_model(os.path.join(self.version_dir(previous), "model.joblib"))
+
+        n_trees = len(getattr(model.model, "estimators_", []))
+        if previous and n_trees + self.trees_per_run <= self.max_trees:
+            model.train_incremental(X_new, y_new, n_new_trees=self.trees_per_run)
+            mode = "incremental"
+        else:
+            model.train_features(X_all, y_all)
+            mode = "full"
+
+        version = previous + 1
+        version_dir = self.version_dir(version)
+        os.makedirs(version_dir, exist_ok=True)
+        model.save_model(os.path.join(version_dir, "model.joblib"))
+        model.export_compiled(os.path.join(version_dir, "compiled"))
+
+        # Cache and manifest are written last so a failed run is simply retried
+        self._save_cache(X_all, y_all, ids_all)
+        manifest["latest_version"] = version
+        manifest["versions"].append({
+            "version": version,
+            "mode": mode,
+            "new_examples": len(y_new),
+            "total_examples": len(y_all),
+            "n_trees": len(model.model.estimators_)
+        })
+        self._save_manifest(manifest)
+
+        logger.info(f"Risk model v{version} trained ({mode}, {len(y_new)} new labels)")
+        return version
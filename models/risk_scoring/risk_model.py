@@ -3,6 +3,7 @@ Risk Scoring Model
 Custom model for title risk assessment
 """
 from typing import List, Dict, Any, Optional
+from datetime import date, datetime
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
@@ -10,20 +11,57 @@ import joblib
 import logging
 import os
 
+from models.risk_scoring.compiled_model import CompiledForest
+
 logger = logging.getLogger(__name__)
 
+# Column order of every feature vector; bump FEATURE_VERSION when it changes
+FEATURE_NAMES = [
+    "lien_count",
+    "encumbrance_count",
+    "deed_count",
+    "total_lien_amount",
+    "years_since_last_deed",
+    "has_judgments",
+    "property_age"
+]
+FEATURE_VERSION = 2
+
+YEARS_SINCE_LAST_DEED = FEATURE_NAMES.index("years_since_last_deed")
+
+
+def to_date(value: Any) -> Optional[date]:
+    """Parse a recording date from a date, datetime or ISO string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+def years_between(start: date, end: date) -> float:
+    """Fractional years between two dates"""
+    return max(0.0, (end - start).days / 365.25)
+
 
 class RiskScoringModel:
     """Risk scoring model for title insurance"""
     
     def __init__(self):
         """Initialize risk scoring model"""
+        self.n_base_trees = 100
         self.model = RandomForestRegressor(
-            n_estimators=100,
+            n_estimators=self.n_base_trees,
             max_depth=10,
             random_state=42
         )
         self.scaler = StandardScaler()
+        self.compiled: Optional[CompiledForest] = None
         self.is_trained = False
     
     def prepare_features(
@@ -52,17 +90,17 @@ class RiskScoringModel:
         
         # Total lien amount
         total_lien_amount = sum(
-            lien.get("amount", 0) for lien in search_data.get("liens", [])
+            lien.get("amount") or 0 for lien in search_data.get("liens", [])
         )
         features.append(total_lien_amount)
         
         # Years since last deed
-        if search_data.get("deeds"):
-            latest_deed_date = max(
-                deed.get("recording_date") for deed in search_data.get("deeds", [])
-            )
-            # TODO: Calculate years difference
-            features.append(0)  # Placeholder
+        deed_dates = [
+            to_date(deed.get("recording_date")) for deed in search_data.get("deeds", [])
+        ]
+        deed_dates = [d for d in deed_dates if d is not None]
+        if deed_dates:
+            features.append(years_between(max(deed_dates), date.today()))
         else:
             features.append(0)
         
@@ -75,6 +113,35 @@ class RiskScoringModel:
         
         return np.array(features).reshape(1, -1)
     
+    def features_for(
+        self,
+        search_data: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Feature vector for a title search
+        
+        Searches with a search_id are read from the feature store, and
+        added to it first if missing; others are prepared from search_data.
+        
+        Args:
+            search_data: Title search data dictionary
+            
+        Returns:
+            Feature array
+        """
+        search_id = search_data.get("search_id")
+        if not search_id:
+            return self.prepare_features(search_data)
+        
+        # Imported here because the feature store depends on this module
+        from models.risk_scoring.feature_store import get_feature_store
+        store = get_feature_store()
+        features = store.get_features(search_id)
+        if features is None:
+            store.upsert_search(search_id, search_data, search_data.get("property_id"))
+            features = store.get_features(search_id)
+        return features
+    
     def train(
         self,
         X: List[Dict[str, Any]],
@@ -88,16 +155,64 @@ class RiskScoringModel:
             y: List of risk scores (0-100)
         """
         # Prepare features
-        X_features = np.vstack([self.prepare_features(x) for x in X])
+        X_features = np.vstack([self.features_for(x) for x in X])
         
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X_features)
+        self.train_features(X_features, y)
+    
+    def train_features(
+        self,
+        X_features: np.ndarray,
+        y: List[float]
+    ):
+        """
+        Train from scratch on a prepared feature matrix
         
-        # Train model
+        Args:
+            X_features: Unscaled feature matrix (rows x features)
+            y: List of risk scores (0-100)
+        """
+        X_scaled = self.scaler.fit_transform(X_features)
+        self.model.set_params(warm_start=False, n_estimators=self.n_base_trees)
         self.model.fit(X_scaled, y)
+        self.compiled = None
         self.is_trained = True
         
-        logger.info("Risk scoring model trained successfully")
+        logger.info(f"Risk scoring model trained on {len(y)} examples")
+    
+    def train_incremental(
+        self,
+        X_features: np.ndarray,
+        y: List[float],
+        n_new_trees: int = 10
+    ):
+        """
+        Add trees fitted on newly labeled data only
+        
+        Existing trees and the fitted scaler are kept as-is, so the cost is
+        proportional to the number of new examples rather than the full
+        history. Falls back to a full fit if the model is untrained.
+        
+        Args:
+            X_features: Unscaled feature matrix of new examples
+            y: Risk scores (0-100) of new examples
+            n_new_trees: Number of trees to add
+        """
+        if not hasattr(self.model, "estimators_"):
+            self.train_features(X_features, y)
+            return
+        
+        X_scaled = self.scaler.transform(X_features)
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + n_new_trees
+        )
+        self.model.fit(X_scaled, y)
+        self.compiled = None
+        
+        logger.info(
+            f"Added {n_new_trees} trees on {len(y)} new examples "
+            f"({len(self.model.estimators_)} trees total)"
+        )
     
     def predict(
         self,
@@ -116,18 +231,50 @@ class RiskScoringModel:
             raise ValueError("Model must be trained before prediction")
         
         # Prepare features
-        features = self.prepare_features(search_data)
+        features = self.features_for(search_data)
+        
+        return float(self.predict_features(features)[0])
+    
+    def predict_features(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict risk scores for a prepared feature matrix
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        Args:
+            features: Unscaled feature matrix (rows x features)
+            
+        Returns:
+            Risk scores (0-100), one per row
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before prediction")
         
-        # Predict
-        score = self.model.predict(features_scaled)[0]
+        if self.compiled is not None:
+            scores = self.compiled.predict(features)
+        else:
+            scores = self.model.predict(self.scaler.transform(features))
+        
+        # Ensure scores are between 0 and 100
+        return np.clip(scores, 0, 100)
+    
+    def explain_features(self, features: np.ndarray):
+        """
+        Predict risk scores with per-feature contributions
+        
+        Args:
+            features: Unscaled feature matrix (rows x features)
+            
+        Returns:
+            (scores (0-100), contributions (rows x features) in score
+            points ordered as FEATURE_NAMES, bias)
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before prediction")
         
-        # Ensure score is between 0 and 100
-        score = max(0, min(100, score))
+        if self.compiled is None:
+            self.compiled = CompiledForest.from_sklearn(self.model, self.scaler)
         
-        return float(score)
+        scores, contributions, bias = self.compiled.predict_with_contributions(features)
+        return np.clip(scores, 0, 100), contributions, bias
     
     def save_model(self, file_path: str):
         """Save model to file"""
@@ -143,6 +290,60 @@ class RiskScoringModel:
         model_data = joblib.load(file_path)
         self.model = model_data["model"]
         self.scaler = model_data["scaler"]
+        self.compiled = None
         self.is_trained = True
         logger.info(f"Model loaded from {file_path}")
+    
+    def export_compiled(self, directory: str):
+        """
+        Export scaler and forest as flat, memory-mappable node arrays
+        
+        Args:
+            directory: Output directory
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before export")
+        
+        compiled = CompiledForest.from_sklearn(self.model, self.scaler)
+        compiled.save(directory)
+        logger.info(
+            f"Compiled model ({compiled.n_trees} trees, {len(compiled.feature)} nodes) "
+            f"exported to {directory}"
+        )
+    
+    def load_compiled(self, directory: str):
+        """
+        Load a compiled model for serving
+        
+        Arrays are memory-mapped, so loading is near-instant and pages are
+        shared between worker processes. The sklearn estimator is not
+        loaded; retraining requires load_model().
+        
+        Args:
+            directory: Directory written by export_compiled()
+        """
+        self.compiled = CompiledForest.load(directory)
+        self.is_trained = True
+        logger.info(f"Compiled model loaded from {directory}")
+
+
+
+_risk_model: Optional[RiskScoringModel] = None
+
+
+def get_risk_model() -> Optional[RiskScoringModel]:
+    """
+    Get the process-wide risk model for serving
 
+    The compiled model is memory-mapped once from RISK_MODEL_PATH. Returns
+    None when no compiled model is available.
+    """
+    global _risk_model
+    if _risk_model is None:
+        path = os.getenv("RISK_MODEL_PATH", "./models/risk_model/compiled")
+        if not os.path.exists(os.path.join(path, "manifest.json")):
+            return None
+        model = RiskScoringModel()
+        model.load_compiled(path)
+        _risk_model = model
+    return _risk_model